@@ -2,6 +2,10 @@
 DAT490 - BRFSS Data Analysis Package
 """
 
-from .bfrss import BFRSS, load_bfrss, load_bfrss_components, setup_bfrss_logger
+from .bfrss import BFRSS, load_bfrss, load_bfrss_components, setup_bfrss_logger, iter_stacked_batches
+from .cache import MetadataCache, ArrowDataCache
+from .lookup import ValueRangeIndex
+from .desc import DescFrame
+from .catalog import DatasetCatalog, default_catalog
 
-__all__ = ['BFRSS', 'load_bfrss', 'load_bfrss_components', 'setup_bfrss_logger']
\ No newline at end of file
+__all__ = ['BFRSS', 'load_bfrss', 'load_bfrss_components', 'setup_bfrss_logger', 'iter_stacked_batches', 'MetadataCache', 'ArrowDataCache', 'ValueRangeIndex', 'DescFrame', 'DatasetCatalog', 'default_catalog']
\ No newline at end of file
@@ -0,0 +1,459 @@
+"""
+Mergeable Statistics Accumulators
+Computes the same statistics as dat490.statistics without holding a column in
+memory. Each column keeps a partial state (row count, value counts, moments of
+the meaningful values, missing and range counts) that is updated batch by batch
+and can be merged with the state of another batch, row group or file.
+
+Value counts are exact until a column has more than max_distinct distinct
+values. Past that the meaningful values are compacted into a bounded quantile
+sketch, so memory per column stays fixed: counts and moments stay exact, while
+quantiles become approximate and unique_count is left unset.
+"""
+
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple, Union
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
+
+from .parser import ColumnMetadata, ValueRange, NumericStatistics
+from .statistics import ColumnHistogram, count_value_ranges, compute_column_statistics, missing_value_ranges
+from .nulls import semantic_null_mask, apply_semantic_nulls_arrow
+
+# Distinct values kept exactly per column before switching to a quantile sketch
+DEFAULT_MAX_DISTINCT = 100_000
+
+# Rows decoded at a time within a row group
+DEFAULT_BATCH_SIZE = 65_536
+
+
+def _merge_moments(a: Tuple[int, float, float], b: Tuple[int, float, float]) -> Tuple[int, float, float]:
+    """Combine (count, mean, sum of squared deviations) of two samples (Chan et al.)."""
+    n_a, mean_a, m2_a = a
+    n_b, mean_b, m2_b = b
+    n = n_a + n_b
+    if n_a == 0:
+        return b
+    if n_b == 0:
+        return a
+    delta = mean_b - mean_a
+    return n, mean_a + delta * n_b / n, m2_a + m2_b + delta * delta * n_a * n_b / n
+
+
+def _compact(values: np.ndarray, counts: np.ndarray, bins: int) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Merge sorted (value, count) pairs into at most bins groups of about equal weight.
+
+    Each group is represented by the value at its middle rank, so quantiles
+    read from the sketch are observed values (never a value in a gap between
+    clusters) and any rank is off by at most one group.
+    """
+    if len(values) <= bins:
+        return values, counts
+    ends = np.cumsum(counts)
+    total = ends[-1]
+    groups = ((ends - counts) * bins // total).astype('int64')
+    group_counts = np.bincount(groups, weights=counts).astype('int64')
+    group_counts = group_counts[group_counts > 0]
+    middles = np.cumsum(group_counts) - group_counts / 2
+    return values[np.searchsorted(ends, middles, side='right')], group_counts
+
+
+def _quantiles(values: np.ndarray, counts: np.ndarray, percents: Sequence[float]) -> List[float]:
+    """Linear-interpolated percentiles of the sorted values, each repeated counts times (as np.percentile)."""
+    cumulative = np.cumsum(counts)
+    total = int(cumulative[-1])
+    results = []
+    for percent in percents:
+        position = percent / 100 * (total - 1)
+        lower = int(np.floor(position))
+        upper = min(lower + 1, total - 1)
+        low_value = values[np.searchsorted(cumulative, lower, side='right')]
+        high_value = values[np.searchsorted(cumulative, upper, side='right')]
+        results.append(float(low_value + (position - lower) * (high_value - low_value)))
+    return results
+
+
+def _append_counts(total: pd.Series, counts: pd.Series) -> pd.Series:
+    """Add counts to a running total, appending new values after the existing ones."""
+    if total.empty:
+        return counts.copy()
+    new_values = counts.index[~counts.index.isin(total.index)]
+    index = total.index.append(new_values)
+    return total.reindex(index, fill_value=0) + counts.reindex(index, fill_value=0)
+
+
+class ColumnAccumulator:
+    """
+    Partial statistics state for one column.
+
+    update() adds a batch of values, add_constant() and add_nulls() add rows
+    known from parquet footer statistics, and merge() folds in another state for
+    later rows. result() returns the column's metadata with statistics, equal to
+    add_column_statistics() over the concatenated rows while the value counts are
+    exact (mean and std can differ in the last bits since they are summed in a
+    different order).
+    """
+
+    def __init__(self, column_meta: ColumnMetadata, max_distinct: int = DEFAULT_MAX_DISTINCT):
+        """
+        Start an empty state.
+
+        Args:
+            column_meta: Schema metadata for the column
+            max_distinct: Distinct values counted exactly before switching to a sketch
+        """
+        self.column_meta = column_meta
+        self.max_distinct = max_distinct
+        self.missing_ranges = missing_value_ranges(column_meta.value_ranges)
+        self.length = 0
+        self.numeric: Optional[bool] = None
+        self.moments = (0, 0.0, 0.0)
+
+        # Exact mode: value counts in first-appearance order
+        self.value_counts: Optional[pd.Series] = pd.Series(dtype='int64')
+
+        # Sketch mode (value_counts is None): everything the statistics need, kept exactly except the quantiles
+        self.non_null_count = 0
+        self.missing_counts: Optional[pd.Series] = None
+        self.range_counts: Optional[np.ndarray] = None
+        self.sketch_values: Optional[np.ndarray] = None
+        self.sketch_counts: Optional[np.ndarray] = None
+        self.minimum: Optional[float] = None
+        self.maximum: Optional[float] = None
+
+    @property
+    def exact(self) -> bool:
+        """Whether value counts (and so quantiles and unique_count) are still exact."""
+        return self.value_counts is not None
+
+    def _can_sketch(self) -> bool:
+        """Only numeric "Num" columns are compacted; their quantiles are all that depends on each value."""
+        return bool(self.numeric) and self.column_meta.type_of_variable == "Num"
+
+    def _check_numeric(self, numeric: bool) -> None:
+        """Record whether the column is numeric, rejecting batches that disagree."""
+        if self.numeric is None:
+            self.numeric = numeric
+        elif self.numeric != numeric:
+            raise ValueError(f"Column {self.column_meta.sas_variable_name} changed between numeric and non-numeric data")
+
+    def update(self, series: pd.Series) -> None:
+        """Add a batch of column values."""
+        self._add_histogram(ColumnHistogram(series))
+
+    def add_constant(self, value: float, count: int, null_count: int = 0) -> None:
+        """Add count rows holding value plus null_count nulls, e.g. a row group whose footer min equals max."""
+        value_counts = pd.Series([count], index=pd.Index([float(value)]), dtype='int64') if count else pd.Series(dtype='int64')
+        self._add_histogram(ColumnHistogram.from_value_counts(value_counts, count + null_count, True))
+
+    def add_nulls(self, count: int, numeric: bool = True) -> None:
+        """Add count null rows, e.g. a row group whose footer null count equals its row count."""
+        self._add_histogram(ColumnHistogram.from_value_counts(pd.Series(dtype='int64'), count, numeric))
+
+    def _meaningful(self, histogram: ColumnHistogram) -> np.ndarray:
+        """Mask of histogram values that are not missing codes."""
+        return ~histogram.code_mask(self.missing_ranges)
+
+    def _add_histogram(self, histogram: ColumnHistogram) -> None:
+        """Fold one batch's histogram into the state."""
+        self._check_numeric(histogram.numeric)
+        self.length += histogram.length
+        if histogram.numeric and len(histogram.values):
+            meaningful = self._meaningful(histogram)
+            values, counts = histogram.values[meaningful], histogram.counts[meaningful]
+            n = int(counts.sum())
+            if n:
+                mean = float((values * counts).sum() / n)
+                self.moments = _merge_moments(self.moments, (n, mean, float((counts * (values - mean) ** 2).sum())))
+
+        if self.exact:
+            self.value_counts = _append_counts(self.value_counts, histogram.value_counts)
+            if len(self.value_counts) > self.max_distinct and self._can_sketch():
+                self._to_sketch()
+        else:
+            self._add_to_sketch(histogram)
+
+    def _sketch_state(self, histogram: ColumnHistogram):
+        """Return (non-null count, missing counts, range counts, meaningful values, counts) of a histogram."""
+        meaningful = self._meaningful(histogram)
+        missing_counts = pd.Series(histogram.counts[~meaningful], index=histogram.values[~meaningful], dtype='int64')
+        range_counts = np.array([histogram.count_between(value_def.start, value_def.end)
+                                 for value_def in self.column_meta.value_ranges if isinstance(value_def, ValueRange)],
+                                dtype='int64')
+        return (histogram.non_null_count, missing_counts, range_counts,
+                histogram.values[meaningful], histogram.counts[meaningful])
+
+    def _to_sketch(self) -> None:
+        """Switch from exact value counts to the bounded sketch."""
+        histogram = ColumnHistogram.from_value_counts(self.value_counts, self.length, True)
+        self.non_null_count, self.missing_counts, self.range_counts, values, counts = self._sketch_state(histogram)
+        self.value_counts = None
+        self.sketch_values, self.sketch_counts = _compact(values, counts, self.max_distinct // 2)
+        self.minimum = float(values[0]) if len(values) else None
+        self.maximum = float(values[-1]) if len(values) else None
+
+    def _add_to_sketch(self, histogram: ColumnHistogram) -> None:
+        """Fold a histogram into the sketch-mode state."""
+        non_null, missing_counts, range_counts, values, counts = self._sketch_state(histogram)
+        self.non_null_count += non_null
+        self.missing_counts = _append_counts(self.missing_counts, missing_counts)
+        self.range_counts = self.range_counts + range_counts
+        self._merge_sketch(values, counts)
+        if len(values):
+            self._merge_bounds(float(values[0]), float(values[-1]))
+
+    def _merge_bounds(self, minimum: Optional[float], maximum: Optional[float]) -> None:
+        """Widen the exact min/max of the meaningful values."""
+        if minimum is not None:
+            self.minimum = minimum if self.minimum is None else min(self.minimum, minimum)
+        if maximum is not None:
+            self.maximum = maximum if self.maximum is None else max(self.maximum, maximum)
+
+    def _merge_sketch(self, values: np.ndarray, counts: np.ndarray) -> None:
+        """Add sorted (value, count) pairs to the sketch, compacting it past max_distinct entries."""
+        values = np.concatenate((self.sketch_values, values))
+        counts = np.concatenate((self.sketch_counts, counts))
+        order = np.argsort(values, kind='stable')
+        self.sketch_values, self.sketch_counts = values[order], counts[order]
+        if len(self.sketch_values) > self.max_distinct:
+            self.sketch_values, self.sketch_counts = _compact(self.sketch_values, self.sketch_counts, self.max_distinct // 2)
+
+    def merge(self, other: 'ColumnAccumulator') -> None:
+        """Fold in the state of the rows that follow this one (another batch, row group or file)."""
+        if other.numeric is None:
+            return
+        self._check_numeric(other.numeric)
+        self.moments = _merge_moments(self.moments, other.moments)
+        if self.exact and other.exact:
+            self.length += other.length
+            self.value_counts = _append_counts(self.value_counts, other.value_counts)
+            if len(self.value_counts) > self.max_distinct and self._can_sketch():
+                self._to_sketch()
+            return
+
+        if self.exact:
+            self._to_sketch()
+        self.length += other.length
+        if other.exact:
+            self._add_to_sketch(ColumnHistogram.from_value_counts(other.value_counts, other.length, True))
+            return
+        self.non_null_count += other.non_null_count
+        self.missing_counts = _append_counts(self.missing_counts, other.missing_counts)
+        self.range_counts = self.range_counts + other.range_counts
+        self._merge_sketch(other.sketch_values, other.sketch_counts)
+        self._merge_bounds(other.minimum, other.maximum)
+
+    def mean_std(self) -> Tuple[Optional[float], Optional[float]]:
+        """Mean and sample standard deviation of the meaningful values (None when undefined)."""
+        n, mean, m2 = self.moments
+        if n == 0:
+            return None, None
+        return mean, (float(np.sqrt(m2 / (n - 1))) if n > 1 else None)
+
+    def result(self) -> ColumnMetadata:
+        """
+        Return a copy of the column's metadata with value range counts and statistics filled in.
+
+        Returns:
+            ColumnMetadata as add_column_statistics would produce it
+        """
+        column_meta = self.column_meta
+        if self.exact:
+            histogram = ColumnHistogram.from_value_counts(self.value_counts, self.length, bool(self.numeric))
+            return column_meta.model_copy(update={
+                'value_ranges': count_value_ranges(column_meta.value_ranges, histogram),
+                'statistics': compute_column_statistics(column_meta, None, histogram, moments=self.mean_std()),
+            })
+
+        range_counts = iter(self.range_counts.tolist())
+        value_ranges = [value_def.model_copy(update={'count': next(range_counts)})
+                        if isinstance(value_def, ValueRange) else value_def
+                        for value_def in column_meta.value_ranges]
+        missing_count = int(self.missing_counts.sum())
+        mean, std = self.mean_std()
+        q25 = median = q75 = None
+        if len(self.sketch_values):
+            q25, median, q75 = _quantiles(self.sketch_values, self.sketch_counts, [25, 50, 75])
+        statistics = NumericStatistics(
+            count=self.non_null_count - missing_count,
+            null_count=self.length - self.non_null_count,
+            missing_count=missing_count,
+            unique_count=None,
+            total_responses=self.non_null_count,
+            mean=mean,
+            std=std,
+            min=self.minimum,
+            q25=q25,
+            median=median,
+            q75=q75,
+            max=self.maximum,
+        )
+        return column_meta.model_copy(update={'value_ranges': value_ranges, 'statistics': statistics})
+
+
+class StatisticsAccumulator:
+    """
+    Partial statistics state for every codebook column seen in the data.
+
+    Feed it DataFrame batches (or footer-derived rows) in row order, merge
+    states built over separate parts of the data, and call result() for the
+    same dictionary add_statistics returns.
+    """
+
+    def __init__(self, schema: Dict[str, ColumnMetadata], max_distinct: int = DEFAULT_MAX_DISTINCT):
+        """
+        Start an empty state.
+
+        Args:
+            schema: Metadata from parse_codebook_html without a DataFrame
+            max_distinct: Distinct values counted exactly per column before switching to a sketch
+        """
+        self.schema = schema
+        self.max_distinct = max_distinct
+        self.columns: Dict[str, ColumnAccumulator] = {}
+
+    def column(self, name: str) -> ColumnAccumulator:
+        """Return the state of one column, creating it on first use."""
+        if name not in self.columns:
+            self.columns[name] = ColumnAccumulator(self.schema[name], self.max_distinct)
+        return self.columns[name]
+
+    def update(self, df: pd.DataFrame) -> None:
+        """Add a batch of rows; columns not in the schema are ignored."""
+        for name in df.columns:
+            if name in self.schema:
+                self.column(name).update(df[name])
+
+    def merge(self, other: 'StatisticsAccumulator') -> None:
+        """Fold in the state of the rows that follow this one."""
+        for name, column in other.columns.items():
+            self.column(name).merge(column)
+
+    def result(self) -> Dict[str, ColumnMetadata]:
+        """
+        Return metadata for every schema column, with statistics for those seen.
+
+        Returns:
+            New dictionary mapping SAS variable names to ColumnMetadata, in schema order
+        """
+        return {name: self.columns[name].result() if name in self.columns else column_meta
+                for name, column_meta in self.schema.items()}
+
+
+def accumulate_statistics(schema: Dict[str, ColumnMetadata], batches: Iterable[pd.DataFrame],
+                          max_distinct: int = DEFAULT_MAX_DISTINCT) -> Dict[str, ColumnMetadata]:
+    """
+    Compute statistics from DataFrame batches, e.g. BFRSS.iter_batches().
+
+    Args:
+        schema: Metadata from parse_codebook_html without a DataFrame
+        batches: DataFrames of consecutive rows
+        max_distinct: Distinct values counted exactly per column before switching to a sketch
+
+    Returns:
+        New dictionary mapping SAS variable names to ColumnMetadata with statistics
+    """
+    accumulator = StatisticsAccumulator(schema, max_distinct)
+    for batch in batches:
+        accumulator.update(batch)
+    return accumulator.result()
+
+
+def _footer_rows(chunk, num_rows: int, intervals: Optional[np.ndarray]):
+    """
+    Describe a column chunk from its footer statistics alone, if possible.
+
+    Returns ('nulls', None) when every row is null, ('constant', (value, count, nulls))
+    when every non-null row holds one value, or None when the chunk has to be read.
+    """
+    statistics = chunk.statistics
+    if statistics is None or not statistics.has_null_count:
+        return None
+    if statistics.null_count == num_rows:
+        return 'nulls', None
+    if not statistics.has_min_max or chunk.physical_type not in ('DOUBLE', 'FLOAT', 'INT32', 'INT64'):
+        return None
+    if statistics.min != statistics.max:
+        return None
+    value = float(statistics.min)
+    if intervals is not None and semantic_null_mask(np.array([value]), intervals)[0]:
+        # The constant is a missing code that semantic null conversion turns into null
+        return 'nulls', None
+    return 'constant', (value, num_rows - statistics.null_count, statistics.null_count)
+
+
+def parquet_statistics(paths: Union[str, Path, Sequence[Union[str, Path]]], schema: Dict[str, ColumnMetadata],
+                       columns: Optional[List[str]] = None,
+                       semantic_null_intervals_by_column: Optional[Dict[str, np.ndarray]] = None,
+                       column_aliases: Optional[Dict[str, str]] = None,
+                       batch_size: int = DEFAULT_BATCH_SIZE,
+                       max_distinct: int = DEFAULT_MAX_DISTINCT) -> Dict[str, ColumnMetadata]:
+    """
+    Compute statistics for one or more parquet files without materializing them.
+
+    Files are read row group by row group, batch_size rows at a time, so memory
+    is bounded by one batch plus the per-column states. A column chunk whose
+    footer statistics show it is entirely null, or holds a single value, is
+    counted from the footer without being read. Several paths (e.g. one file per
+    survey year) give statistics over their stacked rows.
+
+    Args:
+        paths: Parquet file or files, in row order
+        schema: Metadata from parse_codebook_html without a DataFrame
+        columns: Columns to compute statistics for, by exposed name (default: every schema column in the file)
+        semantic_null_intervals_by_column: Convert these missing codes to null before counting
+            (BFRSS.get_semantic_null_intervals(); default: no conversion)
+        column_aliases: Stored column names mapped to exposed names (BFRSS.column_aliases)
+        batch_size: Rows decoded at a time within a row group
+        max_distinct: Distinct values counted exactly per column before switching to a sketch
+
+    Returns:
+        New dictionary mapping SAS variable names to ColumnMetadata with statistics, in schema order
+    """
+    if isinstance(paths, (str, Path)):
+        paths = [paths]
+    column_aliases = column_aliases or {}
+    intervals_by_column = semantic_null_intervals_by_column or {}
+    accumulator = StatisticsAccumulator(schema, max_distinct)
+
+    for path in paths:
+        parquet_file = pq.ParquetFile(path, pre_buffer=False)
+        metadata = parquet_file.metadata
+        arrow_schema = parquet_file.schema_arrow
+        stored_names = arrow_schema.names
+        exposed_names = [column_aliases.get(name, name) for name in stored_names]
+        wanted = set(columns) if columns is not None else set(schema)
+        positions = [j for j, name in enumerate(exposed_names) if name in wanted and name in schema]
+
+        for i in range(metadata.num_row_groups):
+            row_group = metadata.row_group(i)
+            to_read = []
+            for j in positions:
+                name = exposed_names[j]
+                field_type = arrow_schema.field(j).type
+                footer = None if pa.types.is_dictionary(field_type) else _footer_rows(
+                    row_group.column(j), row_group.num_rows, intervals_by_column.get(name))
+                if footer is None:
+                    to_read.append(j)
+                elif footer[0] == 'nulls':
+                    accumulator.column(name).add_nulls(row_group.num_rows,
+                                                       numeric=pa.types.is_integer(field_type) or pa.types.is_floating(field_type))
+                else:
+                    accumulator.column(name).add_constant(*footer[1])
+            if not to_read:
+                continue
+
+            read_names = [stored_names[j] for j in to_read]
+            for batch in parquet_file.iter_batches(batch_size=batch_size, row_groups=[i], columns=read_names):
+                batch = batch.rename_columns([exposed_names[j] for j in to_read])
+                table = pa.Table.from_batches([batch])
+                if intervals_by_column:
+                    table, _ = apply_semantic_nulls_arrow(table, intervals_by_column)
+                accumulator.update(table.to_pandas())
+                del batch, table
+
+    return accumulator.result()
@@ -0,0 +1,103 @@
+"""
+Column Aliases
+Maps the X_-prefixed column names some BRFSS exports use (X_STATE for _STATE)
+back to codebook names using only parquet footers, renames parquet schemas
+without touching column data, and rebinds filter expressions written against
+the codebook names to the stored columns.
+"""
+
+import json
+from typing import Collection, Dict, Iterable
+
+import pyarrow as pa
+import pyarrow.compute as pc
+
+from .desc import _code_column_name
+
+
+def x_prefix_aliases(column_names: Iterable[str], reference_names: Collection[str]) -> Dict[str, str]:
+    """
+    Map X_ columns to their underscore names.
+
+    X_FOO becomes _FOO when _FOO is a reference name, and X_FOO_DESC becomes
+    _FOO_DESC when _FOO is. A column is left alone if its target name is
+    already present, so a rename never creates duplicate columns.
+
+    Args:
+        column_names: Column names as stored (e.g. from pyarrow.parquet.read_schema)
+        reference_names: Correct names, e.g. codebook SAS variable names or LLCP2023.parquet's columns
+
+    Returns:
+        Dictionary mapping stored names to corrected names
+    """
+    column_names = list(column_names)
+    present = set(column_names)
+    aliases = {}
+    for col in column_names:
+        if not col.startswith('X_'):
+            continue
+        target = col[1:]
+        if target not in present and _code_column_name(target) in reference_names:
+            aliases[col] = target
+    return aliases
+
+
+def rename_schema(schema: pa.Schema, aliases: Dict[str, str]) -> pa.Schema:
+    """
+    Rename fields of an Arrow schema, keeping types and updating pandas metadata.
+
+    Args:
+        schema: Schema to rename
+        aliases: Mapping of old to new field names
+
+    Returns:
+        Schema with renamed fields and matching b'pandas' metadata
+    """
+    fields = [field.with_name(aliases.get(field.name, field.name)) for field in schema]
+    metadata = dict(schema.metadata or {})
+    if b'pandas' in metadata:
+        pandas_metadata = json.loads(metadata[b'pandas'])
+        for column in pandas_metadata.get('columns', []):
+            for key in ('name', 'field_name'):
+                if column.get(key) in aliases:
+                    column[key] = aliases[column[key]]
+        metadata[b'pandas'] = json.dumps(pandas_metadata).encode()
+    return pa.schema(fields, metadata=metadata or None)
+
+
+def alias_expression(expression: pc.Expression, schema: pa.Schema, aliases: Dict[str, str]) -> pc.Expression:
+    """
+    Rebind a filter expression that names aliased columns to the stored schema.
+
+    pyarrow expressions cannot be walked from Python, so the expression is
+    bound to the renamed schema through Substrait, which replaces each field
+    name with the column's position. Renaming keeps positions, so the result
+    selects the stored columns wherever it is evaluated against the whole file
+    schema (dataset scans and pandas.read_parquet filters). An expression that
+    already names stored columns is returned unchanged.
+
+    Args:
+        expression: Filter expression using exposed (aliased) or stored names
+        schema: Schema of the file as stored
+        aliases: Mapping of stored names to exposed names, from x_prefix_aliases
+
+    Returns:
+        Expression that evaluates against the stored schema
+
+    Raises:
+        ValueError: If the expression names columns in neither schema, or mixes
+            stored and exposed names of aliased columns
+    """
+    try:
+        # Binding against an empty table checks the names without reading data
+        schema.empty_table().filter(expression)
+        return expression
+    except pa.ArrowException:
+        pass
+    try:
+        return pc.Expression.from_substrait(expression.to_substrait(rename_schema(schema, aliases)))
+    except pa.ArrowException as e:
+        # Arrow appends the whole schema to the message; keep the part naming the field
+        reason = str(e).splitlines()[0].split(' in ')[0]
+        raise ValueError(f"Cannot apply filter {expression}: {reason}. Name columns either all by their "
+                         f"codebook names (_STATE) or all as stored (X_STATE)") from e
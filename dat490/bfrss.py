@@ -7,13 +7,39 @@ import os
 import logging
 import pandas as pd
 import numpy as np
+import pyarrow as pa
+import pyarrow.compute as pc
+import pyarrow.dataset as ds
+import pyarrow.parquet as pq
 from pathlib import Path
-from typing import Dict, List, Optional, Union, Any, Tuple
-from .parser import parse_codebook_html, ColumnMetadata, ValueRange
+from typing import Dict, Iterator, List, Optional, Sequence, Union, Any, Tuple
+from .parser import parse_codebook_html, ColumnMetadata, ValueRange, NumericStatistics, CategoricalStatistics
+from .statistics import add_statistics, add_column_statistics
+from .accumulators import accumulate_statistics, parquet_statistics
+from .cache import MetadataCache, ArrowDataCache, metadata_cache_key, schema_cache_key, data_cache_key
+from .lookup import ValueRangeIndex
+from .nulls import column_semantic_null_intervals, apply_semantic_nulls, apply_semantic_nulls_arrow
+from .filters import FilterValue, build_row_filter
+from .dtypes import compact_frame, summarize_compaction
+from .desc import DescFrame, _code_column_name
+from .aliases import alias_expression, x_prefix_aliases
+from .catalog import DatasetSummary, default_catalog
 
 # Configure logger for this module
 logger = logging.getLogger(__name__)
 
+# Named column selections accepted by BFRSS(columns=...) and load_columns()
+COLUMN_PRESETS = ('all', 'codes')
+
+# DataFrame backends accepted by BFRSS(backend=...)
+DATA_BACKENDS = ('numpy', 'arrow')
+
+# Batch types yielded by BFRSS.iter_batches(output=...)
+BATCH_OUTPUTS = ('pandas', 'arrow')
+
+# Rows per batch in BFRSS.iter_batches
+DEFAULT_BATCH_SIZE = 65_536
+
 
 def setup_bfrss_logger(level: int = logging.INFO) -> logging.Logger:
     """
@@ -51,13 +77,44 @@ def setup_bfrss_logger(level: int = logging.INFO) -> logging.Logger:
     return bfrss_logger
 
 
+def _arrow_types_mapper(arrow_type: pa.DataType) -> Optional[pd.ArrowDtype]:
+    """
+    Map Arrow columns to pyarrow-backed pandas dtypes, wrapping the buffers without copying.
+    
+    Dictionary columns keep the default conversion to pandas Categorical,
+    which only materializes their small integer codes.
+    """
+    if pa.types.is_dictionary(arrow_type):
+        return None
+    return pd.ArrowDtype(arrow_type)
+
+
+def copy_on_write_enabled() -> bool:
+    """Return True if pandas copy-on-write mode is active."""
+    return pd.options.mode.copy_on_write is True
+
+
+def enable_copy_on_write() -> None:
+    """
+    Turn on pandas copy-on-write for the process.
+    
+    Under copy-on-write every DataFrame derived from another behaves as a copy,
+    but the data is only duplicated when one side is modified. Chained assignment
+    such as df[col][mask] = value no longer writes through; use df.loc instead.
+    """
+    if not copy_on_write_enabled():
+        pd.set_option('mode.copy_on_write', True)
+        logger.debug("Enabled pandas copy-on-write")
+
+
 class BFRSS:
     """
     Wrapper class for BRFSS data and metadata.
     
     Provides methods for:
     - Loading and accessing BRFSS data
-    - Parsing and accessing codebook metadata
+    - Parsing and accessing codebook metadata (schema without loading data,
+      statistics lazily per column or in bulk)
     - Looking up value descriptions
     - Filtering columns by sections
     - Converting semantic nulls to NaN
@@ -68,7 +125,18 @@ class BFRSS:
                  codebook_path: Optional[Union[str, Path]] = None,
                  exclude_desc_columns: bool = True,
                  semantically_null: bool = False,
-                 root_dir: Optional[Union[str, Path]] = None):
+                 root_dir: Optional[Union[str, Path]] = None,
+                 use_cache: bool = True,
+                 cache_dir: Optional[Union[str, Path]] = None,
+                 statistics_workers: Optional[int] = None,
+                 columns: Optional[Union[str, List[str]]] = None,
+                 sections: Optional[List[str]] = None,
+                 filters: Optional[Union[Dict[str, FilterValue], pc.Expression]] = None,
+                 backend: str = 'numpy',
+                 compact: bool = False,
+                 virtual_desc: bool = True,
+                 column_aliases: bool = True,
+                 streaming_statistics: bool = False):
         """
         Initialize BFRSS wrapper.
         
@@ -78,7 +146,37 @@ class BFRSS:
             exclude_desc_columns: Whether to exclude _DESC columns from metadata generation
             semantically_null: Whether to convert values marked as indicates_missing to NaN
             root_dir: Root directory to search for data files (optional)
+            use_cache: Whether to load/store parsed metadata in the on-disk metadata cache
+            cache_dir: Directory for the metadata cache (default: ~/.cache/dat490)
+            statistics_workers: Threads used to compute column statistics (default: up to 8, one per core)
+            columns: Columns to load: a list of names or a preset from COLUMN_PRESETS
+                ('codes' skips every _DESC column). Default loads all columns.
+            sections: Only load columns whose codebook section_name is in this list
+                (with their _DESC columns unless columns='codes')
+            filters: Row filter pushed into the parquet scan, either a mapping of column
+                names to codes/descriptions (see dat490.filters.build_row_filter), e.g.
+                {'_STATE': [4, 6], 'SEXVAR': 'Female'}, or a pyarrow expression naming
+                columns as exposed (_STATE) or, with column_aliases, as stored (X_STATE)
+            backend: 'numpy' reads the parquet file into NumPy-backed columns. 'arrow'
+                memory-maps a cached uncompressed Arrow IPC copy (built on first use, with
+                semantic nulls already applied when semantically_null is set) and exposes
+                it as a pyarrow-backed frame, so processes on one host share its pages
+            compact: Downcast coded float64 columns to the narrowest nullable integer
+                (Int8/Int16/Int32) or float32 type that holds them exactly, chosen from
+                codebook value ranges; see compaction_report (numpy backend only)
+            virtual_desc: Serve <CODE>_DESC columns that are not stored in the parquet file
+                by translating the code column on first access (see dat490.desc.DescFrame)
+            column_aliases: Expose X_-prefixed columns under their codebook names (X_STATE as
+                _STATE), mapped from the parquet footer and applied when columns are read
+            streaming_statistics: Compute metadata statistics batch by batch from the parquet
+                file (see dat490.accumulators) instead of from a loaded frame, so memory stays
+                at about one batch; used whenever df has not been loaded
         """
+        if backend not in DATA_BACKENDS:
+            raise ValueError(f"Unknown backend '{backend}'. Expected one of {DATA_BACKENDS}")
+        if compact and backend != 'numpy':
+            raise ValueError("compact dtypes require backend='numpy'; the arrow backend shares the file's own types")
+        
         # Set root directory for file searching
         self.root_dir = Path(root_dir) if root_dir else None
         
@@ -87,11 +185,34 @@ class BFRSS:
         self.codebook_path = Path(codebook_path) if codebook_path else self._find_data_file('codebook_USCODE23_LLCP_021924.HTML')
         self.exclude_desc_columns = exclude_desc_columns
         self.semantically_null = semantically_null
+        self.use_cache = use_cache
+        self.statistics_workers = statistics_workers
+        self._metadata_cache = MetadataCache(cache_dir) if use_cache else None
+        self.columns = columns
+        self.sections = sections
+        self.filters = filters
+        self.backend = backend
+        self.compact = compact
+        self.compaction_report = {}
+        self.virtual_desc = virtual_desc
+        self.use_column_aliases = column_aliases
+        self.streaming_statistics = streaming_statistics
+        self._data_cache = ArrowDataCache(cache_dir) if backend == 'arrow' else None
         
         # Lazy loading - data loaded on first access
         self._df = None
+        self._table = None
+        self._parquet_columns = None
+        self._column_aliases = None
+        self._projection = None
+        self._projection_resolved = False
+        self._row_filter = None
+        self._schema = None
         self._metadata = None
+        self._column_metadata = {}
+        self._value_indexes = {}
         self._semantic_null_mapping = None
+        self._semantic_null_intervals = None
         
     def _find_data_file(self, filename: str) -> Path:
         """Find data file in common locations."""
@@ -122,42 +243,530 @@ class BFRSS:
         """Load and return the main DataFrame (lazy loading)."""
         if self._df is None:
             logger.info(f"Loading data from {self.data_path}...")
-            self._df = pd.read_parquet(self.data_path)
+            if self.row_filter is not None:
+                logger.info(f"Filtering rows with {self.row_filter}")
+            self._df = self._wrap_frame(self._read_columns(self.projection))
             logger.info(f"Loaded {len(self._df)} rows and {len(self._df.columns)} columns")
-            
-            # Apply semantic null conversion if requested
-            if self.semantically_null:
-                self._apply_semantic_nulls()
                 
         return self._df
     
+    def _wrap_frame(self, df: pd.DataFrame) -> pd.DataFrame:
+        """Wrap a loaded frame so missing _DESC columns are derived from codes, if enabled."""
+        if not self.virtual_desc:
+            return df
+        code_columns = [name for name, column_meta in self.schema.items()
+                        if any(isinstance(value_def, ValueRange) for value_def in column_meta.value_ranges)]
+        return DescFrame(df, translate=self.translate_column, code_columns=code_columns)
+    
+    @property
+    def parquet_columns(self) -> List[str]:
+        """Column names in the parquet file, from the footer via the dataset catalog, after column_aliases."""
+        if self._parquet_columns is None:
+            stored_columns = default_catalog().columns(self.data_path)
+            self._parquet_columns = [self.column_aliases.get(col, col) for col in stored_columns]
+        return self._parquet_columns
+    
+    @property
+    def column_aliases(self) -> Dict[str, str]:
+        """
+        Mapping of stored column names to the names BFRSS exposes.
+        
+        Files written with X_ in place of a leading underscore (X_STATE, X_STATE_DESC)
+        are mapped back to codebook names from the footer alone, so they need no
+        rewrite (see scripts/fix_x_prefixes.py). Empty when column_aliases=False.
+        """
+        if self._column_aliases is None:
+            self._column_aliases = {}
+            if self.use_column_aliases:
+                self._column_aliases = x_prefix_aliases(default_catalog().columns(self.data_path), self.schema)
+                if self._column_aliases:
+                    logger.info(f"Aliasing {len(self._column_aliases)} X_ columns to codebook names")
+        return self._column_aliases
+    
+    def _stored_names(self, columns: List[str]) -> List[str]:
+        """Translate exposed column names back to the names stored in the parquet file."""
+        if not self.column_aliases:
+            return columns
+        stored = {alias: col for col, alias in self.column_aliases.items()}
+        return [stored.get(col, col) for col in columns]
+    
+    @property
+    def projection(self) -> Optional[List[str]]:
+        """Columns selected by the columns/sections options, or None when loading every column."""
+        if not self._projection_resolved:
+            if self.columns is not None or self.sections is not None:
+                self._projection = self.resolve_columns(self.columns, self.sections)
+            self._projection_resolved = True
+        return self._projection
+    
+    def resolve_columns(self, columns: Optional[Union[str, List[str]]] = None,
+                        sections: Optional[List[str]] = None) -> List[str]:
+        """
+        Resolve a column selection against the parquet file.
+        
+        Args:
+            columns: A list of column names or a preset from COLUMN_PRESETS (default: 'all');
+                with virtual_desc, a _DESC name missing from the file selects its code column
+            sections: Only keep columns whose codebook section_name is in this list;
+                a _DESC column follows the section of its code column
+            
+        Returns:
+            List of column names present in the parquet file
+        """
+        available = self.parquet_columns
+        if columns is None or columns == 'all':
+            selected = list(available)
+        elif columns == 'codes':
+            selected = [col for col in available if not col.endswith('_DESC')]
+        elif isinstance(columns, str):
+            raise ValueError(f"Unknown column preset '{columns}'. Expected one of {COLUMN_PRESETS} or a list of columns")
+        else:
+            available_set = set(available)
+            selected = []
+            missing_columns = []
+            for col in columns:
+                # Stored X_ names are accepted for their aliases
+                col = self.column_aliases.get(col, col)
+                if col not in available_set and self.virtual_desc and _code_column_name(col) in available_set:
+                    # A virtual _DESC column is served from its code column
+                    col = _code_column_name(col)
+                if col not in available_set:
+                    missing_columns.append(col)
+                elif col not in selected:
+                    selected.append(col)
+            if missing_columns:
+                raise ValueError(f"Columns not found in {self.data_path}: {missing_columns}")
+        
+        if sections is not None:
+            known_sections = set(self.get_sections())
+            unknown_sections = [section for section in sections if section not in known_sections]
+            if unknown_sections:
+                raise ValueError(f"Unknown sections: {unknown_sections}")
+            section_columns = {name for name, column_meta in self.schema.items() if column_meta.section_name in sections}
+            selected = [col for col in selected if _code_column_name(col) in section_columns]
+        
+        return selected
+    
+    @property
+    def row_filter(self) -> Optional[pc.Expression]:
+        """The filters option as a pyarrow expression, or None when every row is loaded."""
+        if self._row_filter is None and self.filters is not None:
+            if isinstance(self.filters, pc.Expression):
+                self._row_filter = self.filters
+            else:
+                self._row_filter = build_row_filter(self.filters, self.schema)
+        return self._row_filter
+    
+    def _scan_filter(self) -> Optional[pc.Expression]:
+        """The row filter against the stored column names, for scans of the parquet file."""
+        if self.row_filter is None or not self.column_aliases:
+            return self.row_filter
+        if isinstance(self.filters, pc.Expression):
+            return alias_expression(self.filters, pq.read_schema(self.data_path), self.column_aliases)
+        stored = {alias: col for col, alias in self.column_aliases.items()}
+        return build_row_filter(self.filters, self.schema, field_names=stored)
+    
+    def validate(self) -> DatasetSummary:
+        """
+        Check paths, the column selection and the row filter before loading any data.
+        
+        Only the parquet footer (through the shared dataset catalog) and the codebook
+        are read, so problems surface in milliseconds instead of partway through a load.
+        
+        Returns:
+            Footer summary of the data file (rows, row groups, per-column statistics)
+            
+        Raises:
+            FileNotFoundError: If the data or codebook file does not exist
+            ValueError: If the data file is not valid parquet, or the columns, sections
+                or filters name something the file or codebook does not have
+        """
+        if not self.codebook_path.exists():
+            raise FileNotFoundError(f"Codebook not found: {self.codebook_path}")
+        try:
+            summary = default_catalog().summary(self.data_path)
+        except pa.ArrowException as e:
+            raise ValueError(f"{self.data_path} is not a readable parquet file: {e}") from e
+        
+        # Resolving the projection checks columns and sections against the footer
+        self.projection
+        if isinstance(self.filters, pc.Expression):
+            # Checks the expression's column names against the footer schema
+            alias_expression(self.filters, pq.read_schema(self.data_path), self.column_aliases)
+        elif self.filters is not None:
+            available = set(self.parquet_columns)
+            missing_columns = [col for col in self.filters if col not in available]
+            if missing_columns:
+                raise ValueError(f"Filter columns not found in {self.data_path}: {missing_columns}")
+            self.row_filter
+        
+        logger.info(f"Validated {self.data_path}: {summary.num_rows} rows, {len(summary.columns)} columns, "
+                    f"{summary.num_row_groups} row groups")
+        return summary
+    
+    def _read_columns(self, columns: Optional[List[str]]) -> pd.DataFrame:
+        """
+        Read columns with the projection and row filter pushed into pyarrow.
+        
+        Semantic null conversion is applied when enabled (the arrow backend's
+        cached copy already has it applied), followed by dtype compaction.
+        """
+        if self.backend == 'arrow':
+            table = self.arrow_table
+            if columns is not None:
+                table = table.select(columns)
+            if self.row_filter is not None:
+                table = table.filter(self.row_filter)
+            return table.to_pandas(types_mapper=_arrow_types_mapper)
+        
+        # The parquet scan sees stored names
+        if self.column_aliases and columns is not None:
+            columns = self._stored_names(columns)
+        df = pd.read_parquet(self.data_path, columns=columns, filters=self._scan_filter())
+        if self.column_aliases:
+            df.columns = [self.column_aliases.get(col, col) for col in df.columns]
+        if self.semantically_null:
+            self._apply_semantic_nulls(df)
+        if self.compact:
+            _, report = compact_frame(df, self.schema)
+            self.compaction_report.update(report)
+            logger.info(summarize_compaction(report))
+        return df
+    
+    @property
+    def arrow_table(self) -> pa.Table:
+        """
+        The memory-mapped Arrow table behind the arrow backend.
+        
+        The parquet file is converted to an uncompressed Arrow IPC file in the
+        cache directory on first use; later loads, in this or any other process,
+        map that file without decoding.
+        """
+        if self._table is None:
+            if self._data_cache is None:
+                raise ValueError("arrow_table requires backend='arrow'")
+            key = data_cache_key(self.data_path, self.codebook_path if self.semantically_null else None)
+            self._table = self._data_cache.load(key)
+            if self._table is None:
+                logger.info(f"Building Arrow IPC cache of {self.data_path}...")
+                table = pq.read_table(self.data_path)
+                if self.semantically_null:
+                    # The cached copy keeps the stored column names; aliases are applied on load
+                    intervals = self.get_semantic_null_intervals()
+                    stored_intervals = {col: intervals[alias] for col, alias in self.column_aliases.items() if alias in intervals}
+                    table, conversions = apply_semantic_nulls_arrow(table, {**intervals, **stored_intervals})
+                    logger.info(f"Converted {sum(conversions.values())} total semantic null values to null")
+                path = self._data_cache.store(key, table)
+                del table
+                # Re-open through the memory map so the decoded copy is released
+                self._table = self._data_cache.load(key)
+                logger.info(f"Wrote Arrow IPC cache to {path}")
+            else:
+                logger.info(f"Memory-mapped Arrow IPC cache for {self.data_path}")
+            if self.column_aliases:
+                self._table = self._table.rename_columns([self.column_aliases.get(col, col)
+                                                          for col in self._table.column_names])
+        return self._table
+    
+    def load_columns(self, columns: Optional[Union[str, List[str]]] = None,
+                     sections: Optional[List[str]] = None) -> pd.DataFrame:
+        """
+        Add columns to the loaded DataFrame, reading only those not already present.
+        
+        Semantic null conversion is applied to the new columns when enabled.
+        
+        Args:
+            columns: A list of column names or a preset from COLUMN_PRESETS
+            sections: Only add columns whose codebook section_name is in this list
+            
+        Returns:
+            The DataFrame with the requested columns added
+        """
+        loaded_columns = self._df.columns if self._df is not None else []
+        new_columns = [col for col in self.resolve_columns(columns, sections) if col not in loaded_columns]
+        if not new_columns:
+            return self.df
+        
+        logger.info(f"Loading {len(new_columns)} additional columns from {self.data_path}...")
+        added = self._read_columns(new_columns)
+        if self._df is None:
+            self._df = added
+        else:
+            # The same row filter is applied, so rows line up with the loaded frame
+            added.index = self._df.index
+            self._df = pd.concat([self._df, added], axis=1, copy=False)
+        self._df = self._wrap_frame(self._df)
+        
+        # The projection now describes the widened frame; statistics for the new
+        # columns are picked up on the next metadata or get_column_info call
+        loaded_all = len(self._df.columns) == len(self.parquet_columns)
+        self._projection = None if loaded_all else list(self._df.columns)
+        self._projection_resolved = True
+        self._metadata = None
+        for col in new_columns:
+            self._column_metadata.pop(col, None)
+        return self._df
+    
+    def iter_batches(self, columns: Optional[Union[str, List[str]]] = None,
+                     sections: Optional[List[str]] = None,
+                     batch_size: int = DEFAULT_BATCH_SIZE,
+                     output: str = 'pandas',
+                     translate: Union[bool, List[str]] = False) -> Iterator[Union[pd.DataFrame, pa.RecordBatch]]:
+        """
+        Stream the data in batches straight from the parquet reader.
+        
+        Only one batch is decoded at a time, so single-pass jobs (counts,
+        validation, export) run in memory bounded by batch_size whatever the
+        file size. Nothing is cached on the instance and df is not loaded. The
+        projection, row filter and column aliases apply as for df, and semantic
+        nulls are converted per batch when semantically_null is set. Batches
+        come from the parquet file with either backend; compact dtypes are not
+        applied, since compact_dtype chooses types from the values in the frame.
+        
+        Args:
+            columns: A list of column names or a preset from COLUMN_PRESETS (default:
+                the instance's columns/sections selection). _DESC names missing from the
+                file are translated from their code column, as in df
+            sections: Only keep columns whose codebook section_name is in this list
+            batch_size: Maximum rows per batch; batches can be shorter at row group
+                boundaries and after filtering
+            output: 'pandas' yields DataFrames, 'arrow' yields pyarrow RecordBatches
+            translate: Add a <CODE>_DESC description column for these code columns
+                (True: every selected column with codebook value definitions), built
+                with translate_column. Categories are the codebook descriptions plus
+                "Missing" and "Unknown code" labels seen in that batch
+            
+        Yields:
+            One DataFrame or RecordBatch per non-empty batch
+        """
+        if output not in BATCH_OUTPUTS:
+            raise ValueError(f"Unknown output '{output}'. Expected one of {BATCH_OUTPUTS}")
+        if batch_size < 1:
+            raise ValueError("batch_size must be positive")
+        
+        if columns is None and sections is None:
+            selected = self.projection if self.projection is not None else list(self.parquet_columns)
+        else:
+            selected = self.resolve_columns(columns, sections)
+        
+        # Columns to describe: requested virtual _DESC names plus the translate option
+        available = set(self.parquet_columns)
+        if translate is True:
+            describe = [col for col in selected if col in self.schema and f"{col}_DESC" not in selected
+                        and any(isinstance(value_def, ValueRange) for value_def in self.schema[col].value_ranges)]
+        else:
+            describe = [self.column_aliases.get(col, col) for col in (translate or [])]
+            unknown = [col for col in describe if col not in selected]
+            if unknown:
+                raise ValueError(f"Columns to translate are not selected: {unknown}")
+        # Stored description columns are passed through rather than replaced
+        describe = [col for col in describe if f"{col}_DESC" not in selected]
+        if self.virtual_desc and isinstance(columns, list):
+            for col in columns:
+                col = self.column_aliases.get(col, col)
+                if col not in available and _code_column_name(col) in available and _code_column_name(col) not in describe:
+                    describe.append(_code_column_name(col))
+        
+        row_filter = self._scan_filter()
+        stored_columns = self._stored_names(selected)
+        semantic_intervals = self.get_semantic_null_intervals() if self.semantically_null else None
+        
+        for batch in self._stream_batches(stored_columns, row_filter, batch_size):
+            if self.column_aliases:
+                batch = batch.rename_columns(selected)
+            if semantic_intervals is not None:
+                table, _ = apply_semantic_nulls_arrow(pa.Table.from_batches([batch]), semantic_intervals)
+                batch = table.combine_chunks().to_batches()[0]
+            if output == 'arrow':
+                for col in describe:
+                    labels = self.translate_column(col, batch.column(col).to_pandas())
+                    batch = batch.append_column(f"{col}_DESC", pa.array(labels))
+                yield batch
+            else:
+                df = batch.to_pandas()
+                for col in describe:
+                    df[f"{col}_DESC"] = self.translate_column(col, df[col])
+                yield df
+    
+    def _stream_batches(self, stored_columns: List[str], row_filter: Optional[pc.Expression],
+                        batch_size: int) -> Iterator[pa.RecordBatch]:
+        """
+        Yield non-empty record batches of stored columns matching row_filter.
+        
+        ParquetFile.iter_batches decodes a row group a batch at a time, where the
+        dataset scanner decodes whole row groups (the 2023 file has a single
+        433k-row row group). Filters given as a mapping are applied per batch,
+        after row groups ruled out by footer statistics are skipped; their
+        columns are read alongside and dropped. A pyarrow expression names columns
+        that cannot be listed up front, so it goes through the dataset scanner.
+        """
+        if row_filter is not None and isinstance(self.filters, pc.Expression):
+            dataset = ds.dataset(self.data_path, format='parquet')
+            for batch in dataset.to_batches(columns=stored_columns, filter=row_filter, batch_size=batch_size,
+                                            batch_readahead=1, fragment_readahead=1):
+                if batch.num_rows:
+                    yield batch
+            return
+        
+        parquet_file = pq.ParquetFile(self.data_path, pre_buffer=False)
+        row_groups = None
+        read_columns = stored_columns
+        if row_filter is not None:
+            fragment = next(iter(ds.dataset(self.data_path, format='parquet').get_fragments()))
+            row_groups = [piece.row_groups[0].id for piece in fragment.split_by_row_group(filter=row_filter)]
+            filter_columns = self._stored_names(list(self.filters))
+            read_columns = stored_columns + [col for col in filter_columns if col not in stored_columns]
+        if row_groups == []:
+            return
+        for batch in parquet_file.iter_batches(batch_size=batch_size, row_groups=row_groups, columns=read_columns):
+            if row_filter is not None:
+                # RecordBatch.filter fails when no row matches; Table.filter returns an empty table
+                table = pa.Table.from_batches([batch]).filter(row_filter).select(stored_columns)
+                if table.num_rows == 0:
+                    continue
+                batch = table.combine_chunks().to_batches()[0]
+            if batch.num_rows:
+                yield batch
+    
+    def _load_cached(self, cache_key: Optional[str]) -> Optional[Dict[str, ColumnMetadata]]:
+        """Return metadata from the on-disk cache, or None on a miss or when caching is disabled."""
+        if cache_key is None:
+            return None
+        return self._metadata_cache.load(cache_key)
+    
+    def _store_cached(self, cache_key: Optional[str], metadata: Dict[str, ColumnMetadata]) -> None:
+        """Write metadata to the on-disk cache if caching is enabled."""
+        if cache_key is None:
+            return
+        try:
+            self._metadata_cache.store(cache_key, metadata)
+        except OSError as e:
+            logger.warning(f"Could not write metadata cache: {e}")
+    
+    @property
+    def schema(self) -> Dict[str, ColumnMetadata]:
+        """
+        Parse and return codebook metadata without statistics (lazy loading).
+        
+        Labels, sections, questions and value definitions come from the codebook
+        alone, so this never loads the data. Value range counts are 0 and
+        statistics are None; use metadata or get_column_info for those.
+        """
+        if self._schema is None:
+            cache_key = schema_cache_key(self.codebook_path) if self._metadata_cache is not None else None
+            self._schema = self._load_cached(cache_key)
+            if self._schema is not None:
+                logger.info(f"Loaded schema for {len(self._schema)} columns from cache")
+            else:
+                logger.info(f"Parsing codebook schema from {self.codebook_path}...")
+                self._schema = parse_codebook_html(self.codebook_path)
+                logger.info(f"Parsed schema for {len(self._schema)} columns")
+                self._store_cached(cache_key, self._schema)
+        return self._schema
     
     @property
     def metadata(self) -> Dict[str, ColumnMetadata]:
-        """Parse and return metadata (lazy loading)."""
+        """Return metadata with statistics for every column (lazy loading, requires the data)."""
         if self._metadata is None:
-            logger.info(f"Parsing codebook from {self.codebook_path}...")
+            cache_key = None
+            if self._metadata_cache is not None:
+                cache_key = metadata_cache_key(self.codebook_path, self.data_path,
+                                               self.exclude_desc_columns, self.semantically_null,
+                                               self.projection, self.row_filter,
+                                               streaming=self.streaming_statistics and self._df is None,
+                                               column_aliases=self.column_aliases)
+            self._metadata = self._load_cached(cache_key)
+            if self._metadata is not None:
+                logger.info(f"Loaded metadata for {len(self._metadata)} columns from cache")
+                return self._metadata
             
-            # Determine which DataFrame to use for statistics
-            df_for_stats = self.df
+            # Statistics cover the loaded columns; without a loaded frame only those
+            # columns are read, skipping _DESC data entirely when it is excluded
+            if self._df is None and self.streaming_statistics:
+                self._metadata = self._stream_statistics()
+                self._store_cached(cache_key, self._metadata)
+                return self._metadata
+            if self._df is not None:
+                df_for_stats = self._df
+            else:
+                stat_columns = self.projection if self.projection is not None else self.parquet_columns
+                if self.exclude_desc_columns:
+                    stat_columns = [col for col in stat_columns if not col.endswith('_DESC')]
+                df_for_stats = self._read_columns(stat_columns)
             if self.exclude_desc_columns:
                 # Filter out _DESC columns for statistics calculation
                 non_desc_columns = [col for col in df_for_stats.columns if not col.endswith('_DESC')]
+                if len(non_desc_columns) < len(df_for_stats.columns):
+                    logger.info(f"Excluding {len(df_for_stats.columns) - len(non_desc_columns)} _DESC columns from metadata generation")
                 df_for_stats = df_for_stats[non_desc_columns]
-                logger.info(f"Excluding {len(self.df.columns) - len(non_desc_columns)} _DESC columns from metadata generation")
             
-            self._metadata = parse_codebook_html(self.codebook_path, df_for_stats)
-            logger.info(f"Parsed metadata for {len(self._metadata)} columns")
+            logger.info("Computing column statistics...")
+            self._metadata = add_statistics(self.schema, df_for_stats, max_workers=self.statistics_workers)
+            logger.info(f"Computed metadata for {len(self._metadata)} columns")
+            
+            self._store_cached(cache_key, self._metadata)
         return self._metadata
     
+    def _stream_statistics(self) -> Dict[str, ColumnMetadata]:
+        """Compute metadata statistics from the parquet file without loading df."""
+        stat_columns = self.projection if self.projection is not None else self.parquet_columns
+        stat_columns = [col for col in stat_columns if col in self.schema]
+        logger.info(f"Computing column statistics for {len(stat_columns)} columns from {self.data_path} in batches...")
+        if self.row_filter is None:
+            # Footer statistics describe whole row groups, so they only apply unfiltered
+            metadata = parquet_statistics(self.data_path, self.schema, columns=stat_columns,
+                                          semantic_null_intervals_by_column=self.get_semantic_null_intervals() if self.semantically_null else None,
+                                          column_aliases=self.column_aliases)
+        else:
+            metadata = accumulate_statistics(self.schema, self.iter_batches(columns=stat_columns))
+        logger.info(f"Computed metadata for {len(metadata)} columns")
+        return metadata
+    
+    def get_column_statistics(self, column_name: str) -> Optional[Union[NumericStatistics, CategoricalStatistics]]:
+        """
+        Get statistics for a single column, computing them on first request.
+        
+        Args:
+            column_name: The column name (SAS variable name)
+            
+        Returns:
+            Statistics for the column, or None if it is not in the codebook or the data
+        """
+        column_meta = self.get_column_info(column_name)
+        return column_meta.statistics if column_meta else None
+    
     def cloneDF(self) -> pd.DataFrame:
-        """Return a copy of the DataFrame."""
-        return self.df.copy()
+        """
+        Return a copy of the DataFrame.
+        
+        With pandas copy-on-write enabled the copy is lazy: both frames share
+        column data until one of them is modified, so no memory is spent up front.
+        Otherwise this is an eager deep copy.
+        """
+        if copy_on_write_enabled():
+            return self._wrap_frame(self.df.copy(deep=False))
+        return self._wrap_frame(self.df.copy())
     
     def cloneMetadata(self) -> Dict[str, ColumnMetadata]:
         """Return a copy of the metadata dictionary."""
         return self.metadata.copy()
     
+    def get_value_index(self, column_name: str) -> Optional[ValueRangeIndex]:
+        """
+        Get the compiled value range index for a column, building it on first use.
+        
+        Args:
+            column_name: The column name (SAS variable name)
+            
+        Returns:
+            ValueRangeIndex or None if the column is not in the codebook
+        """
+        if column_name not in self._value_indexes:
+            if column_name not in self.schema:
+                return None
+            self._value_indexes[column_name] = ValueRangeIndex.from_column(self.schema[column_name])
+        return self._value_indexes[column_name]
+    
     def lookup_value(self, column_name: str, value: Union[int, float, None]) -> str:
         """
         Look up the description for a specific value in a column.
@@ -169,24 +778,22 @@ class BFRSS:
         Returns:
             Description string or "Unknown" if not found
         """
-        if column_name not in self.metadata:
+        value_index = self.get_value_index(column_name)
+        if value_index is None:
             return f"Column {column_name} not found"
         
         if pd.isna(value):
             return "Missing"
         
-        column_meta = self.metadata[column_name]
-        
         # Try to convert to int if possible
         try:
             value_int = int(value)
         except (TypeError, ValueError):
             return f"Unknown value: {value}"
         
-        # Search through value ranges
-        for val_def in column_meta.value_ranges:
-            if isinstance(val_def, ValueRange) and val_def.start <= value_int <= val_def.end:
-                return val_def.description
+        description = value_index.lookup(value_int)
+        if description is not None:
+            return description
         
         return f"Unknown code: {value}"
     
@@ -194,19 +801,72 @@ class BFRSS:
         """
         Translate all values in a column to their descriptions.
         
+        Numeric columns are mapped to category codes in one vectorized pass over the
+        column's ValueRangeIndex. Categories are the codebook descriptions in codebook
+        order, followed by "Missing" and "Unknown code: ..." labels when those occur.
+        Other dtypes fall back to lookup_value per element.
+        
         Args:
             column_name: The column name to translate
             series: Optional series to translate. If None, uses the column from the main DataFrame
             
         Returns:
-            Series with translated values
+            Categorical Series with translated values
         """
         if series is None:
             if column_name not in self.df.columns:
                 raise ValueError(f"Column {column_name} not found in DataFrame")
             series = self.df[column_name]
         
-        return series.apply(lambda x: self.lookup_value(column_name, x))
+        value_index = self.get_value_index(column_name)
+        if value_index is None or not pd.api.types.is_numeric_dtype(series.dtype):
+            return series.apply(lambda x: self.lookup_value(column_name, x)).astype('category')
+        
+        values = series.to_numpy(dtype='float64', na_value=np.nan)
+        codes = value_index.lookup_codes(values)
+        categories = list(value_index.descriptions)
+        
+        missing = np.isnan(values)
+        if missing.any():
+            if "Missing" not in categories:
+                categories.append("Missing")
+            codes[missing] = categories.index("Missing")
+        
+        # Unmatched codes get one category per distinct value, labelled as lookup_value would
+        unknown = (codes < 0) & ~missing
+        if unknown.any():
+            positions, uniques = pd.factorize(series.iloc[unknown])
+            labels = [f"Unknown code: {value}" for value in uniques]
+            label_codes = np.empty(len(labels), dtype='int32')
+            for i, label in enumerate(labels):
+                if label not in categories:
+                    categories.append(label)
+                label_codes[i] = categories.index(label)
+            codes[unknown] = label_codes[positions]
+        
+        translated = pd.Categorical.from_codes(codes, categories=categories)
+        return pd.Series(translated, index=series.index, name=series.name)
+    
+    def translate_columns(self, column_names: List[str], df: Optional[pd.DataFrame] = None) -> pd.DataFrame:
+        """
+        Translate several columns to their descriptions in one call.
+        
+        Args:
+            column_names: The column names to translate
+            df: Optional DataFrame to translate from. If None, uses the main DataFrame
+            
+        Returns:
+            DataFrame of Categorical columns, one per requested column, with the source index
+        """
+        if df is None:
+            df = self.df
+        
+        missing_columns = [name for name in column_names if name not in df.columns]
+        if missing_columns:
+            raise ValueError(f"Columns not found in DataFrame: {missing_columns}")
+        
+        return pd.DataFrame({name: self.translate_column(name, df[name]) for name in column_names},
+                            index=df.index)
     
     def get_columns_by_section(self, section_name: Optional[str] = None) -> List[str]:
         """
@@ -221,7 +881,7 @@ class BFRSS:
         if section_name is None:
             # Return all columns grouped by section
             sections = {}
-            for col_name, col_meta in self.metadata.items():
+            for col_name, col_meta in self.schema.items():
                 section = col_meta.section_name or "No Section"
                 if section not in sections:
                     sections[section] = []
@@ -231,21 +891,36 @@ class BFRSS:
             # Return columns for specific section
             return [
                 col_name 
-                for col_name, col_meta in self.metadata.items() 
+                for col_name, col_meta in self.schema.items() 
                 if col_meta.section_name == section_name
             ]
     
     def get_sections(self) -> List[str]:
         """Get list of all unique section names."""
         sections = set()
-        for col_meta in self.metadata.values():
+        for col_meta in self.schema.values():
             if col_meta.section_name:
                 sections.add(col_meta.section_name)
         return sorted(list(sections))
     
     def get_column_info(self, column_name: str) -> Optional[ColumnMetadata]:
-        """Get metadata for a specific column."""
-        return self.metadata.get(column_name)
+        """
+        Get metadata with statistics for a specific column.
+        
+        Uses the bulk metadata if it is already available, otherwise computes
+        statistics for just this column and remembers them.
+        """
+        if self._metadata is not None:
+            return self._metadata.get(column_name)
+        
+        if column_name not in self._column_metadata:
+            column_meta = self.schema.get(column_name)
+            if column_meta is None:
+                return None
+            if column_name in self.df.columns:
+                column_meta = add_column_statistics(column_meta, self.df[column_name])
+            self._column_metadata[column_name] = column_meta
+        return self._column_metadata[column_name]
     
     def search_columns(self, search_term: str, in_label: bool = True, in_question: bool = True) -> List[str]:
         """
@@ -262,7 +937,7 @@ class BFRSS:
         search_term = search_term.lower()
         matches = []
         
-        for col_name, col_meta in self.metadata.items():
+        for col_name, col_meta in self.schema.items():
             if in_label and col_meta.label and search_term in col_meta.label.lower():
                 matches.append(col_name)
             elif in_question and col_meta.question and search_term in col_meta.question.lower():
@@ -270,13 +945,22 @@ class BFRSS:
                 
         return matches
     
-    def get_components(self) -> Tuple[pd.DataFrame, Dict[str, ColumnMetadata], logging.Logger]:
+    def get_components(self, copy_on_write: bool = False) -> Tuple[pd.DataFrame, Dict[str, ColumnMetadata], logging.Logger]:
         """
         Get DataFrame, metadata, and logger for destructured assignment.
         
+        Args:
+            copy_on_write: Enable pandas copy-on-write so the returned DataFrame is an
+                isolated lazy copy instead of an eager deep copy. This sets a process-wide
+                pandas option (the default behaviour from pandas 3.0) that stays on and
+                changes chained assignment for all other frames, so it is opt-in.
+                Copies are lazy whenever the option is already on.
+        
         Returns:
             Tuple of (DataFrame, metadata dict, logger)
         """
+        if copy_on_write:
+            enable_copy_on_write()
         logger = setup_bfrss_logger()
         return self.cloneDF(), self.cloneMetadata(), logger
     
@@ -284,28 +968,35 @@ class BFRSS:
         """
         Get values that indicate missing/null for a specific column.
         
+        This expands each missing range into its individual codes; the conversion
+        methods test the intervals from get_semantic_null_intervals() directly.
+        
         Args:
             column_name: Name of the column
             
         Returns:
             Set of values that indicate missing data
         """
-        if column_name not in self.metadata:
+        intervals = self.get_semantic_null_intervals().get(column_name)
+        if intervals is None:
             return set()
-            
+        
         missing_values = set()
-        column_meta = self.metadata[column_name]
-        
-        # Check value_ranges for values marked as indicates_missing=True
-        for value_def in column_meta.value_ranges:
-            if hasattr(value_def, 'indicates_missing') and value_def.indicates_missing:
-                if hasattr(value_def, 'start') and hasattr(value_def, 'end'):
-                    # ValueRange - add all values in the range
-                    for val in range(value_def.start, value_def.end + 1):
-                        missing_values.add(val)
-                        
+        for start, end in intervals.tolist():
+            missing_values.update(range(start, end + 1))
         return missing_values
     
+    def get_semantic_null_intervals(self) -> Dict[str, np.ndarray]:
+        """
+        Get mapping of all columns to their semantic null intervals.
+        
+        Returns:
+            Dictionary mapping column names to int64 arrays of inclusive [start, end] pairs
+        """
+        if self._semantic_null_intervals is None:
+            self._semantic_null_intervals = column_semantic_null_intervals(self.schema)
+        return self._semantic_null_intervals
+    
     def get_semantic_null_mapping(self) -> Dict[str, set]:
         """
         Get mapping of all columns to their semantic null values.
@@ -315,33 +1006,20 @@ class BFRSS:
         """
         if self._semantic_null_mapping is None:
             self._semantic_null_mapping = {}
-            for col_name in self.metadata:
-                missing_vals = self.get_semantic_null_values(col_name)
-                if missing_vals:
-                    self._semantic_null_mapping[col_name] = missing_vals
+            for col_name in self.get_semantic_null_intervals():
+                self._semantic_null_mapping[col_name] = self.get_semantic_null_values(col_name)
                     
         return self._semantic_null_mapping
     
-    def _apply_semantic_nulls(self) -> None:
-        """Apply semantic null conversion to the internal DataFrame."""
+    def _apply_semantic_nulls(self, df: pd.DataFrame) -> None:
+        """Apply semantic null conversion in place to a freshly read DataFrame."""
         logger.info("Applying semantic null conversion...")
         
-        # Get mapping of columns to missing values
-        semantic_mapping = self.get_semantic_null_mapping()
-        
-        # Apply conversions
-        total_conversions = 0
-        for col_name, missing_values in semantic_mapping.items():
-            if col_name in self._df.columns:
-                # Count how many values will be converted
-                count_before = self._df[col_name].isin(missing_values).sum()
-                if count_before > 0:
-                    # Replace missing indicator values with NaN
-                    self._df.loc[self._df[col_name].isin(missing_values), col_name] = np.nan
-                    total_conversions += count_before
-                    logger.debug(f"Converted {count_before} semantic nulls in column {col_name}")
+        _, conversions = apply_semantic_nulls(df, self.get_semantic_null_intervals())
+        for col_name, count in conversions.items():
+            logger.debug(f"Converted {count} semantic nulls in column {col_name}")
         
-        logger.info(f"Converted {total_conversions} total semantic null values to NaN")
+        logger.info(f"Converted {sum(conversions.values())} total semantic null values to NaN")
     
     def convert_semantic_nulls(self, df: pd.DataFrame, columns: Optional[List[str]] = None) -> pd.DataFrame:
         """
@@ -355,32 +1033,15 @@ class BFRSS:
             DataFrame with semantic nulls converted to NaN
         """
         # Work on a copy
-        df_converted = df.copy()
-        
-        # Get columns to process
-        if columns is None:
-            columns = [col for col in df_converted.columns if col in self.metadata]
-        else:
-            # Validate columns exist
-            columns = [col for col in columns if col in df_converted.columns and col in self.metadata]
-        
-        # Get semantic null mapping
-        semantic_mapping = self.get_semantic_null_mapping()
-        
-        # Apply conversions
-        for col_name in columns:
-            if col_name in semantic_mapping:
-                missing_values = semantic_mapping[col_name]
-                # Replace missing indicator values with NaN
-                mask = df_converted[col_name].isin(missing_values)
-                if mask.any():
-                    df_converted.loc[mask, col_name] = np.nan
-                    logger.debug(f"Converted {mask.sum()} semantic nulls in column {col_name}")
+        df_converted, conversions = apply_semantic_nulls(df.copy(), self.get_semantic_null_intervals(), columns)
+        for col_name, count in conversions.items():
+            logger.debug(f"Converted {count} semantic nulls in column {col_name}")
         
         return df_converted
 
 
-def load_bfrss(exclude_desc_columns: bool = True, semantically_null: bool = False, root_dir: Optional[Union[str, Path]] = None) -> BFRSS:
+def load_bfrss(exclude_desc_columns: bool = True, semantically_null: bool = False, root_dir: Optional[Union[str, Path]] = None,
+               filters: Optional[Union[Dict[str, FilterValue], pc.Expression]] = None) -> BFRSS:
     """
     Convenience function to load BFRSS data with default settings.
     
@@ -388,14 +1049,18 @@ def load_bfrss(exclude_desc_columns: bool = True, semantically_null: bool = Fals
         exclude_desc_columns: Whether to exclude _DESC columns from metadata generation
         semantically_null: Whether to convert values marked as indicates_missing to NaN
         root_dir: Root directory to search for data files (optional)
+        filters: Row filter pushed into the parquet scan, e.g. {'_STATE': [4, 6]} (see BFRSS)
         
     Returns:
         BFRSS wrapper object
     """
-    return BFRSS(exclude_desc_columns=exclude_desc_columns, semantically_null=semantically_null, root_dir=root_dir)
+    return BFRSS(exclude_desc_columns=exclude_desc_columns, semantically_null=semantically_null, root_dir=root_dir,
+                 filters=filters)
 
 
-def load_bfrss_components(exclude_desc_columns: bool = True, semantically_null: bool = False, root_dir: Optional[Union[str, Path]] = None) -> Tuple[pd.DataFrame, Dict[str, ColumnMetadata], logging.Logger]:
+def load_bfrss_components(exclude_desc_columns: bool = True, semantically_null: bool = False, root_dir: Optional[Union[str, Path]] = None,
+                          copy_on_write: bool = False,
+                          filters: Optional[Union[Dict[str, FilterValue], pc.Expression]] = None) -> Tuple[pd.DataFrame, Dict[str, ColumnMetadata], logging.Logger]:
     """
     Convenience function to load BFRSS data and return components for destructured assignment.
     
@@ -403,6 +1068,9 @@ def load_bfrss_components(exclude_desc_columns: bool = True, semantically_null:
         exclude_desc_columns: Whether to exclude _DESC columns from metadata generation
         semantically_null: Whether to convert values marked as indicates_missing to NaN
         root_dir: Root directory to search for data files (optional)
+        copy_on_write: Turn on pandas copy-on-write for the process and hand out a lazy copy
+            instead of a deep copy (see BFRSS.get_components)
+        filters: Row filter pushed into the parquet scan, e.g. {'_STATE': [4, 6]} (see BFRSS)
         
     Returns:
         Tuple of (DataFrame, metadata dict, logger)
@@ -411,5 +1079,40 @@ def load_bfrss_components(exclude_desc_columns: bool = True, semantically_null:
         df, metadata, logger = load_bfrss_components()
         df, metadata, logger = load_bfrss_components(semantically_null=True)
     """
-    bfrss = load_bfrss(exclude_desc_columns=exclude_desc_columns, semantically_null=semantically_null, root_dir=root_dir)
-    return bfrss.get_components()
\ No newline at end of file
+    bfrss = load_bfrss(exclude_desc_columns=exclude_desc_columns, semantically_null=semantically_null, root_dir=root_dir,
+                       filters=filters)
+    return bfrss.get_components(copy_on_write=copy_on_write)
+
+
+def iter_stacked_batches(datasets: Sequence[BFRSS], columns: Optional[Union[str, List[str]]] = None,
+                         batch_size: int = DEFAULT_BATCH_SIZE, output: str = 'pandas',
+                         translate: Union[bool, List[str]] = False,
+                         source_column: Optional[str] = None) -> Iterator[Union[pd.DataFrame, pa.RecordBatch]]:
+    """
+    Stream several survey files (e.g. one per year) as one sequence of batches.
+    
+    Each dataset is read with BFRSS.iter_batches in turn, using its own codebook,
+    filters and semantic null setting, so memory stays at about one batch however
+    many years are stacked.
+    
+    Args:
+        datasets: BFRSS instances in the order to read them
+        columns: Columns to read from every dataset (default: each dataset's own selection)
+        batch_size: Maximum rows per batch
+        output: 'pandas' or 'arrow' (see BFRSS.iter_batches)
+        translate: Code columns to add _DESC columns for (see BFRSS.iter_batches)
+        source_column: If given, add a column of this name holding the data file's stem
+            (e.g. LLCP2023_desc_categorized) so rows can be traced to their year
+        
+    Yields:
+        One DataFrame or RecordBatch per non-empty batch
+    """
+    for bfrss in datasets:
+        source = bfrss.data_path.stem
+        for batch in bfrss.iter_batches(columns=columns, batch_size=batch_size, output=output, translate=translate):
+            if source_column is not None:
+                if output == 'arrow':
+                    batch = batch.append_column(source_column, pa.array([source] * batch.num_rows))
+                else:
+                    batch[source_column] = source
+            yield batch
@@ -0,0 +1,369 @@
+"""
+Metadata Cache
+Persists parsed codebook metadata, and Arrow IPC copies of the data for
+memory-mapped loading, on disk keyed by the content of their inputs. Also
+builds content keys for model results (analysis_cache_key).
+"""
+
+import os
+import hashlib
+import json
+import logging
+import pickle
+import tempfile
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Union
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pyarrow.ipc as ipc
+
+from .parser import ColumnMetadata
+
+logger = logging.getLogger(__name__)
+
+# Bump whenever parse_codebook_html output changes so stale entries are never served
+CACHE_VERSION = 1
+
+# Parquet files end with a 4-byte little-endian footer length followed by this magic
+PARQUET_MAGIC = b'PAR1'
+
+
+def default_cache_dir() -> Path:
+    """Return the default cache directory ($XDG_CACHE_HOME/dat490 or ~/.cache/dat490)."""
+    base = os.environ.get('XDG_CACHE_HOME')
+    return (Path(base) if base else Path.home() / '.cache') / 'dat490'
+
+
+def file_digest(path: Union[str, Path]) -> str:
+    """Return the SHA-256 hex digest of a file's full contents."""
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(1024 * 1024), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def parquet_fingerprint(path: Union[str, Path]) -> str:
+    """
+    Return a content fingerprint for a parquet file without reading its data pages.
+
+    The footer holds the schema, row group offsets and per-chunk statistics, so
+    hashing it together with the file size changes whenever the data does.
+    Files that are not valid parquet fall back to a full content digest.
+
+    Args:
+        path: Path to the parquet file
+
+    Returns:
+        Hex digest identifying the file contents
+    """
+    size = os.path.getsize(path)
+    with open(path, 'rb') as f:
+        if size < 12:
+            return file_digest(path)
+        f.seek(size - 8)
+        tail = f.read(8)
+        footer_length = int.from_bytes(tail[:4], 'little')
+        if tail[4:] != PARQUET_MAGIC or footer_length + 12 > size:
+            return file_digest(path)
+        f.seek(size - 8 - footer_length)
+        footer = f.read(footer_length)
+
+    digest = hashlib.sha256()
+    digest.update(str(size).encode())
+    digest.update(footer)
+    return digest.hexdigest()
+
+
+def metadata_cache_key(codebook_path: Union[str, Path], data_path: Optional[Union[str, Path]],
+                       exclude_desc_columns: bool, semantically_null: bool = False,
+                       columns: Optional[List[str]] = None, row_filter: Optional[Any] = None,
+                       streaming: bool = False, column_aliases: Optional[Dict[str, str]] = None) -> str:
+    """
+    Build the cache key for a metadata parse.
+
+    Args:
+        codebook_path: Path to the codebook HTML file
+        data_path: Path to the parquet file statistics are computed from (None if no data)
+        exclude_desc_columns: Whether _DESC columns are excluded from metadata generation
+        semantically_null: Whether statistics are computed after semantic null conversion
+        columns: Column projection statistics are computed over (None for every column)
+        row_filter: Row filter expression applied when loading (None for every row)
+        streaming: Whether statistics come from dat490.accumulators, whose mean and std can
+            differ from the in-memory ones in the last bits
+        column_aliases: Stored-to-codebook column name mapping applied when reading
+            (None or empty when the stored names are used)
+
+    Returns:
+        Hex digest combining the cache version and every input
+    """
+    parts = [
+        f"v{CACHE_VERSION}",
+        file_digest(codebook_path),
+        parquet_fingerprint(data_path) if data_path is not None else 'no-data',
+        f"exclude_desc={bool(exclude_desc_columns)}",
+        f"semantically_null={bool(semantically_null)}",
+    ]
+    # Appended only when set so keys for unprojected loads are unchanged
+    if columns is not None:
+        parts.append("columns=" + ",".join(sorted(columns)))
+    if row_filter is not None:
+        parts.append(f"filter={row_filter}")
+    if streaming:
+        parts.append("streaming")
+    if column_aliases:
+        parts.append("aliases=" + ",".join(f"{col}:{alias}" for col, alias in sorted(column_aliases.items())))
+    return hashlib.sha256('|'.join(parts).encode()).hexdigest()
+
+
+def column_digest(series: pd.Series) -> str:
+    """
+    Return the SHA-256 hex digest of a column's values.
+
+    Numeric values are hashed as float64 (so compact and nullable dtypes match
+    their float64 originals) together with the missing-value mask, which keeps
+    the digest independent of NaN payload bits. Other columns are hashed
+    through pandas' per-value hashes.
+
+    Args:
+        series: Column to hash
+
+    Returns:
+        Hex digest identifying the column contents
+    """
+    digest = hashlib.sha256()
+    digest.update(str(len(series)).encode())
+    if pd.api.types.is_numeric_dtype(series.dtype) and not pd.api.types.is_bool_dtype(series.dtype):
+        values = series.to_numpy(dtype='float64', na_value=np.nan)
+        missing = np.isnan(values)
+        digest.update(np.packbits(missing).tobytes())
+        digest.update(np.ascontiguousarray(values[~missing]).tobytes())
+    else:
+        digest.update(pd.util.hash_pandas_object(series, index=False).to_numpy().tobytes())
+    return digest.hexdigest()
+
+
+def analysis_cache_key(target_digest: str, feature_digest: str, parameters: Dict[str, Any],
+                       code_version: Union[int, str]) -> str:
+    """
+    Build the cache key for one model fitted on a target column.
+
+    Args:
+        target_digest: column_digest() of the target column
+        feature_digest: Digest of the feature block (e.g. FeatureMatrix.fingerprint())
+        parameters: Everything else the result depends on (model settings, library
+            versions, target labels); must be JSON serializable
+        code_version: Version of the analysis code, bumped when its output changes
+
+    Returns:
+        Hex digest combining the cache version and every input
+    """
+    parts = [
+        f"v{CACHE_VERSION}",
+        f"code={code_version}",
+        target_digest,
+        feature_digest,
+        json.dumps(parameters, sort_keys=True, default=str),
+    ]
+    return hashlib.sha256('|'.join(parts).encode()).hexdigest()
+
+
+def schema_cache_key(codebook_path: Union[str, Path]) -> str:
+    """Build the cache key for a schema-only parse (no statistics) of a codebook."""
+    return metadata_cache_key(codebook_path, None, exclude_desc_columns=False)
+
+
+def data_cache_key(data_path: Union[str, Path], codebook_path: Optional[Union[str, Path]] = None) -> str:
+    """
+    Build the cache key for an Arrow IPC copy of a parquet file.
+
+    Args:
+        data_path: Path to the parquet file
+        codebook_path: Codebook whose semantic nulls are baked into the copy (None for raw data)
+
+    Returns:
+        Hex digest combining the cache version and every input
+    """
+    parts = [
+        f"v{CACHE_VERSION}",
+        parquet_fingerprint(data_path),
+        f"semantic_nulls={file_digest(codebook_path) if codebook_path is not None else 'none'}",
+    ]
+    return hashlib.sha256('|'.join(parts).encode()).hexdigest()
+
+
+class MetadataCache:
+    """
+    Content-addressed on-disk store for Dict[str, ColumnMetadata].
+
+    Entries are pickled with the highest protocol, which loads far faster than
+    re-validating pydantic JSON. Because keys are derived from the input contents,
+    a changed codebook or parquet file simply misses and is parsed again.
+    """
+
+    def __init__(self, cache_dir: Optional[Union[str, Path]] = None):
+        """
+        Initialize the cache.
+
+        Args:
+            cache_dir: Directory to store entries in (default: default_cache_dir())
+        """
+        self.cache_dir = Path(cache_dir) if cache_dir else default_cache_dir()
+
+    def path_for(self, key: str) -> Path:
+        """Return the file path for a cache key."""
+        return self.cache_dir / f"metadata-{key}.pkl"
+
+    def load(self, key: str) -> Optional[Dict[str, ColumnMetadata]]:
+        """
+        Load cached metadata.
+
+        Args:
+            key: Cache key from metadata_cache_key()
+
+        Returns:
+            Metadata dictionary, or None on a miss or unreadable entry
+        """
+        path = self.path_for(key)
+        if not path.exists():
+            return None
+
+        try:
+            with open(path, 'rb') as f:
+                payload = pickle.load(f)
+        except Exception as e:
+            logger.warning(f"Ignoring unreadable metadata cache entry {path}: {e}")
+            return None
+
+        if payload.get('version') != CACHE_VERSION or payload.get('key') != key:
+            return None
+        return payload['metadata']
+
+    def store(self, key: str, metadata: Dict[str, ColumnMetadata]) -> Path:
+        """
+        Write metadata to the cache atomically.
+
+        Args:
+            key: Cache key from metadata_cache_key()
+            metadata: Metadata dictionary to store
+
+        Returns:
+            Path of the written cache entry
+        """
+        self.cache_dir.mkdir(parents=True, exist_ok=True)
+        path = self.path_for(key)
+        payload = {'version': CACHE_VERSION, 'key': key, 'metadata': metadata}
+
+        # Write to a temporary file first so concurrent readers never see a partial entry
+        fd, tmp_name = tempfile.mkstemp(dir=self.cache_dir, suffix='.tmp')
+        try:
+            with os.fdopen(fd, 'wb') as f:
+                pickle.dump(payload, f, protocol=pickle.HIGHEST_PROTOCOL)
+            os.replace(tmp_name, path)
+        except BaseException:
+            if os.path.exists(tmp_name):
+                os.unlink(tmp_name)
+            raise
+        return path
+
+    def clear(self) -> int:
+        """
+        Remove all metadata entries from the cache directory.
+
+        Returns:
+            Number of entries removed
+        """
+        removed = 0
+        if self.cache_dir.exists():
+            for path in self.cache_dir.glob('metadata-*.pkl'):
+                path.unlink()
+                removed += 1
+        return removed
+
+
+class ArrowDataCache:
+    """
+    Content-addressed on-disk store of uncompressed Arrow IPC copies of parquet data.
+
+    Entries are opened with a memory map, so the returned tables are zero-copy
+    views of the file. Every process that opens the same entry shares its pages
+    through the OS page cache instead of holding a private decoded copy.
+    """
+
+    def __init__(self, cache_dir: Optional[Union[str, Path]] = None):
+        """
+        Initialize the cache.
+
+        Args:
+            cache_dir: Directory to store entries in (default: default_cache_dir())
+        """
+        self.cache_dir = Path(cache_dir) if cache_dir else default_cache_dir()
+
+    def path_for(self, key: str) -> Path:
+        """Return the file path for a cache key."""
+        return self.cache_dir / f"data-{key}.arrow"
+
+    def load(self, key: str) -> Optional[pa.Table]:
+        """
+        Memory-map a cached table.
+
+        Args:
+            key: Cache key from data_cache_key()
+
+        Returns:
+            Table backed by the memory-mapped file, or None on a miss or unreadable entry
+        """
+        path = self.path_for(key)
+        if not path.exists():
+            return None
+
+        try:
+            return ipc.open_file(pa.memory_map(str(path), 'r')).read_all()
+        except Exception as e:
+            logger.warning(f"Ignoring unreadable data cache entry {path}: {e}")
+            return None
+
+    def store(self, key: str, table: pa.Table) -> Path:
+        """
+        Write a table to the cache atomically as an uncompressed IPC file.
+
+        Args:
+            key: Cache key from data_cache_key()
+            table: Table to store
+
+        Returns:
+            Path of the written cache entry
+        """
+        self.cache_dir.mkdir(parents=True, exist_ok=True)
+        path = self.path_for(key)
+
+        # The IPC file format allows one dictionary per column, so unify the
+        # per-chunk dictionaries of categorical columns while writing
+        options = ipc.IpcWriteOptions(unify_dictionaries=True)
+        fd, tmp_name = tempfile.mkstemp(dir=self.cache_dir, suffix='.tmp')
+        os.close(fd)
+        try:
+            with ipc.new_file(tmp_name, table.schema, options=options) as writer:
+                writer.write_table(table)
+            os.replace(tmp_name, path)
+        except BaseException:
+            if os.path.exists(tmp_name):
+                os.unlink(tmp_name)
+            raise
+        return path
+
+    def clear(self) -> int:
+        """
+        Remove all data entries from the cache directory.
+
+        Returns:
+            Number of entries removed
+        """
+        removed = 0
+        if self.cache_dir.exists():
+            for path in self.cache_dir.glob('data-*.arrow'):
+                path.unlink()
+                removed += 1
+        return removed
@@ -0,0 +1,234 @@
+"""
+Dataset Catalog
+Describes parquet files from their footers alone: schema, row-group layout and
+per-column null counts, min/max and dictionary sizes. Footers are read once
+per file version and cached, so column comparisons and validation never touch
+column data.
+"""
+
+import os
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Set, Tuple, Union
+
+import pyarrow as pa
+import pyarrow.parquet as pq
+from pydantic import BaseModel
+
+from .aliases import x_prefix_aliases
+
+
+class ColumnSummary(BaseModel):
+    """Footer information for one column, aggregated over row groups."""
+    name: str                           # Column name as stored
+    arrow_type: str                     # Arrow type (dictionary<...> for categorical columns)
+    physical_type: str                  # Parquet physical type (DOUBLE, BYTE_ARRAY, ...)
+    categorical: bool                   # Whether the column is stored as an Arrow dictionary (pandas category)
+    null_count: Optional[int] = None    # Nulls across row groups (None if any row group lacks statistics)
+    min: Optional[Any] = None           # Smallest value across row groups with min/max statistics
+    max: Optional[Any] = None           # Largest value across row groups with min/max statistics
+    dictionary_encoded: bool = False    # Whether every column chunk has a dictionary page
+    dictionary_page_bytes: int = 0      # Compressed size of the dictionary pages, all row groups
+    compressed_bytes: int = 0           # Compressed size of the column chunks
+    uncompressed_bytes: int = 0         # Uncompressed size of the column chunks
+
+
+class RowGroupSummary(BaseModel):
+    """Layout of one row group."""
+    index: int
+    num_rows: int
+    total_byte_size: int                # Uncompressed size of the row group
+
+
+class DatasetSummary(BaseModel):
+    """Footer-level description of a parquet file."""
+    path: str
+    file_size: int
+    num_rows: int
+    created_by: Optional[str] = None
+    columns: Dict[str, ColumnSummary]   # In file order
+    row_groups: List[RowGroupSummary]
+
+    @property
+    def column_names(self) -> List[str]:
+        """Column names in file order."""
+        return list(self.columns)
+
+    @property
+    def num_row_groups(self) -> int:
+        """Number of row groups."""
+        return len(self.row_groups)
+
+
+class ColumnComparison(BaseModel):
+    """Column-name comparison across several files."""
+    columns: Dict[str, List[str]]                    # Dataset name -> columns in file order
+    common: List[str]                                # Columns in every dataset, sorted
+    unique: Dict[str, List[str]]                     # Dataset name -> columns in no other dataset, sorted
+    differences: Dict[Tuple[str, str], List[str]]    # (a, b) -> columns in a but not b, sorted
+
+    def overlap(self, a: str, b: str) -> Tuple[int, int]:
+        """Return (shared columns, columns in either) for two datasets."""
+        columns_a, columns_b = set(self.columns[a]), set(self.columns[b])
+        return len(columns_a & columns_b), len(columns_a | columns_b)
+
+
+def _merge_bound(current, value, pick):
+    """Combine a running min/max with a row group's, tolerating missing values."""
+    if value is None:
+        return current
+    if current is None:
+        return value
+    try:
+        return pick(current, value)
+    except TypeError:
+        return current
+
+
+def summarize_parquet(path: Union[str, Path]) -> DatasetSummary:
+    """
+    Read a parquet footer and summarize the file.
+
+    Args:
+        path: Path to the parquet file
+
+    Returns:
+        DatasetSummary built from the footer alone
+    """
+    metadata = pq.read_metadata(path)
+    arrow_schema = metadata.schema.to_arrow_schema()
+
+    row_groups = []
+    accumulators = [{'null_count': 0, 'min': None, 'max': None, 'dictionary_encoded': True,
+                     'dictionary_page_bytes': 0, 'compressed_bytes': 0, 'uncompressed_bytes': 0}
+                    for _ in range(metadata.num_columns)]
+    for i in range(metadata.num_row_groups):
+        row_group = metadata.row_group(i)
+        row_groups.append(RowGroupSummary(index=i, num_rows=row_group.num_rows,
+                                          total_byte_size=row_group.total_byte_size))
+        for j, acc in enumerate(accumulators):
+            chunk = row_group.column(j)
+            acc['compressed_bytes'] += chunk.total_compressed_size
+            acc['uncompressed_bytes'] += chunk.total_uncompressed_size
+            if chunk.has_dictionary_page:
+                acc['dictionary_page_bytes'] += chunk.data_page_offset - chunk.dictionary_page_offset
+            else:
+                acc['dictionary_encoded'] = False
+            statistics = chunk.statistics
+            if statistics is None or acc['null_count'] is None or not statistics.has_null_count:
+                acc['null_count'] = None
+            else:
+                acc['null_count'] += statistics.null_count
+            if statistics is not None and statistics.has_min_max:
+                acc['min'] = _merge_bound(acc['min'], statistics.min, min)
+                acc['max'] = _merge_bound(acc['max'], statistics.max, max)
+
+    columns = {}
+    for j, field in enumerate(arrow_schema):
+        acc = accumulators[j]
+        if metadata.num_row_groups == 0:
+            acc['dictionary_encoded'] = False
+        columns[field.name] = ColumnSummary(
+            name=field.name,
+            arrow_type=str(field.type),
+            physical_type=metadata.schema.column(j).physical_type,
+            categorical=pa.types.is_dictionary(field.type),
+            **acc,
+        )
+
+    return DatasetSummary(path=str(path), file_size=os.path.getsize(path), num_rows=metadata.num_rows,
+                          created_by=metadata.created_by, columns=columns, row_groups=row_groups)
+
+
+class DatasetCatalog:
+    """
+    Cache of parquet footer summaries keyed by path.
+
+    A file's footer is read on first request and kept until the file's size or
+    modification time changes, so repeated questions about the same files cost
+    a stat call.
+    """
+
+    def __init__(self):
+        """Initialize an empty catalog."""
+        self._summaries: Dict[str, Tuple[Tuple[int, int], DatasetSummary]] = {}
+
+    def summary(self, path: Union[str, Path]) -> DatasetSummary:
+        """
+        Return the summary of a parquet file, reading its footer if it is new or has changed.
+
+        Args:
+            path: Path to the parquet file
+
+        Returns:
+            DatasetSummary
+
+        Raises:
+            FileNotFoundError: If the file does not exist
+        """
+        key = str(Path(path).resolve())
+        if not os.path.exists(key):
+            raise FileNotFoundError(f"Parquet file not found: {path}")
+        stat = os.stat(key)
+        version = (stat.st_size, stat.st_mtime_ns)
+        cached = self._summaries.get(key)
+        if cached is None or cached[0] != version:
+            cached = (version, summarize_parquet(key))
+            self._summaries[key] = cached
+        return cached[1]
+
+    def invalidate(self, path: Optional[Union[str, Path]] = None) -> None:
+        """Forget one file's summary, or every summary when path is None."""
+        if path is None:
+            self._summaries.clear()
+        else:
+            self._summaries.pop(str(Path(path).resolve()), None)
+
+    def columns(self, path: Union[str, Path]) -> List[str]:
+        """Column names of a parquet file, in file order."""
+        return self.summary(path).column_names
+
+    def missing_columns(self, path: Union[str, Path], columns: List[str]) -> List[str]:
+        """Return the requested columns that the file does not contain."""
+        available = set(self.columns(path))
+        return [col for col in columns if col not in available]
+
+    def find_columns(self, path: Union[str, Path], substring: str) -> List[str]:
+        """Return columns whose name contains substring."""
+        return [col for col in self.columns(path) if substring in col]
+
+    def categorical_columns(self, path: Union[str, Path]) -> List[str]:
+        """Return columns stored as Arrow dictionaries, which load as pandas categoricals."""
+        return [name for name, column in self.summary(path).columns.items() if column.categorical]
+
+    def x_prefix_aliases(self, path: Union[str, Path], reference_path: Union[str, Path]) -> Dict[str, str]:
+        """Map X_ columns in path to underscore names present in reference_path."""
+        return x_prefix_aliases(self.columns(path), set(self.columns(reference_path)))
+
+    def compare_columns(self, paths: Dict[str, Union[str, Path]]) -> ColumnComparison:
+        """
+        Compare column names across files.
+
+        Args:
+            paths: Mapping of dataset names to parquet paths
+
+        Returns:
+            ColumnComparison with common, unique and pairwise-missing columns
+        """
+        columns = {name: self.columns(path) for name, path in paths.items()}
+        sets: Dict[str, Set[str]] = {name: set(cols) for name, cols in columns.items()}
+        common = set.intersection(*sets.values()) if sets else set()
+        unique = {name: sorted(cols.difference(*[other for n, other in sets.items() if n != name]))
+                  for name, cols in sets.items()}
+        differences = {(a, b): sorted(sets[a] - sets[b]) for a in sets for b in sets if a != b}
+        return ColumnComparison(columns=columns, common=sorted(common), unique=unique, differences=differences)
+
+
+_default_catalog = None
+
+
+def default_catalog() -> DatasetCatalog:
+    """Return the process-wide catalog shared by BFRSS instances and scripts."""
+    global _default_catalog
+    if _default_catalog is None:
+        _default_catalog = DatasetCatalog()
+    return _default_catalog
@@ -0,0 +1,122 @@
+"""
+Virtual Description Columns
+Serves <CODE>_DESC columns from the coded column and the codebook instead of
+storing the description text in the parquet file. Each one is translated into
+a Categorical on first access and cached.
+"""
+
+from typing import Callable, Collection, Dict, List, Optional
+
+import pandas as pd
+
+
+def _code_column_name(column_name: str) -> str:
+    """
+    Return the codebook column a parquet column belongs to.
+
+    _DESC columns map to their code column; the categorized files store
+    underscore-prefixed names with an X prefix (e.g. X_STATE_DESC for _STATE).
+    """
+    if not column_name.endswith('_DESC'):
+        return column_name
+    base = column_name[:-len('_DESC')]
+    return base[1:] if base.startswith('X_') else base
+
+
+class DescFrame(pd.DataFrame):
+    """
+    DataFrame that derives missing _DESC columns from their code columns.
+
+    df['GENHLTH_DESC'] returns the stored column when there is one. Otherwise,
+    if GENHLTH is loaded and in the codebook, it returns translate('GENHLTH', df['GENHLTH'])
+    named GENHLTH_DESC, computing it once and reusing it on later access.
+    Virtual columns are not part of df.columns. Reassigning a code column drops
+    its cached description; after editing codes in place call clear_desc_cache().
+
+    Frames derived from this one (slices, copies, arithmetic) are plain DataFrames.
+    The translator is not pickled, so an unpickled DescFrame behaves like a plain one.
+    """
+
+    @property
+    def _constructor(self):
+        return pd.DataFrame
+
+    def __init__(self, data=None, *args, translate: Optional[Callable[[str, pd.Series], pd.Series]] = None,
+                 code_columns: Collection[str] = (), **kwargs):
+        """
+        Wrap a DataFrame.
+
+        Args:
+            data: DataFrame (or anything pd.DataFrame accepts); a DataFrame is wrapped without copying
+            translate: Function mapping (code column name, code Series) to a description Series,
+                normally BFRSS.translate_column
+            code_columns: Column names that have codebook value definitions
+        """
+        super().__init__(data, *args, **kwargs)
+        object.__setattr__(self, '_desc_translate', translate)
+        object.__setattr__(self, '_desc_code_columns', frozenset(code_columns))
+        object.__setattr__(self, '_desc_cache', {})
+
+    def _virtual_code_column(self, key) -> Optional[str]:
+        """Return the code column behind a virtual _DESC key, or None if key is not one."""
+        if not isinstance(key, str) or not key.endswith('_DESC') or key in self.columns:
+            return None
+        if getattr(self, '_desc_translate', None) is None:
+            return None
+        code_column = _code_column_name(key)
+        if code_column in self.columns and code_column in self._desc_code_columns:
+            return code_column
+        return None
+
+    @property
+    def virtual_desc_columns(self) -> List[str]:
+        """Names of the _DESC columns that can be derived but are not stored."""
+        if getattr(self, '_desc_translate', None) is None:
+            return []
+        return [f"{col}_DESC" for col in self.columns
+                if col in self._desc_code_columns and f"{col}_DESC" not in self.columns]
+
+    def desc_column(self, key: str) -> pd.Series:
+        """
+        Return a virtual _DESC column, translating its code column on first use.
+
+        Args:
+            key: _DESC column name, e.g. 'GENHLTH_DESC' or 'X_STATE_DESC'
+
+        Returns:
+            Categorical Series named key
+        """
+        code_column = self._virtual_code_column(key)
+        if code_column is None:
+            raise KeyError(key)
+        cache: Dict[str, pd.Series] = self._desc_cache
+        if key not in cache:
+            translated = self._desc_translate(code_column, super().__getitem__(code_column))
+            cache[key] = translated.rename(key)
+        return cache[key]
+
+    def clear_desc_cache(self, code_column: Optional[str] = None) -> None:
+        """Drop cached virtual columns (all of them, or those derived from code_column)."""
+        cache = getattr(self, '_desc_cache', None)
+        if not cache:
+            return
+        if code_column is None:
+            cache.clear()
+            return
+        for key in [key for key in cache if _code_column_name(key) == code_column]:
+            del cache[key]
+
+    def __getitem__(self, key):
+        if self._virtual_code_column(key) is not None:
+            return self.desc_column(key)
+        if isinstance(key, list) and any(self._virtual_code_column(item) is not None for item in key):
+            return pd.DataFrame({item: self[item] for item in key}, index=self.index)
+        return super().__getitem__(key)
+
+    def __setitem__(self, key, value):
+        super().__setitem__(key, value)
+        if isinstance(key, str):
+            self.clear_desc_cache(key)
+        elif isinstance(key, list):
+            for item in key:
+                self.clear_desc_cache(item)
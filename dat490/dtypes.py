@@ -0,0 +1,108 @@
+"""
+Compact Dtypes
+Chooses the narrowest safe storage type for each coded column from its codebook
+value ranges, replacing float64 (used only because of NaN) with nullable
+Int8/Int16/Int32 or float32.
+"""
+
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+from .parser import ColumnMetadata, ValueRange
+
+# Nullable integer types tried in order, narrowest first
+COMPACT_INTEGER_DTYPES = (
+    (pd.Int8Dtype(), np.iinfo(np.int8)),
+    (pd.Int16Dtype(), np.iinfo(np.int16)),
+    (pd.Int32Dtype(), np.iinfo(np.int32)),
+)
+
+
+def codebook_bounds(value_ranges: List) -> Optional[Tuple[int, int]]:
+    """Return the (lowest, highest) code across a column's ValueRange entries, or None if there are none."""
+    bounds = [(value_def.start, value_def.end) for value_def in value_ranges if isinstance(value_def, ValueRange)]
+    if not bounds:
+        return None
+    return min(start for start, _ in bounds), max(end for _, end in bounds)
+
+
+def compact_dtype(column_meta: Optional[ColumnMetadata], series: pd.Series):
+    """
+    Choose the narrowest dtype that holds a column without changing any value.
+
+    Integral columns get the smallest nullable integer type covering both the
+    codebook value ranges and the observed values, so any codebook code can
+    still be stored later. Other columns become float32 only when every value
+    survives the float64 -> float32 -> float64 round trip exactly.
+
+    Args:
+        column_meta: Schema metadata for the column (None if it is not in the codebook)
+        series: Column data
+
+    Returns:
+        The compact dtype, or None to keep the current one
+    """
+    if not isinstance(series.dtype, np.dtype) or series.dtype.kind != 'f' or series.dtype.itemsize <= 4:
+        return None
+
+    values = series.to_numpy()
+    present = values[~np.isnan(values)]
+    if np.array_equal(present, np.floor(present)):
+        bounds = [codebook_bounds(column_meta.value_ranges)] if column_meta is not None else []
+        if len(present):
+            bounds.append((present.min(), present.max()))
+        bounds = [bound for bound in bounds if bound is not None]
+        low = min((start for start, _ in bounds), default=0)
+        high = max((end for _, end in bounds), default=0)
+        for dtype, info in COMPACT_INTEGER_DTYPES:
+            if info.min <= low and high <= info.max:
+                return dtype
+
+    if np.array_equal(values.astype(np.float32).astype(np.float64), values, equal_nan=True):
+        return np.dtype(np.float32)
+    return None
+
+
+def compact_frame(df: pd.DataFrame, schema: Dict[str, ColumnMetadata],
+                  columns: Optional[List[str]] = None) -> Tuple[pd.DataFrame, Dict[str, Tuple[int, int]]]:
+    """
+    Downcast columns of a DataFrame in place to their compact dtypes.
+
+    Args:
+        df: DataFrame to modify in place
+        schema: Metadata from parse_codebook_html, used for codebook value ranges
+        columns: Columns to consider (default: all)
+
+    Returns:
+        Tuple of (df, {column: (bytes before, bytes after)} for every converted column)
+    """
+    report = {}
+    for col_name in (columns if columns is not None else list(df.columns)):
+        series = df[col_name]
+        dtype = compact_dtype(schema.get(col_name), series)
+        if dtype is None:
+            continue
+        before = int(series.memory_usage(index=False, deep=True))
+        if isinstance(dtype, np.dtype):
+            compacted = series.astype(dtype)
+        else:
+            # Go through the NumPy integer type so the conversion is a plain cast plus a NaN mask
+            values = series.to_numpy()
+            missing = np.isnan(values)
+            compacted = pd.Series(pd.arrays.IntegerArray(np.where(missing, 0, values).astype(dtype.numpy_dtype), missing),
+                                  index=series.index, name=col_name)
+        df[col_name] = compacted
+        report[col_name] = (before, int(compacted.memory_usage(index=False, deep=True)))
+    return df, report
+
+
+def summarize_compaction(report: Dict[str, Tuple[int, int]]) -> str:
+    """Return a one-line summary of memory saved by compact_frame."""
+    before = sum(b for b, _ in report.values())
+    after = sum(a for _, a in report.values())
+    saved = before - after
+    percent = saved / before * 100 if before else 0.0
+    return (f"Compacted {len(report)} columns from {before / 1024 ** 2:.1f} MB to {after / 1024 ** 2:.1f} MB "
+            f"(saved {saved / 1024 ** 2:.1f} MB, {percent:.0f}%)")
@@ -0,0 +1,204 @@
+"""
+Feature Matrix
+Encodes a block of feature columns once into compact integer codes with
+missing-value bitmaps, so per-target model inputs are built by selecting
+rows and filling missing values instead of copying and re-cleaning a DataFrame.
+"""
+
+import hashlib
+import json
+import logging
+from typing import Dict, List, NamedTuple, Optional, Sequence, Tuple
+
+import numpy as np
+import pandas as pd
+
+logger = logging.getLogger(__name__)
+
+# Code of missing rows, which also have their bit set in the missing bitmap
+MISSING_CODE = -1
+
+# Smallest code dtypes, tried in order
+CODE_DTYPES = (np.int8, np.int16, np.int32)
+
+
+class PreparedFeatures(NamedTuple):
+    """Model inputs for one row selection."""
+    X: np.ndarray  # (rows, columns) float64 feature values, missing values filled with the column mode
+    columns: List[str]  # Columns of X, in order
+    dropped: Dict[str, float]  # Columns dropped for exceeding the missing threshold -> missing fraction
+    filled: Dict[str, Tuple[int, float]]  # Columns with filled values -> (values filled, mode used)
+
+
+class FeatureMatrix:
+    """
+    Feature columns encoded as one column-major integer code matrix.
+
+    Each column's distinct values are sorted and replaced by their rank, so
+    codes keep the order of the values and decode back to them exactly.
+    The matrix uses the smallest of int8/int16/int32 that fits every
+    column. Missing values are kept as one packed bitmap per column, and
+    the missing counts and modes over all rows are computed once. Codes of
+    missing rows are MISSING_CODE, so one bincount over a selection gives
+    both its missing count and its mode.
+
+    Numeric columns (including nullable and compact dtypes) decode to their
+    float64 values. Other columns decode to their rank among the sorted
+    string values, matching a LabelEncoder fitted on them.
+    """
+
+    def __init__(self, columns: List[str], codes: np.ndarray, values: List[np.ndarray], missing: np.ndarray):
+        """
+        Wrap an encoded block; use from_frame to build one.
+
+        Args:
+            columns: Column names, in matrix order
+            codes: (columns, rows) integer codes, MISSING_CODE where missing
+            values: Per column, the sorted float64 value of each code
+            missing: (columns, ceil(rows / 8)) bitmap from np.packbits, set where missing
+        """
+        self.columns = columns
+        self.codes = codes
+        self.values = values
+        self.missing = missing
+        self.num_rows = codes.shape[1]
+        self._positions = {col: i for i, col in enumerate(columns)}
+        self._fingerprint = None
+
+        # Missing counts and modes over all rows, reused when no rows are selected
+        self.missing_counts = np.array([int(np.count_nonzero(self.missing_mask(col))) for col in columns],
+                                       dtype=np.int64)
+        self.modes = np.array([self._mode(self._code_counts(codes[i], len(values[i])))
+                               for i in range(len(columns))], dtype=np.int64)
+
+    @classmethod
+    def from_frame(cls, df: pd.DataFrame, columns: Optional[Sequence[str]] = None) -> 'FeatureMatrix':
+        """
+        Encode columns of df.
+
+        Args:
+            df: Source DataFrame
+            columns: Columns to encode (default: all columns)
+
+        Returns:
+            FeatureMatrix over the columns
+        """
+        columns = list(df.columns if columns is None else columns)
+        code_arrays, values, missing = [], [], []
+        for col in columns:
+            series = df[col]
+            if pd.api.types.is_numeric_dtype(series.dtype) and not pd.api.types.is_bool_dtype(series.dtype):
+                data = series.to_numpy(dtype='float64', na_value=np.nan)
+                is_missing = np.isnan(data)
+                table, codes = np.unique(data[~is_missing], return_inverse=True)
+            else:
+                is_missing = series.isna().to_numpy()
+                labels, codes = np.unique(series[~is_missing].astype(str).to_numpy(), return_inverse=True)
+                table = np.arange(len(labels), dtype=np.float64)
+            column_codes = np.full(len(series), MISSING_CODE, dtype=np.int64)
+            column_codes[~is_missing] = codes
+            code_arrays.append(column_codes)
+            values.append(table.astype(np.float64))
+            missing.append(is_missing)
+
+        # Codes run up to the number of values - 1, and one more is added when counting
+        largest = max((len(table) for table in values), default=0)
+        code_dtype = next(dtype for dtype in CODE_DTYPES if largest < np.iinfo(dtype).max)
+        matrix = np.empty((len(columns), len(df)), dtype=code_dtype)
+        for i, column_codes in enumerate(code_arrays):
+            matrix[i] = column_codes
+        bitmap = np.packbits(np.array(missing, dtype=bool).reshape(len(columns), len(df)), axis=1)
+
+        logger.debug(f"Encoded {len(columns)} feature columns x {len(df):,} rows as {np.dtype(code_dtype).name} "
+                     f"({(matrix.nbytes + bitmap.nbytes) / 1024 ** 2:.1f} MB)")
+        return cls(columns, matrix, values, bitmap)
+
+    def fingerprint(self) -> str:
+        """
+        Return a SHA-256 hex digest of the encoded block.
+
+        Covers column names, codes, decoded values and missing bitmaps, so it
+        changes whenever any feature value does. Computed once and cached.
+        """
+        if self._fingerprint is None:
+            digest = hashlib.sha256()
+            digest.update(json.dumps(self.columns).encode())
+            digest.update(np.dtype(self.codes.dtype).str.encode())
+            digest.update(np.ascontiguousarray(self.codes).tobytes())
+            for table in self.values:
+                digest.update(str(len(table)).encode())
+                digest.update(table.tobytes())
+            digest.update(np.ascontiguousarray(self.missing).tobytes())
+            self._fingerprint = digest.hexdigest()
+        return self._fingerprint
+
+    def missing_mask(self, column: str) -> np.ndarray:
+        """Return a boolean array over all rows, True where column is missing."""
+        return np.unpackbits(self.missing[self._positions[column]], count=self.num_rows).view(bool)
+
+    @staticmethod
+    def _code_counts(codes: np.ndarray, num_values: int) -> np.ndarray:
+        """Count each code in one pass; entry 0 counts missing rows and entry i + 1 counts code i."""
+        return np.bincount(codes.astype(np.intp) + 1, minlength=num_values + 1)
+
+    @staticmethod
+    def _mode(counts: np.ndarray) -> int:
+        """Return the most frequent code, the smallest on ties (as Series.mode().iloc[0]); -1 if all missing."""
+        if counts[1:].sum() == 0:
+            return MISSING_CODE
+        return int(np.argmax(counts[1:]))
+
+    def prepare(self, rows: Optional[np.ndarray] = None, columns: Optional[Sequence[str]] = None,
+                missing_threshold: float = 0.3) -> PreparedFeatures:
+        """
+        Build model inputs for a row selection.
+
+        Columns missing in more than missing_threshold of the selected rows
+        (or in all of them) are dropped. Missing values in the remaining
+        columns are filled with the column mode over the selected rows.
+
+        Args:
+            rows: Boolean mask over all rows (default: every row)
+            columns: Columns to use, in output order (default: all encoded columns)
+            missing_threshold: Largest missing fraction a column may have and be kept
+
+        Returns:
+            PreparedFeatures for the selected rows
+
+        Raises:
+            ValueError: If rows has the wrong length or selects nothing
+        """
+        columns = list(self.columns if columns is None else columns)
+        positions = [self._positions[col] for col in columns]
+        if rows is not None and len(rows) != self.num_rows:
+            raise ValueError(f"Row mask has {len(rows):,} entries, expected {self.num_rows:,}")
+        index = None if rows is None else np.flatnonzero(rows)
+        num_selected = self.num_rows if index is None else len(index)
+        if num_selected == 0:
+            raise ValueError("No rows selected")
+
+        # One selection of the compact codes; missing rows carry MISSING_CODE
+        codes = self.codes[positions] if index is None else self.codes[positions][:, index]
+
+        kept, dropped, filled = [], {}, {}
+        for j, position in enumerate(positions):
+            if index is None:
+                missing_count, mode = int(self.missing_counts[position]), int(self.modes[position])
+            else:
+                counts = self._code_counts(codes[j], len(self.values[position]))
+                missing_count, mode = int(counts[0]), self._mode(counts)
+            missing_fraction = missing_count / num_selected
+            if missing_fraction > missing_threshold or mode == MISSING_CODE:
+                dropped[columns[j]] = missing_fraction
+                continue
+            kept.append((j, position, mode))
+            if missing_count:
+                filled[columns[j]] = (missing_count, float(self.values[position][mode]))
+
+        # Decode through a table whose first entry is the mode, so MISSING_CODE + 1
+        # picks the fill value and the fill costs nothing beyond the decode
+        X = np.empty((len(kept), num_selected), dtype=np.float64)
+        for i, (j, position, mode) in enumerate(kept):
+            table = np.concatenate(([self.values[position][mode]], self.values[position]))
+            table.take(codes[j].astype(np.intp) + 1, out=X[i])
+        return PreparedFeatures(X=X.T, columns=[columns[j] for j, _, _ in kept], dropped=dropped, filled=filled)
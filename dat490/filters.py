@@ -0,0 +1,108 @@
+"""
+Row Filters
+Translates row filters written in codebook terms (codes, code lists or value
+descriptions) into pyarrow expressions that are pushed into the parquet scan,
+so row groups whose footer statistics rule them out are never read.
+"""
+
+from typing import Dict, List, Optional, Tuple, Union
+
+import pyarrow.compute as pc
+
+from .parser import ColumnMetadata, ValueRange
+
+# A filter value is a code, a value description, or a list of either
+FilterValue = Union[int, float, str, List[Union[int, float, str]]]
+
+
+def _description_label(description: str) -> str:
+    """Return the lower-cased label of a value description, without skip instructions."""
+    return description.split(' - ')[0].strip().lower()
+
+
+def resolve_filter_value(column_meta: ColumnMetadata, value: Union[int, float, str]) -> List[Tuple[float, float]]:
+    """
+    Resolve one filter value to inclusive code intervals.
+
+    Numbers are taken as codes. Strings are matched case-insensitively against
+    the column's ValueRange descriptions, or failing that against the label
+    before any " - " skip instruction. A description covering a range of codes
+    (e.g. "Number of days") resolves to that whole range.
+
+    Args:
+        column_meta: Schema metadata for the column
+        value: Code or value description
+
+    Returns:
+        List of (start, end) intervals
+
+    Raises:
+        ValueError: If a description does not match any value in the codebook
+    """
+    if not isinstance(value, str):
+        return [(value, value)]
+
+    value_defs = [value_def for value_def in column_meta.value_ranges if isinstance(value_def, ValueRange)]
+    wanted = value.strip().lower()
+    intervals = [(value_def.start, value_def.end) for value_def in value_defs
+                 if value_def.description.strip().lower() == wanted]
+    if not intervals:
+        # Descriptions often carry skip instructions ("Female - Code=2 if ...",
+        # "Yes -  Go to ..."), so fall back to the label before the first " - "
+        intervals = [(value_def.start, value_def.end) for value_def in value_defs
+                     if _description_label(value_def.description) == wanted]
+    if not intervals:
+        descriptions = [value_def.description for value_def in value_defs]
+        raise ValueError(f"'{value}' is not a value description of {column_meta.sas_variable_name}. "
+                         f"Expected one of {descriptions}")
+    return intervals
+
+
+def build_row_filter(filters: Dict[str, FilterValue], schema: Dict[str, ColumnMetadata],
+                     field_names: Optional[Dict[str, str]] = None) -> Optional[pc.Expression]:
+    """
+    Build a pyarrow filter expression from codebook-level row filters.
+
+    Values for one column are OR-ed together and columns are AND-ed, e.g.
+    {'_STATE': [4, 'California'], 'SEXVAR': 'Female'} keeps Arizona and
+    California rows for female respondents.
+
+    Args:
+        filters: Mapping of SAS variable names to a code, a description, or a list of them
+        schema: Metadata from parse_codebook_html, used to resolve descriptions
+        field_names: Optional mapping of SAS variable names to the column names stored
+            in the file, for files whose names differ from the codebook (e.g. X_STATE)
+
+    Returns:
+        pyarrow.compute.Expression for the parquet reader's filters argument, or None if filters is empty
+
+    Raises:
+        ValueError: If a column is not in the codebook or a description does not resolve
+    """
+    expression = None
+    for column_name, values in filters.items():
+        if column_name not in schema:
+            raise ValueError(f"Cannot filter on {column_name}: column not found in codebook")
+        if not isinstance(values, (list, tuple, set)):
+            values = [values]
+
+        codes = []
+        ranges = []
+        for value in values:
+            for start, end in resolve_filter_value(schema[column_name], value):
+                if start == end:
+                    codes.append(start)
+                else:
+                    ranges.append((start, end))
+
+        field = pc.field(field_names.get(column_name, column_name) if field_names else column_name)
+        column_expression = field.isin(codes) if codes else None
+        for start, end in ranges:
+            range_expression = (field >= start) & (field <= end)
+            column_expression = range_expression if column_expression is None else column_expression | range_expression
+        if column_expression is None:
+            raise ValueError(f"Empty filter for {column_name}")
+
+        expression = column_expression if expression is None else expression & column_expression
+    return expression
+
@@ -0,0 +1,142 @@
+"""
+Parquet Layout Optimizer
+Rewrites a BRFSS parquet file into a layout tuned for how it is read: rows
+sorted by state and interview month so row filters skip row groups, bounded
+row groups, dictionary encoding for coded columns, zstd compression and page
+indexes for page-level skipping.
+"""
+
+import logging
+from pathlib import Path
+from typing import Dict, List, Optional, Sequence, Union
+
+import pyarrow as pa
+import pyarrow.compute as pc
+import pyarrow.parquet as pq
+
+logger = logging.getLogger(__name__)
+
+# Sort order matching the common job slices (one or a few states, one month)
+DEFAULT_SORT_COLUMNS = ('_STATE', 'IMONTH')
+
+# Rows per row group; small enough that a state or month filter skips most groups
+DEFAULT_ROW_GROUP_SIZE = 32_768
+
+# Columns with at most this many distinct values are treated as coded and always dictionary encoded
+MAX_DICTIONARY_VALUES = 4_096
+
+# zstd level: 3 is the library default, higher levels trade write time for size
+DEFAULT_COMPRESSION_LEVEL = 3
+
+
+def _resolve_column(table: pa.Table, name: str) -> str:
+    """Return name, or its X_-prefixed form when the file uses that spelling."""
+    if name in table.column_names:
+        return name
+    if name.startswith('_') and f"X{name}" in table.column_names:
+        return f"X{name}"
+    raise ValueError(f"Sort column {name} not found")
+
+
+def coded_columns(table: pa.Table, max_dictionary_values: int = MAX_DICTIONARY_VALUES) -> List[str]:
+    """
+    Find columns holding a small set of codes, which dictionary encoding stores compactly.
+
+    Columns that are already Arrow dictionaries count as coded. Numeric and
+    string columns qualify when they have at most max_dictionary_values distinct values.
+
+    Args:
+        table: Table to inspect
+        max_dictionary_values: Largest distinct count treated as coded
+
+    Returns:
+        Column names in table order
+    """
+    coded = []
+    for name in table.column_names:
+        column = table.column(name)
+        if pa.types.is_dictionary(column.type):
+            coded.append(name)
+        elif pc.count_distinct(column, mode='only_valid').as_py() <= max_dictionary_values:
+            coded.append(name)
+    return coded
+
+
+def optimize_parquet_layout(input_path: Union[str, Path], output_path: Union[str, Path],
+                            sort_columns: Optional[Sequence[str]] = DEFAULT_SORT_COLUMNS,
+                            row_group_size: int = DEFAULT_ROW_GROUP_SIZE,
+                            compression_level: int = DEFAULT_COMPRESSION_LEVEL,
+                            dictionary_columns: Optional[List[str]] = None,
+                            write_page_index: bool = True) -> Dict[str, object]:
+    """
+    Rewrite a parquet file with a sorted, read-optimized layout.
+
+    The table is read once. Rows are ordered by argsort over the sort columns
+    (nulls last) and each output row group is gathered with take(), so only
+    one sorted row group exists next to the input table at a time. The sort
+    order is recorded in the footer's sorting_columns, and the schema
+    (including pandas metadata) is preserved.
+
+    Args:
+        input_path: Parquet file to rewrite
+        output_path: Destination; written to a temporary file and moved into place
+        sort_columns: Columns to sort by, in order (None or empty keeps the row order)
+        row_group_size: Rows per row group
+        compression_level: zstd compression level
+        dictionary_columns: Columns to dictionary encode (default: coded_columns())
+        write_page_index: Write column and offset indexes so readers can skip pages
+
+    Returns:
+        Dictionary describing the layout written (rows, row groups, sort and dictionary columns)
+    """
+    input_path, output_path = Path(input_path), Path(output_path)
+    table = pq.read_table(input_path)
+    logger.info(f"Read {table.num_rows:,} rows x {table.num_columns} columns from {input_path}")
+
+    sort_columns = [_resolve_column(table, name) for name in (sort_columns or [])]
+    if sort_columns:
+        order = pc.sort_indices(table, sort_keys=[(name, 'ascending') for name in sort_columns],
+                                null_placement='at_end')
+        sorting = pq.SortingColumn.from_ordering(table.schema, [(name, 'ascending') for name in sort_columns],
+                                                 null_placement='at_end')
+    else:
+        order, sorting = None, None
+
+    if dictionary_columns is None:
+        dictionary_columns = coded_columns(table)
+    logger.info(f"Dictionary encoding {len(dictionary_columns)} of {table.num_columns} columns")
+
+    output_path.parent.mkdir(parents=True, exist_ok=True)
+    tmp_path = output_path.with_name(output_path.name + '.tmp')
+    num_row_groups = 0
+    try:
+        with pq.ParquetWriter(tmp_path, table.schema, compression='zstd', compression_level=compression_level,
+                              use_dictionary=dictionary_columns,
+                              # Dictionary pages larger than the default 1 MB limit would fall back to plain encoding
+                              dictionary_pagesize_limit=8 * 1024 ** 2,
+                              write_page_index=write_page_index,
+                              sorting_columns=sorting) as writer:
+            for start in range(0, table.num_rows, row_group_size):
+                if order is None:
+                    row_group = table.slice(start, row_group_size)
+                else:
+                    row_group = table.take(order.slice(start, row_group_size))
+                writer.write_table(row_group, row_group_size=row_group_size)
+                num_row_groups += 1
+                del row_group
+        tmp_path.replace(output_path)
+    except BaseException:
+        if tmp_path.exists():
+            tmp_path.unlink()
+        raise
+
+    logger.info(f"Wrote {output_path}: {num_row_groups} row groups of up to {row_group_size:,} rows, "
+                f"sorted by {sort_columns or 'nothing'}, zstd level {compression_level}")
+    return {
+        'rows': table.num_rows,
+        'row_groups': num_row_groups,
+        'sort_columns': sort_columns,
+        'dictionary_columns': dictionary_columns,
+        'compression_level': compression_level,
+        'write_page_index': write_page_index,
+    }
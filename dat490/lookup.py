@@ -0,0 +1,154 @@
+"""
+Value Range Index
+Compiles a column's codebook value ranges into sorted arrays so codes can be
+mapped to descriptions with a binary search instead of a scan over pydantic objects.
+"""
+
+import sys
+from bisect import bisect_right
+from typing import List, Optional, Union
+
+import numpy as np
+import pandas as pd
+
+from .parser import ColumnMetadata, ValueDef, ValueRange
+
+
+class ValueRangeIndex:
+    """
+    Array-backed interval index over the ValueRange entries of one column.
+
+    Intervals are stored as sorted, disjoint NumPy start/end arrays with an
+    integer code per interval pointing into a table of interned descriptions.
+    Where codebook ranges overlap, the first range in codebook order wins,
+    matching a linear scan of value_ranges.
+
+    Lookups follow BFRSS.lookup_value: values are truncated to integers
+    before matching, and NaN never matches.
+    """
+
+    def __init__(self, value_ranges: List[ValueDef]):
+        """
+        Compile the index.
+
+        Args:
+            value_ranges: Value definitions from ColumnMetadata.value_ranges
+        """
+        ranges = [value_def for value_def in value_ranges if isinstance(value_def, ValueRange)]
+
+        # Intern descriptions so repeated labels share one string object and one code
+        descriptions = []
+        description_codes = {}
+        for value_def in ranges:
+            description = sys.intern(value_def.description)
+            if description not in description_codes:
+                description_codes[description] = len(descriptions)
+                descriptions.append(description)
+
+        segments = self._disjoint_segments(ranges)
+        self.starts = np.array([start for start, _, _ in segments], dtype='int64')
+        self.ends = np.array([end for _, end, _ in segments], dtype='int64')
+        self.codes = np.array([description_codes[sys.intern(ranges[i].description)] for _, _, i in segments],
+                              dtype='int32')
+        self.missing = np.array([ranges[i].indicates_missing for _, _, i in segments], dtype=bool)
+        self.descriptions = np.array(descriptions, dtype=object)
+
+        # Float copies for comparing against float input without per-call casts,
+        # and plain lists because bisect beats a NumPy call for a single value
+        self._starts_float = self.starts.astype('float64')
+        self._ends_float = self.ends.astype('float64')
+        self._start_list = self.starts.tolist()
+        self._end_list = self.ends.tolist()
+        self._description_list = self.descriptions[self.codes].tolist()
+
+    @classmethod
+    def from_column(cls, column_meta: ColumnMetadata) -> 'ValueRangeIndex':
+        """Compile the index for a column's metadata."""
+        return cls(column_meta.value_ranges)
+
+    @staticmethod
+    def _disjoint_segments(ranges: List[ValueRange]) -> List[tuple]:
+        """
+        Return (start, end, range position) segments that are sorted and non-overlapping.
+
+        Codebook ranges are almost always disjoint already; overlapping ones are
+        split at every boundary and each piece is assigned to the first range
+        (in codebook order) that covers it.
+        """
+        order = sorted(range(len(ranges)), key=lambda i: (ranges[i].start, i))
+        segments = [(ranges[i].start, ranges[i].end, i) for i in order if ranges[i].start <= ranges[i].end]
+        if all(prev[1] < cur[0] for prev, cur in zip(segments, segments[1:])):
+            return segments
+
+        boundaries = sorted({start for start, _, _ in segments} | {end + 1 for _, end, _ in segments})
+        resolved = []
+        for lo, next_lo in zip(boundaries, boundaries[1:]):
+            owner = next((i for i, value_def in enumerate(ranges) if value_def.start <= lo <= value_def.end), None)
+            if owner is None:
+                continue
+            if resolved and resolved[-1][2] == owner and resolved[-1][1] == lo - 1:
+                resolved[-1] = (resolved[-1][0], next_lo - 1, owner)
+            else:
+                resolved.append((lo, next_lo - 1, owner))
+        return resolved
+
+    def __len__(self) -> int:
+        """Number of disjoint intervals in the index."""
+        return len(self.starts)
+
+    def locate(self, values: Union[np.ndarray, pd.Series, list]) -> np.ndarray:
+        """
+        Find the interval holding each value.
+
+        Args:
+            values: Numeric values (NaN allowed)
+
+        Returns:
+            int64 array of interval positions, -1 where no interval matches
+        """
+        values = np.trunc(np.asarray(values, dtype='float64'))
+        if len(self) == 0:
+            return np.full(values.shape, -1, dtype='int64')
+        positions = np.searchsorted(self._starts_float, values, side='right') - 1
+        found = (positions >= 0) & (values <= self._ends_float[np.maximum(positions, 0)])
+        return np.where(found, positions, -1)
+
+    def lookup_codes(self, values: Union[np.ndarray, pd.Series, list]) -> np.ndarray:
+        """
+        Map values to description codes (positions in self.descriptions).
+
+        Args:
+            values: Numeric values (NaN allowed)
+
+        Returns:
+            int32 array of description codes, -1 where no interval matches
+        """
+        positions = self.locate(values)
+        if len(self) == 0:
+            return positions.astype('int32')
+        return np.where(positions >= 0, self.codes[positions], -1).astype('int32')
+
+    def lookup(self, value: Union[int, float, None]) -> Optional[str]:
+        """
+        Return the description for a single value, or None if no range matches.
+
+        Args:
+            value: Value to look up
+
+        Returns:
+            Description string or None
+        """
+        if value is None or pd.isna(value):
+            return None
+        value_int = int(value)
+        position = bisect_right(self._start_list, value_int) - 1
+        if position >= 0 and value_int <= self._end_list[position]:
+            return self._description_list[position]
+        return None
+
+    def is_missing(self, values: Union[np.ndarray, pd.Series, list]) -> np.ndarray:
+        """Flag values that fall in a range marked indicates_missing=True."""
+        positions = self.locate(values)
+        if len(self) == 0:
+            return np.zeros(positions.shape, dtype=bool)
+        return (positions >= 0) & self.missing[np.maximum(positions, 0)]
@@ -0,0 +1,43 @@
+"""
+Process Memory
+Resident memory of the current process, in MB, for scripts that report or
+budget their memory use.
+"""
+
+import os
+import resource
+import sys
+from pathlib import Path
+
+
+def peak_rss_mb() -> float:
+    """Return this process's peak resident set size in MB."""
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # ru_maxrss is bytes on macOS and kilobytes on Linux
+    return peak / (1024 * 1024) if sys.platform == 'darwin' else peak / 1024
+
+
+def current_rss_mb() -> float:
+    """Return this process's current resident set size in MB (its peak where that is all the OS reports)."""
+    statm = Path('/proc/self/statm')
+    if statm.exists():
+        return int(statm.read_text().split()[1]) * os.sysconf('SC_PAGE_SIZE') / 1024 ** 2
+    return peak_rss_mb()
+
+
+def reset_peak_rss() -> bool:
+    """
+    Reset this process's peak resident set size to its current size.
+
+    Lets a long-lived process measure the peak of each task separately. Only
+    Linux supports this (through /proc/self/clear_refs); elsewhere the peak
+    keeps rising for the life of the process.
+
+    Returns:
+        True if the peak was reset
+    """
+    try:
+        Path('/proc/self/clear_refs').write_text('5')
+        return True
+    except OSError:
+        return False
@@ -0,0 +1,157 @@
+"""
+Semantic Null Engine
+Converts codebook missing-value codes (e.g. 7 = "Don't know", 9 = "Refused")
+to NaN by testing each value against the missing intervals directly, without
+expanding ranges into sets of codes.
+"""
+
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pyarrow.compute as pc
+
+from .parser import ColumnMetadata, ValueDef, ValueRange
+
+
+def semantic_null_intervals(value_ranges: List[ValueDef]) -> np.ndarray:
+    """
+    Collect the indicates_missing ranges of a column as merged, sorted intervals.
+
+    Args:
+        value_ranges: Value definitions from ColumnMetadata.value_ranges
+
+    Returns:
+        int64 array of shape (n, 2) holding inclusive [start, end] pairs
+    """
+    bounds = sorted((value_def.start, value_def.end) for value_def in value_ranges
+                    if value_def.indicates_missing and isinstance(value_def, ValueRange)
+                    and value_def.start <= value_def.end)
+
+    # Merge overlapping and adjacent integer ranges (e.g. 7-7 and 8-9)
+    merged = []
+    for start, end in bounds:
+        if merged and start <= merged[-1][1] + 1:
+            merged[-1][1] = max(merged[-1][1], end)
+        else:
+            merged.append([start, end])
+    return np.array(merged, dtype='int64').reshape(-1, 2)
+
+
+def semantic_null_mask(values: np.ndarray, intervals: np.ndarray) -> np.ndarray:
+    """
+    Flag values that equal an integer code inside any of the intervals.
+
+    This is the interval form of series.isin(expanded codes): a value matches
+    when it lies within [start, end] and is integral, so 7.0 matches 7 but 7.5
+    does not. NaN never matches.
+
+    Args:
+        values: float64 column values
+        intervals: Intervals from semantic_null_intervals()
+
+    Returns:
+        Boolean mask, True where the value is a semantic null
+    """
+    mask = np.zeros(len(values), dtype=bool)
+    for start, end in intervals:
+        mask |= (values >= start) & (values <= end)
+
+    # Only in-range candidates need the integral check
+    if mask.any():
+        candidates = np.flatnonzero(mask)
+        candidate_values = values[candidates]
+        mask[candidates] = candidate_values == np.floor(candidate_values)
+    return mask
+
+
+def column_semantic_null_intervals(schema: Dict[str, ColumnMetadata]) -> Dict[str, np.ndarray]:
+    """
+    Build the interval mapping for every column with missing-value codes.
+
+    Args:
+        schema: Metadata from parse_codebook_html
+
+    Returns:
+        Dictionary mapping SAS variable names to intervals, omitting columns without any
+    """
+    intervals_by_column = {}
+    for name, column_meta in schema.items():
+        intervals = semantic_null_intervals(column_meta.value_ranges)
+        if len(intervals):
+            intervals_by_column[name] = intervals
+    return intervals_by_column
+
+
+def apply_semantic_nulls(df: pd.DataFrame, intervals_by_column: Dict[str, np.ndarray],
+                         columns: Optional[List[str]] = None) -> Tuple[pd.DataFrame, Dict[str, int]]:
+    """
+    Replace semantic null codes with NaN across columns in a single pass.
+
+    Each column's mask is built once, and only columns that contain nulls are
+    replaced. Replacement swaps in a new column instead of assigning through
+    .loc. Non-numeric columns are left unchanged.
+
+    Args:
+        df: DataFrame to modify in place
+        intervals_by_column: Mapping from column_semantic_null_intervals()
+        columns: Columns to process (default: every column in both df and the mapping)
+
+    Returns:
+        Tuple of (df, number of values converted per changed column)
+    """
+    if columns is None:
+        columns = [col for col in df.columns if col in intervals_by_column]
+    else:
+        columns = [col for col in columns if col in df.columns and col in intervals_by_column]
+
+    conversions = {}
+    for col_name in columns:
+        series = df[col_name]
+        if not pd.api.types.is_numeric_dtype(series.dtype):
+            continue
+        mask = semantic_null_mask(series.to_numpy(dtype='float64', na_value=np.nan),
+                                  intervals_by_column[col_name])
+        count = int(mask.sum())
+        if count:
+            if isinstance(series.dtype, np.dtype) and series.dtype.kind == 'f':
+                # Plain float columns take NaN directly; skipping Series.mask avoids an extra copy
+                df[col_name] = np.where(mask, np.nan, series.to_numpy())
+            else:
+                # Integer columns upcast and nullable dtypes get <NA>, as .loc assignment would
+                df[col_name] = series.mask(mask)
+            conversions[col_name] = count
+    return df, conversions
+
+
+def apply_semantic_nulls_arrow(table: pa.Table, intervals_by_column: Dict[str, np.ndarray]) -> Tuple[pa.Table, Dict[str, int]]:
+    """
+    Replace semantic null codes with nulls in an Arrow table.
+
+    Uses the same interval masks as apply_semantic_nulls, so the result matches
+    converting the pandas frame. Columns without nulls are carried over without
+    copying.
+
+    Args:
+        table: Arrow table to convert
+        intervals_by_column: Mapping from column_semantic_null_intervals()
+
+    Returns:
+        Tuple of (new table, number of values converted per changed column)
+    """
+    conversions = {}
+    for col_name in table.column_names:
+        if col_name not in intervals_by_column:
+            continue
+        column = table.column(col_name)
+        if not (pa.types.is_integer(column.type) or pa.types.is_floating(column.type)):
+            continue
+        values = column.to_numpy(zero_copy_only=False).astype('float64', copy=False)
+        mask = semantic_null_mask(values, intervals_by_column[col_name])
+        count = int(mask.sum())
+        if count:
+            converted = pc.if_else(pa.array(mask), pa.scalar(None, type=column.type), column)
+            table = table.set_column(table.schema.get_field_index(col_name), col_name, converted)
+            conversions[col_name] = count
+    return table, conversions
@@ -1,6 +1,7 @@
 import re
+from html import unescape
 from pathlib import Path
-from typing import Optional, Dict, List, Any, Union
+from typing import Optional, Dict, List, Any, Union, NamedTuple, Iterator
 
 import pandas as pd
 from bs4 import PageElement, BeautifulSoup
@@ -85,6 +86,45 @@ class ColumnMetadata(BaseModel):
     demographic_analysis_score: Optional[float] = None  # Random Forest accuracy score for demographic prediction
 
 
+# Parser backends accepted by parse_codebook_html
+PARSER_ENGINES = ('fast', 'bs4')
+
+# Value codes are either a single integer or a range such as "1 - 30" or "1-30"
+VALUE_RANGE_RE = re.compile(r'^(\d+)\s*[-–]\s*(\d+)$')
+
+# Field patterns for the metadata cell at the top of each variable's table
+LABEL_RE = re.compile(r'Label:\s*(.+?)(?=Section\s*Name:|Core\s*Section\s*Number:|Module\s*Number:|$)', re.DOTALL)
+SECTION_NAME_RE = re.compile(r'Section\s*Name:\s*(.+?)(?=Core\s*Section\s*Number:|Section\s*Number:|Module\s*Number:|Question\s*Number:|$)', re.DOTALL)
+# Handle both "Core Section Number" and "Section Number"
+SECTION_NUMBER_RE = re.compile(r'(?:Core\s*)?Section\s*Number:\s*(\d+)')
+MODULE_NUMBER_RE = re.compile(r'Module\s*Number:\s*(\d+)')
+QUESTION_NUMBER_RE = re.compile(r'Question\s*Number:\s*(\d+)')
+COLUMN_RE = re.compile(r'Column:\s*(.+?)(?=Type\s*of\s*Variable:|$)', re.DOTALL)
+TYPE_RE = re.compile(r'Type\s*of\s*Variable:\s*(.+?)(?=SAS\s*Variable\s*Name:|$)', re.DOTALL)
+SAS_NAME_RE = re.compile(r'SAS\s*Variable\s*Name:\s*(.+?)(?=Question\s*Prologue:|Question:|$)', re.DOTALL)
+PROLOGUE_RE = re.compile(r'Question\s*Prologue:\s*(.+?)(?=Question:|$)', re.DOTALL)
+QUESTION_RE = re.compile(r'Question:\s*(.+?)$', re.DOTALL)
+
+# Markup patterns used by the 'fast' engine. The SAS generated codebook is regular
+# enough that each branch can be sliced out of the raw text without building a DOM.
+_BRANCH_RE = re.compile(r'<div\b[^>]*\bclass="branch"[^>]*>')
+_ANCHOR_RE = re.compile(r'<a\b([^>]*)>')
+_NAME_ATTR_RE = re.compile(r'\bname="([^"]*)"')
+_REPORT_TABLE_RE = re.compile(r'<table\b[^>]*\bsummary="Procedure Report: Report"[^>]*>')
+_THEAD_RE = re.compile(r'<thead\b[^>]*>')
+_TBODY_RE = re.compile(r'<tbody\b[^>]*>')
+_TR_RE = re.compile(r'<tr\b[^>]*>(.*?)</tr>', re.DOTALL)
+_TD_RE = re.compile(r'<td\b[^>]*>(.*?)</td>', re.DOTALL)
+_TAG_RE = re.compile(r'<[^>]*>')
+
+
+class CodebookBranch(NamedTuple):
+    """Raw text extracted from one variable's block (div.branch) of the codebook."""
+    html_name: str                            # HTML anchor name for the variable
+    metadata_text: str                        # Text of the Label/Section/SAS Variable Name cell
+    value_rows: Optional[List[List[str]]]     # Text of each td in the value table body rows
+
+
 def is_missing_value(description: str) -> bool:
     """
     Determine if a value description indicates missing data.
@@ -136,16 +176,20 @@ def get_value_def(tr:PageElement, df: Optional[pd.DataFrame] = None, column_name
         Either a ValueDef (for non-numeric or unparseable values) or
         ValueRange (for single numbers or numeric ranges)
     """
-    cells = tr.find_all('td')
+    cells = [td.text for td in tr.find_all('td')]
+    return _value_def_from_cells(cells, df, column_name)
+
 
-    value_text = cells[0].text.strip()
-    description = cells[1].text.strip()
+def _value_def_from_cells(cells: List[str], df: Optional[pd.DataFrame] = None, column_name: Optional[str] = None) -> ValueDef | ValueRange:
+    """Build a ValueDef/ValueRange from the raw text of a value row's cells."""
+    value_text = cells[0].strip()
+    description = cells[1].strip()
 
     # Determine if this value indicates missing data
     indicates_missing = is_missing_value(description)
 
     # Check if the value is actually a range such as "1 - 30" or "1-30"
-    range_match = re.match(r'^(\d+)\s*[-–]\s*(\d+)$', value_text)
+    range_match = VALUE_RANGE_RE.match(value_text)
     if range_match:
         start = int(range_match.group(1))
         end = int(range_match.group(2))
@@ -247,10 +291,15 @@ def get_value_ranges(table:PageElement, df: Optional[pd.DataFrame] = None, colum
     </tbody>
     </table>
     """
+    return _value_ranges_from_rows(_table_value_rows(table), df, column_name)
+
+
+def _value_ranges_from_rows(value_rows: List[List[str]], df: Optional[pd.DataFrame] = None, column_name: Optional[str] = None) -> list[ValueDef]:
+    """Build the value definitions for a column from its value table rows."""
     value_ranges : list[ValueDef] = []
 
-    for tr in table.find('tbody').find_all('tr'):
-        value_ranges.append(get_value_def(tr, df, column_name))
+    for cells in value_rows:
+        value_ranges.append(_value_def_from_cells(cells, df, column_name))
 
     return value_ranges
 
@@ -269,24 +318,27 @@ def get_value_lookup(table: PageElement) -> Dict[Union[None, int], str]:
     Returns:
         Dictionary mapping numeric values (or None) to their text descriptions
     """
+    return _value_lookup_from_rows(_table_value_rows(table))
+
+
+def _value_lookup_from_rows(value_rows: List[List[str]]) -> Dict[Union[None, int], str]:
+    """Build the value lookup dictionary for a column from its value table rows."""
     value_dict: Dict[Union[None, int], str] = {}
     
-    for tr in table.find('tbody').find_all('tr'):
-        cells = tr.find_all('td')
+    for cells in value_rows:
         if len(cells) < 2:
             continue
             
-        value_text = cells[0].text.strip()
-        description = cells[1].text.strip()
+        value_text = cells[0].strip()
+        description = cells[1].strip()
         
         # Check if the value is actually a range such as "1 - 30" or "1-30"
-        range_match = re.match(r'^(\d+)\s*[-–]\s*(\d+)$', value_text)
+        range_match = VALUE_RANGE_RE.match(value_text)
         if range_match:
             start = int(range_match.group(1))
             end = int(range_match.group(2))
             # Add each value in the range
-            for i in range(start, end + 1):
-                value_dict[i] = description
+            value_dict.update(dict.fromkeys(range(start, end + 1), description))
         else:
             # Try to parse as single integer
             try:
@@ -299,20 +351,32 @@ def get_value_lookup(table: PageElement) -> Dict[Union[None, int], str]:
     return value_dict
 
 
-def parse_codebook_html(html_path: Path, df: Optional[pd.DataFrame] = None) -> Dict[str, ColumnMetadata]:
-    """
-    Parse the BRFSS codebook HTML file and extract column metadata.
+def _table_value_rows(table: PageElement) -> List[List[str]]:
+    """Return the td text of every row in a BeautifulSoup table's tbody."""
+    return [[td.text for td in tr.find_all('td')] for tr in table.find('tbody').find_all('tr')]
 
-    Args:
-        html_path: Path to the HTML codebook file
-        df: Optional DataFrame containing BRFSS data for calculating statistics
 
-    Returns:
-        Dictionary mapping SAS variable names to ColumnMetadata objects
+def _element_content(markup: str, open_re: re.Pattern, close_tag: str) -> Optional[str]:
+    """Return the markup between the first opening tag matching open_re and close_tag."""
+    opening = open_re.search(markup)
+    if not opening:
+        return None
+    end = markup.find(close_tag, opening.end())
+    return markup[opening.end():end if end >= 0 else len(markup)]
+
+
+def _markup_text(markup: str) -> str:
+    """Return the text content of an HTML fragment, equivalent to BeautifulSoup's get_text()."""
+    return unescape(_TAG_RE.sub('', markup))
+
+
+def _iter_branches_bs4(html_content: str) -> Iterator[CodebookBranch]:
     """
-    with open(html_path, 'r', encoding='windows-1252') as f:
-        html_content = f.read()
+    Yield the variable blocks of the codebook using a full BeautifulSoup tree.
 
+    This is the reference implementation; it is kept selectable for verifying
+    the 'fast' engine.
+    """
     soup = BeautifulSoup(html_content, 'html.parser')
 
     # Find all div elements with class "branch"
@@ -321,8 +385,6 @@ def parse_codebook_html(html_path: Path, df: Optional[pd.DataFrame] = None) -> D
     # The first one is the Codebook header table which we don't want
     branches = branches[1:]
 
-    metadata_dict = {}
-
     for branch in branches:
         html_name = branch.find('a')['name']
         # Find the table with summary="Procedure Report: Report"
@@ -340,38 +402,132 @@ def parse_codebook_html(html_path: Path, df: Optional[pd.DataFrame] = None) -> D
             continue
 
         # Find td with metadata content - may not have all classes
-        metadata_cell = None
+        metadata_text = None
         for td in first_tr.find_all('td'):
             text = td.get_text()
             if text:
                 # Clean text before checking
                 text_clean = text.replace('\xa0', ' ')
                 if 'Label:' in text_clean and 'SAS Variable Name:' in text_clean:
-                    metadata_cell = td
+                    metadata_text = text
+                    break
+
+        if not metadata_text:
+            continue
+
+        value_rows = _table_value_rows(table) if table.find('tbody') else None
+
+        yield CodebookBranch(html_name, metadata_text, value_rows)
+
+
+def _iter_branches_fast(html_content: str) -> Iterator[CodebookBranch]:
+    """
+    Yield the variable blocks of the codebook by slicing the raw markup.
+
+    Only the div.branch blocks are visited and only the cells that are needed
+    are turned into text, so no document tree is ever built.
+    """
+    starts = [match.start() for match in _BRANCH_RE.finditer(html_content)]
+    ends = starts[1:] + [len(html_content)]
+
+    # The first one is the Codebook header table which we don't want
+    for start, end in list(zip(starts, ends))[1:]:
+        branch = html_content[start:end]
+
+        anchor = _ANCHOR_RE.search(branch)
+        html_name = _NAME_ATTR_RE.search(anchor.group(1)).group(1)
+
+        table = _element_content(branch, _REPORT_TABLE_RE, '</table>')
+        if table is None:
+            continue
+
+        thead = _element_content(table, _THEAD_RE, '</thead>')
+        if thead is None:
+            continue
+
+        first_tr = _TR_RE.search(thead)
+        if not first_tr:
+            continue
+
+        metadata_text = None
+        for td in _TD_RE.findall(first_tr.group(1)):
+            text = _markup_text(td)
+            if text:
+                text_clean = text.replace('\xa0', ' ')
+                if 'Label:' in text_clean and 'SAS Variable Name:' in text_clean:
+                    metadata_text = text
                     break
 
-        if not metadata_cell:
+        if not metadata_text:
             continue
 
-        cell_text = metadata_cell.get_text()
+        tbody = _element_content(table, _TBODY_RE, '</tbody>')
+        value_rows = None
+        if tbody is not None:
+            value_rows = [[_markup_text(td) for td in _TD_RE.findall(tr)] for tr in _TR_RE.findall(tbody)]
+
+        yield CodebookBranch(html_name, metadata_text, value_rows)
+
+
+def iter_codebook_branches(html_path: Path, engine: str = 'fast') -> Iterator[CodebookBranch]:
+    """
+    Read the codebook and yield the raw text of each variable block.
+
+    Args:
+        html_path: Path to the HTML codebook file
+        engine: Parser backend, one of PARSER_ENGINES. 'fast' slices the markup with
+                precompiled patterns; 'bs4' builds a BeautifulSoup tree with html.parser.
+
+    Returns:
+        Iterator of CodebookBranch tuples in document order
+    """
+    if engine not in PARSER_ENGINES:
+        raise ValueError(f"Unknown parser engine '{engine}'. Expected one of {PARSER_ENGINES}")
+
+    with open(html_path, 'r', encoding='windows-1252') as f:
+        html_content = f.read()
+
+    if engine == 'bs4':
+        return _iter_branches_bs4(html_content)
+    return _iter_branches_fast(html_content)
+
+
+def parse_codebook_html(html_path: Path, df: Optional[pd.DataFrame] = None, engine: str = 'fast') -> Dict[str, ColumnMetadata]:
+    """
+    Parse the BRFSS codebook HTML file and extract column metadata.
+
+    Without a DataFrame only the codebook schema is returned: value range counts
+    are 0 and statistics are None. With a DataFrame the statistics stage
+    (add_statistics) is run on the parsed schema.
+
+    Args:
+        html_path: Path to the HTML codebook file
+        df: Optional DataFrame containing BRFSS data for calculating statistics
+        engine: Parser backend, one of PARSER_ENGINES (default: 'fast')
+
+    Returns:
+        Dictionary mapping SAS variable names to ColumnMetadata objects
+    """
+    metadata_dict = {}
+
+    for branch in iter_codebook_branches(html_path, engine):
+        html_name = branch.html_name
 
         # Check if this cell contains column metadata by looking for key fields
         try:
             # Extract fields using regex - handle non-breaking spaces
-            cell_text = cell_text.replace('\xa0', ' ')  # Replace non-breaking spaces
-
-            label_match = re.search(r'Label:\s*(.+?)(?=Section\s*Name:|Core\s*Section\s*Number:|Module\s*Number:|$)', cell_text, re.DOTALL)
-            section_name_match = re.search(r'Section\s*Name:\s*(.+?)(?=Core\s*Section\s*Number:|Section\s*Number:|Module\s*Number:|Question\s*Number:|$)', cell_text, re.DOTALL)
-            # Handle both "Core Section Number" and "Section Number"
-            section_number_match = re.search(r'(?:Core\s*)?Section\s*Number:\s*(\d+)', cell_text)
-            # Handle "Module Number"
-            module_number_match = re.search(r'Module\s*Number:\s*(\d+)', cell_text)
-            question_number_match = re.search(r'Question\s*Number:\s*(\d+)', cell_text)
-            column_match = re.search(r'Column:\s*(.+?)(?=Type\s*of\s*Variable:|$)', cell_text, re.DOTALL)
-            type_match = re.search(r'Type\s*of\s*Variable:\s*(.+?)(?=SAS\s*Variable\s*Name:|$)', cell_text, re.DOTALL)
-            sas_name_match = re.search(r'SAS\s*Variable\s*Name:\s*(.+?)(?=Question\s*Prologue:|Question:|$)', cell_text, re.DOTALL)
-            prologue_match = re.search(r'Question\s*Prologue:\s*(.+?)(?=Question:|$)', cell_text, re.DOTALL)
-            question_match = re.search(r'Question:\s*(.+?)$', cell_text, re.DOTALL)
+            cell_text = branch.metadata_text.replace('\xa0', ' ')  # Replace non-breaking spaces
+
+            label_match = LABEL_RE.search(cell_text)
+            section_name_match = SECTION_NAME_RE.search(cell_text)
+            section_number_match = SECTION_NUMBER_RE.search(cell_text)
+            module_number_match = MODULE_NUMBER_RE.search(cell_text)
+            question_number_match = QUESTION_NUMBER_RE.search(cell_text)
+            column_match = COLUMN_RE.search(cell_text)
+            type_match = TYPE_RE.search(cell_text)
+            sas_name_match = SAS_NAME_RE.search(cell_text)
+            prologue_match = PROLOGUE_RE.search(cell_text)
+            question_match = QUESTION_RE.search(cell_text)
 
             # Only require label and SAS variable name
             if label_match and sas_name_match:
@@ -394,113 +550,8 @@ def parse_codebook_html(html_path: Path, df: Optional[pd.DataFrame] = None) -> D
                 if question_prologue and not question_prologue:
                     question_prologue = None
 
-                # Calculate statistics if DataFrame is provided and column exists
-                statistics = None
-                if df is not None and sas_variable_name in df.columns:
-                    series = df[sas_variable_name]
-
-                    # Get value ranges first to identify missing codes
-                    value_ranges_temp = get_value_ranges(table, df, sas_variable_name)
-                    missing_codes = get_missing_value_codes(value_ranges_temp)
-
-                    # Calculate basic counts
-                    null_count = int(series.isna().sum())
-                    total_non_null = int(series.count())
-                    
-                    # Count missing values (those marked as indicates_missing=True)
-                    missing_count = 0
-                    if missing_codes:
-                        missing_count = int(series.isin(missing_codes).sum())
-                    
-                    # Count meaningful (non-null, non-missing) values
-                    meaningful_count = total_non_null - missing_count
-                    total_responses = total_non_null  # All non-null responses
-                    unique_count = series.nunique()
-
-                    # Determine if column should be treated as numeric or categorical
-                    is_numeric = False
-                    if type_of_variable == "Num" and pd.api.types.is_numeric_dtype(series):
-                        try:
-                            # Filter out missing values for numeric calculations
-                            meaningful_series = series.dropna()
-                            if missing_codes:
-                                meaningful_series = meaningful_series[~meaningful_series.isin(missing_codes)]
-                            
-                            if len(meaningful_series) > 0:
-                                # Calculate numeric statistics on meaningful data only
-                                desc = meaningful_series.describe()
-
-                                # Create numeric statistics
-                                statistics = NumericStatistics(
-                                    count=meaningful_count,
-                                    null_count=null_count,
-                                    missing_count=missing_count,
-                                    unique_count=unique_count,
-                                    total_responses=total_responses,
-                                    mean=float(desc['mean']) if not pd.isna(desc['mean']) else None,
-                                    std=float(desc['std']) if not pd.isna(desc['std']) else None,
-                                    min=float(desc['min']) if not pd.isna(desc['min']) else None,
-                                    q25=float(desc['25%']) if not pd.isna(desc['25%']) else None,
-                                    median=float(desc['50%']) if not pd.isna(desc['50%']) else None,
-                                    q75=float(desc['75%']) if not pd.isna(desc['75%']) else None,
-                                    max=float(desc['max']) if not pd.isna(desc['max']) else None
-                                )
-                                is_numeric = True
-                            else:
-                                print(f"No meaningful values found for numeric column {sas_variable_name}")
-                        except Exception as e:
-                            print(f"Error calculating numeric stats for {sas_variable_name}: {e}")
-                            is_numeric = False
-
-                    # If not numeric or numeric calculation failed, treat as categorical
-                    if not is_numeric:
-                        try:
-                            # Get value counts for all values (limited to top 20 for brevity)
-                            all_value_counts = series.value_counts().head(20).to_dict()
-
-                            # Convert all keys to strings for JSON compatibility
-                            value_counts_str = {str(k): int(v) for k, v in all_value_counts.items()}
-
-                            # Create list of top values with counts and descriptions
-                            top_values = []
-                            for value, count in all_value_counts.items():
-                                # Try to get description from value_lookup
-                                description = None
-                                is_missing = False
-                                
-                                if isinstance(value, (int, float)) and not pd.isna(value):
-                                    value_int = int(value) if hasattr(value, 'is_integer') and value.is_integer() else int(value) if isinstance(value, int) else None
-                                    # Check if this value indicates missing data
-                                    is_missing = value_int in missing_codes if value_int is not None else False
-                                    
-                                    # Search through ValueRange objects to find a match
-                                    for val_def in value_ranges_temp:
-                                        if isinstance(val_def, ValueRange) and value_int is not None and val_def.start <= value_int <= val_def.end:
-                                            description = val_def.description
-                                            break
-
-                                top_values.append({
-                                    "value": str(value),
-                                    "count": int(count),
-                                    "description": description if description else "Unknown",
-                                    "is_missing": is_missing
-                                })
-
-                            # Create categorical statistics
-                            statistics = CategoricalStatistics(
-                                count=meaningful_count,
-                                null_count=null_count,
-                                missing_count=missing_count,
-                                unique_count=unique_count,
-                                total_responses=total_responses,
-                                value_counts=value_counts_str,
-                                top_values=top_values
-                            )
-                        except Exception as e:
-                            print(f"Error calculating categorical stats for {sas_variable_name}: {e}")
-
                 # Get value ranges and validate they exist
-                value_ranges = get_value_ranges(table, df, sas_variable_name)
+                value_ranges = _value_ranges_from_rows(branch.value_rows)
                 if not value_ranges or len(value_ranges) == 0:
                     raise ValueError(f"Column '{sas_variable_name}' has no value ranges defined in codebook table. "
                                     f"This may indicate a parsing issue or missing value definitions. "
@@ -519,11 +570,13 @@ def parse_codebook_html(html_path: Path, df: Optional[pd.DataFrame] = None) -> D
                     question_prologue=question_prologue,
                     question=question,
                     value_ranges=value_ranges,
-                    value_lookup=get_value_lookup(table),
+                    value_lookup=None,
                     computed= True if section_name == 'Calculated Variables' or section_name == 'Calculated Race Variables' else False,
-                    html_name=html_name,
-                    statistics=statistics
+                    html_name=html_name
                 )
+                # The lookup expands every range code by code (over a million entries across
+                # the codebook) and is already typed, so it is attached after validation
+                metadata.value_lookup = _value_lookup_from_rows(branch.value_rows)
 
                 metadata_dict[sas_variable_name] = metadata
 
@@ -531,4 +584,8 @@ def parse_codebook_html(html_path: Path, df: Optional[pd.DataFrame] = None) -> D
             # Skip cells that don't parse correctly but show problems
             print(e)
 
+    if df is not None:
+        from .statistics import add_statistics
+        metadata_dict = add_statistics(metadata_dict, df)
+
     return metadata_dict
@@ -0,0 +1,471 @@
+"""
+Job Scheduler
+Runs independent jobs (one model fit per target column) in long-lived worker
+processes, longest predicted job first, within a memory budget and with
+per-job timeouts.
+Job costs are predicted from each job's row and class counts by a per-engine
+cost model that learns from the actual costs recorded on earlier runs.
+"""
+
+import os
+import json
+import logging
+import tempfile
+import time
+import multiprocessing
+from multiprocessing.connection import wait
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterator, List, NamedTuple, Optional, Sequence, Tuple, Union
+
+import numpy as np
+from pydantic import BaseModel
+
+from .cache import default_cache_dir
+from .memory import current_rss_mb, peak_rss_mb, reset_peak_rss
+
+logger = logging.getLogger(__name__)
+
+# Prior costs per engine, measured with run_jobs on the 2023 file at 80k and 347k rows
+# per target: fixed seconds per job (permutation importance on a fixed sample) plus
+# seconds per unit of work, where work is rows * (1 + class_weight *
+# (classes - 2)). Random forests and naive Bayes cost about the same for any number
+# of classes; gradient boosting and multinomial logistic regression grow with it.
+# Memory is the peak a job adds to its worker: fixed MB plus MB per unit of memory
+# work, rows scaled the same way by memory_class_weight. Memory is nearly flat up to
+# a few classes and only grows noticeably for targets with hundreds.
+PRIOR_COSTS = {
+    'random_forest': {'fixed_seconds': 0.5, 'seconds_per_work': 1.1e-4, 'class_weight': 0.05,
+                      'fixed_mb': 24.0, 'mb_per_work': 2.0e-4, 'memory_class_weight': 0.02},
+    'hist_gradient_boosting': {'fixed_seconds': 1.0, 'seconds_per_work': 2.6e-6, 'class_weight': 0.8,
+                               'fixed_mb': 16.0, 'mb_per_work': 3.0e-4, 'memory_class_weight': 0.05},
+    'logistic': {'fixed_seconds': 1.3, 'seconds_per_work': 4.1e-6, 'class_weight': 0.9,
+                 'fixed_mb': 13.0, 'mb_per_work': 4.6e-4, 'memory_class_weight': 0.02},
+    'naive_bayes': {'fixed_seconds': 1.9, 'seconds_per_work': 1.0e-7, 'class_weight': 0.0,
+                    'fixed_mb': 14.0, 'mb_per_work': 4.6e-4, 'memory_class_weight': 0.0},
+}
+
+# Used for engines without a prior
+DEFAULT_PRIOR = {'fixed_seconds': 2.0, 'seconds_per_work': 1.0e-4, 'class_weight': 0.5,
+                 'fixed_mb': 50.0, 'mb_per_work': 1.0e-3, 'memory_class_weight': 0.05}
+
+# Row counts at which the prior enters the fit as one pseudo-observation each
+PRIOR_ROWS = (50_000, 350_000)
+
+# Derived timeouts: this multiple of the predicted time, but never less than MIN_JOB_TIMEOUT seconds
+TIMEOUT_FACTOR = 10.0
+MIN_JOB_TIMEOUT = 600.0
+
+# Fraction of the available memory used as the default budget
+MEMORY_BUDGET_FRACTION = 0.8
+
+JOB_STATUSES = ('completed', 'failed', 'timed_out', 'cancelled')
+
+
+class Job(NamedTuple):
+    """One unit of work: func(args) run in a worker process."""
+    key: str  # Unique name, e.g. the target column
+    args: Any  # Passed to the job function; must be picklable
+    rows: int  # Rows the job fits on
+    classes: int  # Number of target classes
+
+
+class CostEstimate(NamedTuple):
+    """Predicted cost of one job."""
+    seconds: float
+    memory_mb: float
+
+
+class JobOutcome(NamedTuple):
+    """What happened to one job."""
+    key: str
+    status: str  # One of JOB_STATUSES
+    result: Any  # Return value of the job function, None unless completed
+    predicted: CostEstimate
+    seconds: float  # Wall time of the job function if the worker returned, else from dispatch to exit or cancellation
+    memory_mb: Optional[float]  # Peak memory the job added to its worker, None unless completed and measurable
+    error: Optional[str] = None
+
+
+class CostObservation(BaseModel):
+    """One recorded job cost, kept in the cost history file."""
+    engine: str
+    rows: int
+    classes: int
+    status: str
+    seconds: float
+    memory_mb: Optional[float] = None
+    predicted_seconds: float
+    predicted_memory_mb: float
+    recorded_at: float
+
+
+class CostModel:
+    """
+    Per-engine job cost model that learns from recorded runs.
+
+    Predicted time is fixed_seconds + seconds_per_work * work, where work =
+    rows * (1 + class_weight * (classes - 2)) and class_weight comes from
+    PRIOR_COSTS. Predicted memory is fixed_mb + mb_per_work * memory work,
+    with rows scaled by memory_class_weight instead. Both lines
+    are least-squares fits over the recorded jobs of the engine plus the
+    engine's prior at PRIOR_ROWS, so predictions start at the prior and
+    follow the recorded costs as jobs accumulate. A job that timed out only
+    bounds its time from below, so it is fitted only if it ran longer than
+    the completed jobs predict.
+
+    The history (the last history_limit observations) is stored as JSON so
+    each run starts from what earlier runs measured.
+    """
+
+    def __init__(self, path: Optional[Union[str, Path]] = None, history_limit: int = 1000):
+        """
+        Load the cost history.
+
+        Args:
+            path: JSON history file (default: job_costs.json in default_cache_dir());
+                a missing or unreadable file starts an empty history
+            history_limit: Most recent observations to keep
+        """
+        self.path = Path(path) if path else default_cache_dir() / 'job_costs.json'
+        self.history_limit = history_limit
+        self.observations: List[CostObservation] = []
+        if self.path.exists():
+            try:
+                with open(self.path) as f:
+                    self.observations = [CostObservation(**entry) for entry in json.load(f)]
+            except Exception as e:
+                logger.warning(f"Ignoring unreadable job cost history {self.path}: {e}")
+
+    @staticmethod
+    def work(engine: str, rows: int, classes: int) -> float:
+        """Return the time work units of a job: rows scaled by the engine's class_weight."""
+        class_weight = PRIOR_COSTS.get(engine, DEFAULT_PRIOR)['class_weight']
+        return rows * (1 + class_weight * max(classes - 2, 0))
+
+    @staticmethod
+    def memory_work(engine: str, rows: int, classes: int) -> float:
+        """Return the memory work units of a job: rows scaled by the engine's memory_class_weight."""
+        class_weight = PRIOR_COSTS.get(engine, DEFAULT_PRIOR)['memory_class_weight']
+        return rows * (1 + class_weight * max(classes - 2, 0))
+
+    @staticmethod
+    def _fit_line(x: List[float], y: List[float]) -> Tuple[float, float]:
+        """Least-squares (intercept, slope) of y on x, both kept non-negative."""
+        x, y = np.asarray(x, dtype=np.float64), np.asarray(y, dtype=np.float64)
+        design = np.column_stack([np.ones_like(x), x])
+        intercept, slope = np.linalg.lstsq(design, y, rcond=None)[0]
+        if slope < 0:
+            return max(float(y.mean()), 0.0), 0.0
+        if intercept < 0:
+            return 0.0, float(x @ y / (x @ x))
+        return float(intercept), float(slope)
+
+    def coefficients(self, engine: str) -> Dict[str, float]:
+        """
+        Return the fitted cost coefficients of an engine.
+
+        Args:
+            engine: Engine name
+
+        Returns:
+            Dictionary with fixed_seconds, seconds_per_work, fixed_mb and mb_per_work
+        """
+        prior = PRIOR_COSTS.get(engine, DEFAULT_PRIOR)
+        work = [self.work(engine, rows, 2) for rows in PRIOR_ROWS]
+        seconds = [prior['fixed_seconds'] + prior['seconds_per_work'] * units for units in work]
+        memory_work = [self.memory_work(engine, rows, 2) for rows in PRIOR_ROWS]
+        memory = [prior['fixed_mb'] + prior['mb_per_work'] * units for units in memory_work]
+        timed_out = []
+        for observation in self.observations:
+            if observation.engine != engine:
+                continue
+            if observation.status == 'completed':
+                work.append(self.work(engine, observation.rows, observation.classes))
+                seconds.append(observation.seconds)
+            elif observation.status == 'timed_out':
+                timed_out.append(observation)
+            if observation.memory_mb is not None:
+                memory_work.append(self.memory_work(engine, observation.rows, observation.classes))
+                memory.append(observation.memory_mb)
+
+        fixed_seconds, seconds_per_work = self._fit_line(work, seconds)
+        longer = [observation for observation in timed_out
+                  if observation.seconds > fixed_seconds + seconds_per_work
+                  * self.work(engine, observation.rows, observation.classes)]
+        if longer:
+            work += [self.work(engine, observation.rows, observation.classes) for observation in longer]
+            seconds += [observation.seconds for observation in longer]
+            fixed_seconds, seconds_per_work = self._fit_line(work, seconds)
+        fixed_mb, mb_per_work = self._fit_line(memory_work, memory)
+        return {'fixed_seconds': fixed_seconds, 'seconds_per_work': seconds_per_work,
+                'fixed_mb': fixed_mb, 'mb_per_work': mb_per_work}
+
+    def predict(self, engine: str, rows: int, classes: int) -> CostEstimate:
+        """
+        Predict the cost of fitting one model.
+
+        Args:
+            engine: Engine name
+            rows: Rows the model is fitted on
+            classes: Number of target classes
+
+        Returns:
+            CostEstimate with the predicted wall time and peak memory
+        """
+        fit = self.coefficients(engine)
+        return CostEstimate(seconds=fit['fixed_seconds'] + fit['seconds_per_work'] * self.work(engine, rows, classes),
+                            memory_mb=fit['fixed_mb'] + fit['mb_per_work'] * self.memory_work(engine, rows, classes))
+
+    def record(self, engine: str, job: Job, outcome: JobOutcome) -> None:
+        """Add a finished job's actual cost to the history; failed and cancelled jobs are not recorded."""
+        if outcome.status not in ('completed', 'timed_out'):
+            return
+        self.observations.append(CostObservation(
+            engine=engine, rows=job.rows, classes=job.classes, status=outcome.status,
+            seconds=outcome.seconds, memory_mb=outcome.memory_mb,
+            predicted_seconds=outcome.predicted.seconds, predicted_memory_mb=outcome.predicted.memory_mb,
+            recorded_at=time.time(),
+        ))
+        self.observations = self.observations[-self.history_limit:]
+
+    def save(self) -> Path:
+        """
+        Write the history atomically.
+
+        Returns:
+            Path of the written history file
+        """
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        fd, tmp_name = tempfile.mkstemp(dir=self.path.parent, suffix='.tmp')
+        try:
+            with os.fdopen(fd, 'w') as f:
+                json.dump([observation.model_dump() for observation in self.observations], f)
+            os.replace(tmp_name, self.path)
+        except BaseException:
+            if os.path.exists(tmp_name):
+                os.unlink(tmp_name)
+            raise
+        return self.path
+
+
+def available_memory_mb() -> Optional[float]:
+    """Return the memory available for new processes in MB, or None if it cannot be determined."""
+    meminfo = Path('/proc/meminfo')
+    if meminfo.exists():
+        for line in meminfo.read_text().splitlines():
+            if line.startswith('MemAvailable:'):
+                return int(line.split()[1]) / 1024
+    try:
+        return os.sysconf('SC_AVPHYS_PAGES') * os.sysconf('SC_PAGE_SIZE') / 1024 ** 2
+    except (ValueError, OSError, AttributeError):
+        return None
+
+
+def _worker_loop(conn, func: Callable, initializer: Optional[Callable], initargs: tuple) -> None:
+    """
+    Worker process body: run the initializer once, then jobs until told to stop.
+
+    Each job's args arrive on conn and the reply is ('ok', result, peak MB added,
+    seconds) or ('error', message, None, seconds). None or a closed pipe ends the
+    loop. If the initializer fails, every job is answered with its error.
+    """
+    init_error = None
+    try:
+        if initializer is not None:
+            initializer(*initargs)
+    except BaseException as e:
+        init_error = f"Worker initializer failed: {type(e).__name__}: {e}"
+    try:
+        while True:
+            try:
+                args = conn.recv()
+            except EOFError:
+                break
+            if args is None:
+                break
+            if init_error is not None:
+                conn.send(('error', init_error, None, 0.0))
+                continue
+            # The peak is reset per job where the OS allows; otherwise a job's peak is only
+            # known when it rises above every earlier job's in this worker
+            start_mb, resettable = current_rss_mb(), reset_peak_rss()
+            start_peak = peak_rss_mb()
+            started = time.perf_counter()
+            try:
+                result = func(args)
+            except BaseException as e:
+                conn.send(('error', f"{type(e).__name__}: {e}", None, time.perf_counter() - started))
+                continue
+            seconds = time.perf_counter() - started
+            peak = peak_rss_mb()
+            memory_mb = max(peak - start_mb, 0.0) if resettable or peak > start_peak else None
+            conn.send(('ok', result, memory_mb, seconds))
+    finally:
+        conn.close()
+
+
+class _Worker(NamedTuple):
+    process: multiprocessing.Process
+    conn: Any
+
+
+class _Running(NamedTuple):
+    job: Job
+    worker: _Worker
+    started: float
+    deadline: float
+    predicted: CostEstimate
+
+
+def run_jobs(jobs: Sequence[Job], func: Callable, engine: str, cost_model: Optional[CostModel] = None,
+             initializer: Optional[Callable] = None, initargs: tuple = (), max_workers: int = 4,
+             memory_budget_mb: Optional[float] = None, timeout: Optional[float] = None) -> Iterator[JobOutcome]:
+    """
+    Run jobs in worker processes and yield their outcomes as they finish.
+
+    Jobs are dispatched longest predicted time first, so the largest fits
+    start early instead of becoming stragglers. A job starts only while
+    fewer than max_workers are running and its predicted memory fits in
+    what the running jobs leave of the budget. When nothing fits, the next
+    job that does is started instead, and a job larger than the whole budget
+    runs alone.
+
+    Workers are started as jobs need them, up to max_workers, and each runs
+    initializer(*initargs) once and then func(job.args) for every job it is
+    handed over its own pipe, so shared state is attached once per worker
+    rather than once per job. A job past its timeout is cancelled by killing
+    its worker, which is replaced when the next job needs one; the other
+    workers keep running. Jobs still running when the caller stops iterating
+    are cancelled the same way, and idle workers are then told to exit.
+
+    Completed and timed-out jobs are recorded in cost_model, and the history
+    is saved when all jobs are done or the caller stops iterating.
+
+    Args:
+        jobs: Jobs to run; keys must be unique
+        func: Job function, called as func(job.args) in the worker; must be picklable
+        engine: Engine name the cost model predicts for
+        cost_model: Cost model to predict with and record into (default: CostModel())
+        initializer: Called with initargs once in each worker, like a pool initializer
+        initargs: Arguments for initializer
+        max_workers: Most jobs running at once
+        memory_budget_mb: Memory the running jobs' predictions may add up to (default:
+            MEMORY_BUDGET_FRACTION of available_memory_mb(); None if unknown means no cap)
+        timeout: Seconds a job may run (default: TIMEOUT_FACTOR times its prediction,
+            at least MIN_JOB_TIMEOUT)
+
+    Yields:
+        JobOutcome for each job, in completion order
+    """
+    cost_model = cost_model or CostModel()
+    max_workers = max(max_workers, 1)
+    if memory_budget_mb is None:
+        available = available_memory_mb()
+        memory_budget_mb = available * MEMORY_BUDGET_FRACTION if available is not None else None
+    predictions = {job.key: cost_model.predict(engine, job.rows, job.classes) for job in jobs}
+    pending = sorted(jobs, key=lambda job: predictions[job.key].seconds, reverse=True)
+    budget = f"{memory_budget_mb:,.0f} MB" if memory_budget_mb is not None else "unlimited"
+    logger.info(f"Scheduling {len(jobs)} jobs on up to {max_workers} workers, memory budget {budget}, "
+                f"predicted {sum(p.seconds for p in predictions.values()):.0f}s of work")
+
+    context = multiprocessing.get_context()
+    running: Dict[str, _Running] = {}
+    idle: List[_Worker] = []
+    spawned = 0
+
+    def spawn() -> _Worker:
+        nonlocal spawned
+        spawned += 1
+        parent_conn, child_conn = context.Pipe()
+        process = context.Process(target=_worker_loop, args=(child_conn, func, initializer, initargs),
+                                  name=f"job-worker-{spawned}")
+        process.start()
+        child_conn.close()
+        return _Worker(process, parent_conn)
+
+    def discard(worker: _Worker) -> None:
+        worker.conn.close()
+        if worker.process.is_alive():
+            worker.process.kill()
+        worker.process.join()
+
+    def start(job: Job) -> None:
+        predicted = predictions[job.key]
+        limit = timeout if timeout is not None else max(MIN_JOB_TIMEOUT, TIMEOUT_FACTOR * predicted.seconds)
+        while True:
+            worker = idle.pop() if idle else spawn()
+            try:
+                worker.conn.send(job.args)
+                break
+            except (BrokenPipeError, ConnectionResetError):
+                # An idle worker that died is replaced
+                discard(worker)
+        now = time.monotonic()
+        running[job.key] = _Running(job, worker, now, now + limit, predicted)
+
+    def finish(key: str, status: str, result: Any = None, memory_mb: Optional[float] = None,
+               seconds: Optional[float] = None, error: Optional[str] = None) -> JobOutcome:
+        entry = running.pop(key)
+        if status in ('completed', 'failed') and entry.worker.process.is_alive():
+            idle.append(entry.worker)
+        else:
+            # Timed out, cancelled or crashed: the worker is killed and replaced when needed
+            discard(entry.worker)
+        if seconds is None:
+            seconds = time.monotonic() - entry.started
+        outcome = JobOutcome(key=key, status=status, result=result, predicted=entry.predicted,
+                             seconds=seconds, memory_mb=memory_mb, error=error)
+        cost_model.record(engine, entry.job, outcome)
+        return outcome
+
+    try:
+        while pending or running:
+            # Start the longest pending jobs that fit beside the running ones
+            in_flight = sum(entry.predicted.memory_mb for entry in running.values())
+            for job in list(pending):
+                if len(running) >= max_workers:
+                    break
+                memory_mb = predictions[job.key].memory_mb
+                if running and memory_budget_mb is not None and in_flight + memory_mb > memory_budget_mb:
+                    continue
+                if memory_budget_mb is not None and memory_mb > memory_budget_mb:
+                    logger.warning(f"Job {job.key} is predicted to need {memory_mb:,.0f} MB, "
+                                   f"more than the {memory_budget_mb:,.0f} MB budget; running it alone")
+                pending.remove(job)
+                start(job)
+                in_flight += memory_mb
+
+            # Wait for a result, a worker exit or the nearest deadline
+            deadline = min(entry.deadline for entry in running.values())
+            ready = set(wait([entry.worker.conn for entry in running.values()]
+                             + [entry.worker.process.sentinel for entry in running.values()],
+                             timeout=max(deadline - time.monotonic(), 0)))
+
+            for key, entry in list(running.items()):
+                if entry.worker.conn in ready or entry.worker.process.sentinel in ready:
+                    try:
+                        kind, payload, memory_mb, seconds = entry.worker.conn.recv()
+                    except (EOFError, ConnectionResetError):
+                        entry.worker.process.join()
+                        yield finish(key, 'failed',
+                                     error=f"Worker exited with code {entry.worker.process.exitcode} before returning")
+                        continue
+                    if kind == 'ok':
+                        yield finish(key, 'completed', result=payload, memory_mb=memory_mb, seconds=seconds)
+                    else:
+                        yield finish(key, 'failed', seconds=seconds, error=payload)
+                elif time.monotonic() >= entry.deadline:
+                    yield finish(key, 'timed_out',
+                                 error=f"Cancelled after {entry.deadline - entry.started:.0f}s")
+    finally:
+        for key in list(running):
+            finish(key, 'cancelled', error="Cancelled")
+        for worker in idle:
+            try:
+                worker.conn.send(None)
+            except (BrokenPipeError, ConnectionResetError):
+                pass
+            worker.process.join(timeout=5)
+            discard(worker)
+        logger.debug(f"Started {spawned} workers for {len(jobs)} jobs")
+        cost_model.save()
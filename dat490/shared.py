@@ -0,0 +1,122 @@
+"""
+Shared Frames
+Publishes numeric DataFrame columns in one multiprocessing.shared_memory
+block so worker processes can attach to them without reading or copying.
+"""
+
+import logging
+from multiprocessing import shared_memory
+from typing import List, Optional, Sequence
+
+import numpy as np
+import pandas as pd
+from pydantic import BaseModel
+
+logger = logging.getLogger(__name__)
+
+
+class SharedFrameSpec(BaseModel):
+    """Everything a worker needs to attach to a published frame; small enough to pickle per pool."""
+    name: str  # Shared memory block name
+    columns: List[str]  # Column names, in block order
+    num_rows: int  # Rows per column
+
+
+class SharedFrame:
+    """
+    A float64 DataFrame whose data lives in a shared memory block.
+
+    The block holds one contiguous float64 array per column (column-major),
+    and frame is a DataFrame view over it, so attaching costs no reads or
+    copies and the pages are shared by every process. The frame is marked
+    read-only; callers copy the columns they modify. The index is not
+    shared: frame always has a RangeIndex.
+
+    The publishing process owns the block and must unlink it when done;
+    attached processes only close their mapping.
+
+    Example:
+        >>> with SharedFrame.publish(df, ['GENHLTH', 'EDUCA']) as shared:
+        ...     # workers call SharedFrame.attach(shared.spec).frame
+        ...     run_pool(shared.spec)
+    """
+
+    def __init__(self, shm: shared_memory.SharedMemory, spec: SharedFrameSpec, owner: bool):
+        self._shm = shm
+        self.spec = spec
+        self.owner = owner
+        values = np.ndarray((len(spec.columns), spec.num_rows), dtype=np.float64, buffer=shm.buf)
+        values.flags.writeable = False
+        # Transposing the column-major block gives one float64 block pandas wraps without copying
+        self.frame = pd.DataFrame(values.T, columns=spec.columns, copy=False)
+
+    @classmethod
+    def publish(cls, df: pd.DataFrame, columns: Optional[Sequence[str]] = None) -> 'SharedFrame':
+        """
+        Copy numeric columns of df into a new shared memory block.
+
+        Args:
+            df: Source DataFrame
+            columns: Columns to publish (default: all columns); duplicates are dropped
+
+        Returns:
+            The owning SharedFrame; pass its spec to workers
+
+        Raises:
+            ValueError: If a column is not numeric
+        """
+        columns = list(dict.fromkeys(df.columns if columns is None else columns))
+        for col in columns:
+            if not pd.api.types.is_numeric_dtype(df[col].dtype) or pd.api.types.is_bool_dtype(df[col].dtype):
+                raise ValueError(f"Column {col} has non-numeric dtype {df[col].dtype}")
+
+        num_rows = len(df)
+        # SharedMemory rejects a zero-byte block
+        size = max(len(columns) * num_rows * 8, 1)
+        shm = shared_memory.SharedMemory(create=True, size=size)
+        try:
+            values = np.ndarray((len(columns), num_rows), dtype=np.float64, buffer=shm.buf)
+            for i, col in enumerate(columns):
+                # Nullable and compact dtypes are widened; <NA> becomes NaN
+                values[i] = df[col].to_numpy(dtype='float64', na_value=np.nan)
+            del values
+        except BaseException:
+            shm.close()
+            shm.unlink()
+            raise
+
+        spec = SharedFrameSpec(name=shm.name, columns=columns, num_rows=num_rows)
+        logger.info(f"Published {len(columns)} columns x {num_rows:,} rows "
+                    f"({size / 1024 ** 2:.1f} MB) to shared memory {shm.name}")
+        return cls(shm, spec, owner=True)
+
+    @classmethod
+    def attach(cls, spec: SharedFrameSpec) -> 'SharedFrame':
+        """
+        Attach to a block published by another process.
+
+        Args:
+            spec: The publisher's SharedFrameSpec
+
+        Returns:
+            A non-owning SharedFrame over the same memory
+        """
+        shm = shared_memory.SharedMemory(name=spec.name)
+        return cls(shm, spec, owner=False)
+
+    def close(self) -> None:
+        """Drop this process's mapping; frame must not be used afterwards."""
+        self.frame = None
+        self._shm.close()
+
+    def unlink(self) -> None:
+        """Free the block once every process is done with it (owner only)."""
+        if self.owner:
+            self._shm.unlink()
+
+    def __enter__(self) -> 'SharedFrame':
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+        self.unlink()
@@ -0,0 +1,351 @@
+"""
+Column Statistics
+Computes the data-derived parts of ColumnMetadata (value range counts and
+statistics) from a single value_counts pass per column.
+"""
+
+import os
+from concurrent.futures import ThreadPoolExecutor, ProcessPoolExecutor
+from typing import Dict, List, Optional, Tuple, Union
+
+import numpy as np
+import pandas as pd
+
+from .parser import (
+    ColumnMetadata, ValueDef, ValueRange, NumericStatistics, CategoricalStatistics
+)
+from .lookup import ValueRangeIndex
+from .nulls import semantic_null_intervals, semantic_null_mask
+
+
+# Executors accepted by add_statistics
+STATISTICS_EXECUTORS = ('thread', 'process')
+
+# Default worker count for the statistics stage
+DEFAULT_STATISTICS_WORKERS = min(8, os.cpu_count() or 1)
+
+
+class ColumnHistogram:
+    """
+    Distinct non-null values of a column and how often each occurs.
+
+    Built from one value_counts pass; every count the statistics stage needs
+    (range counts, missing counts, top values) is answered from it instead of
+    rescanning the column.
+    """
+
+    def __init__(self, series: Optional[pd.Series] = None):
+        """
+        Build the histogram for a column.
+
+        Args:
+            series: Column data (None for an empty histogram to be filled by from_value_counts)
+        """
+        if series is None:
+            return
+        self.length = len(series)
+
+        # Unsorted counts keep first-appearance order so that sorting them matches
+        # series.value_counts() exactly, including the order of ties
+        self.value_counts = series.value_counts(sort=False, dropna=True)
+        self.numeric = pd.api.types.is_numeric_dtype(series.dtype)
+
+        # Nullable integer columns are the compact form of float64 codes (see
+        # dat490.dtypes); label their values as floats so statistics do not
+        # depend on the storage dtype
+        if self.numeric and pd.api.types.is_extension_array_dtype(series.dtype) and series.dtype.kind in 'iu':
+            self.value_counts.index = self.value_counts.index.astype('float64')
+        self._index_values()
+
+    @classmethod
+    def from_value_counts(cls, value_counts: pd.Series, length: int, numeric: bool) -> 'ColumnHistogram':
+        """
+        Build a histogram from counts gathered elsewhere, e.g. merged over row groups.
+
+        Args:
+            value_counts: Counts of each non-null value in first-appearance order
+                (as series.value_counts(sort=False, dropna=True) gives them)
+            length: Number of rows, including nulls
+            numeric: Whether the column is numeric
+
+        Returns:
+            ColumnHistogram equal to one built from the concatenated column
+        """
+        histogram = cls()
+        histogram.length = length
+        histogram.value_counts = value_counts
+        histogram.numeric = numeric
+        histogram._index_values()
+        return histogram
+
+    def _index_values(self) -> None:
+        """Sort the numeric values and their counts for range queries."""
+        if self.numeric:
+            values = self.value_counts.index.to_numpy(dtype='float64')
+            order = np.argsort(values, kind='stable')
+            self.values = values[order]
+            self.counts = self.value_counts.to_numpy(dtype='int64')[order]
+            self.integral = self.values == np.floor(self.values)
+            self.cumulative = np.concatenate(([0], np.cumsum(self.counts)))
+
+    @property
+    def non_null_count(self) -> int:
+        """Number of non-null values."""
+        return int(self.value_counts.sum())
+
+    @property
+    def null_count(self) -> int:
+        """Number of null/NaN values."""
+        return self.length - self.non_null_count
+
+    @property
+    def unique_count(self) -> int:
+        """Number of distinct non-null values that occur at least once."""
+        return int((self.value_counts > 0).sum())
+
+    def count_between(self, start: int, end: int) -> int:
+        """Count values in [start, end], equivalent to series.between(start, end).sum()."""
+        if not self.numeric:
+            return 0
+        lo = np.searchsorted(self.values, start, side='left')
+        hi = np.searchsorted(self.values, end, side='right')
+        return int(max(self.cumulative[hi] - self.cumulative[lo], 0))
+
+    def code_mask(self, value_ranges: List[ValueDef]) -> np.ndarray:
+        """
+        Flag the histogram values that equal an integer code inside any of the ranges.
+
+        This is the histogram form of series.isin() over every code in the ranges.
+        """
+        mask = np.zeros(len(self.values), dtype=bool)
+        for value_def in value_ranges:
+            mask |= (self.values >= value_def.start) & (self.values <= value_def.end)
+        return mask & self.integral
+
+    def top_values(self, n: int = 20) -> pd.Series:
+        """Return the n most common values with counts, ordered as series.value_counts()."""
+        return self.value_counts.sort_values(ascending=False).head(n)
+
+
+def missing_value_ranges(value_ranges: List[ValueDef]) -> List[ValueRange]:
+    """Return the ValueRange definitions marked indicates_missing=True."""
+    return [value_def for value_def in value_ranges
+            if value_def.indicates_missing and isinstance(value_def, ValueRange)]
+
+
+def count_value_ranges(value_ranges: List[ValueDef], histogram: ColumnHistogram) -> List[ValueDef]:
+    """
+    Return copies of a column's value definitions with ValueRange counts filled in.
+
+    Args:
+        value_ranges: Value definitions from the codebook schema
+        histogram: Histogram of the column data
+
+    Returns:
+        New list of ValueDef/ValueRange objects; the input objects are not modified
+    """
+    return [
+        value_def.model_copy(update={'count': histogram.count_between(value_def.start, value_def.end)})
+        if isinstance(value_def, ValueRange) else value_def
+        for value_def in value_ranges
+    ]
+
+
+def compute_column_statistics(column_meta: ColumnMetadata, series: Optional[pd.Series],
+                              histogram: Optional[ColumnHistogram] = None,
+                              moments: Optional[Tuple[float, float]] = None) -> Optional[Union[NumericStatistics, CategoricalStatistics]]:
+    """
+    Compute statistics for one column from its data.
+
+    Numeric columns (codebook type "Num" with a numeric dtype) get NumericStatistics
+    computed over meaningful values only; everything else, or a numeric column with
+    no meaningful values, gets CategoricalStatistics with the top 20 values.
+
+    Args:
+        column_meta: Schema metadata for the column
+        series: Column data (may be None when histogram and moments are given)
+        histogram: Histogram of the column, built from series if not given
+        moments: (mean, std) of the meaningful values, computed from series if not given
+
+    Returns:
+        NumericStatistics, CategoricalStatistics, or None if both calculations failed
+    """
+    sas_variable_name = column_meta.sas_variable_name
+    value_ranges = column_meta.value_ranges
+    if histogram is None:
+        histogram = ColumnHistogram(series)
+    statistics = None
+
+    # Identify missing codes from the codebook
+    missing_ranges = missing_value_ranges(value_ranges)
+    missing_mask = histogram.code_mask(missing_ranges) if histogram.numeric else None
+
+    # Calculate basic counts
+    null_count = histogram.null_count
+    total_non_null = histogram.non_null_count
+
+    # Count missing values (those marked as indicates_missing=True)
+    missing_count = 0
+    if missing_ranges and missing_mask is not None:
+        missing_count = int(histogram.counts[missing_mask].sum())
+
+    # Count meaningful (non-null, non-missing) values
+    meaningful_count = total_non_null - missing_count
+    total_responses = total_non_null  # All non-null responses
+    unique_count = histogram.unique_count
+
+    # Determine if column should be treated as numeric or categorical
+    is_numeric = False
+    if column_meta.type_of_variable == "Num" and histogram.numeric:
+        try:
+            meaningful_values = histogram.values[~missing_mask]
+
+            if len(meaningful_values) > 0:
+                # Mean and std need the values themselves to match describe() exactly;
+                # everything order-based comes from the histogram
+                if moments is None:
+                    values = series.to_numpy(dtype='float64', na_value=np.nan)
+                    keep = ~np.isnan(values)
+                    if missing_ranges:
+                        keep &= ~semantic_null_mask(values, semantic_null_intervals(missing_ranges))
+                    meaningful_series = pd.Series(values[keep])
+                    mean = meaningful_series.mean()
+                    std = meaningful_series.std()
+                else:
+                    mean, std = moments
+                quantiles = np.percentile(np.repeat(meaningful_values, histogram.counts[~missing_mask]), [25, 50, 75])
+
+                # Create numeric statistics
+                statistics = NumericStatistics(
+                    count=meaningful_count,
+                    null_count=null_count,
+                    missing_count=missing_count,
+                    unique_count=unique_count,
+                    total_responses=total_responses,
+                    mean=float(mean) if not pd.isna(mean) else None,
+                    std=float(std) if not pd.isna(std) else None,
+                    min=float(meaningful_values[0]),
+                    q25=float(quantiles[0]),
+                    median=float(quantiles[1]),
+                    q75=float(quantiles[2]),
+                    max=float(meaningful_values[-1])
+                )
+                is_numeric = True
+            else:
+                print(f"No meaningful values found for numeric column {sas_variable_name}")
+        except Exception as e:
+            print(f"Error calculating numeric stats for {sas_variable_name}: {e}")
+            is_numeric = False
+
+    # If not numeric or numeric calculation failed, treat as categorical
+    if not is_numeric:
+        try:
+            # Get value counts for all values (limited to top 20 for brevity)
+            all_value_counts = histogram.top_values(20).to_dict()
+
+            # Convert all keys to strings for JSON compatibility
+            value_counts_str = {str(k): int(v) for k, v in all_value_counts.items()}
+
+            # Create list of top values with counts and descriptions
+            value_index = ValueRangeIndex(value_ranges)
+            top_values = []
+            for value, count in all_value_counts.items():
+                # Try to get description from the value ranges
+                description = None
+                is_missing = False
+
+                if isinstance(value, (int, float)) and not pd.isna(value):
+                    value_int = int(value) if hasattr(value, 'is_integer') and value.is_integer() else int(value) if isinstance(value, int) else None
+                    if value_int is not None:
+                        # Check if this value indicates missing data
+                        is_missing = any(val_def.start <= value_int <= val_def.end for val_def in missing_ranges)
+
+                        description = value_index.lookup(value_int)
+
+                top_values.append({
+                    "value": str(value),
+                    "count": int(count),
+                    "description": description if description else "Unknown",
+                    "is_missing": is_missing
+                })
+
+            # Create categorical statistics
+            statistics = CategoricalStatistics(
+                count=meaningful_count,
+                null_count=null_count,
+                missing_count=missing_count,
+                unique_count=unique_count,
+                total_responses=total_responses,
+                value_counts=value_counts_str,
+                top_values=top_values
+            )
+        except Exception as e:
+            print(f"Error calculating categorical stats for {sas_variable_name}: {e}")
+
+    return statistics
+
+
+def add_column_statistics(column_meta: ColumnMetadata, series: pd.Series) -> ColumnMetadata:
+    """
+    Return a copy of a column's schema metadata with data-derived fields filled in.
+
+    Args:
+        column_meta: Schema metadata for the column (left unmodified)
+        series: Column data
+
+    Returns:
+        ColumnMetadata with ValueRange counts and statistics populated
+    """
+    histogram = ColumnHistogram(series)
+    return column_meta.model_copy(update={
+        'value_ranges': count_value_ranges(column_meta.value_ranges, histogram),
+        'statistics': compute_column_statistics(column_meta, series, histogram),
+    })
+
+
+def _add_column_statistics_task(task: Tuple[ColumnMetadata, pd.Series]) -> ColumnMetadata:
+    """Worker entry point for add_statistics; module level so process pools can pickle it."""
+    column_meta, series = task
+    return add_column_statistics(column_meta, series)
+
+
+def add_statistics(schema: Dict[str, ColumnMetadata], df: pd.DataFrame,
+                   max_workers: Optional[int] = None, executor: str = 'thread') -> Dict[str, ColumnMetadata]:
+    """
+    Run the statistics stage over every column of a parsed schema.
+
+    Columns are independent, so they are fanned out to a pool. Results are
+    gathered in schema order, making the output identical for any worker count.
+    Threads are the default since the pandas hashing and NumPy reductions used
+    here release the GIL and the columns need no copying; a process pool pickles
+    each column to its worker.
+
+    Columns that are not present in the DataFrame are returned unchanged.
+
+    Args:
+        schema: Metadata from parse_codebook_html without a DataFrame
+        df: DataFrame containing BRFSS data
+        max_workers: Number of workers (default: DEFAULT_STATISTICS_WORKERS); 1 runs inline
+        executor: Pool type, one of STATISTICS_EXECUTORS (default: 'thread')
+
+    Returns:
+        New dictionary mapping SAS variable names to ColumnMetadata with statistics
+    """
+    if executor not in STATISTICS_EXECUTORS:
+        raise ValueError(f"Unknown statistics executor '{executor}'. Expected one of {STATISTICS_EXECUTORS}")
+    if max_workers is None:
+        max_workers = DEFAULT_STATISTICS_WORKERS
+
+    names = [name for name in schema if name in df.columns]
+    tasks = [(schema[name], df[name]) for name in names]
+
+    if max_workers <= 1 or len(tasks) <= 1:
+        computed = [_add_column_statistics_task(task) for task in tasks]
+    else:
+        pool_class = ThreadPoolExecutor if executor == 'thread' else ProcessPoolExecutor
+        with pool_class(max_workers=max_workers) as pool:
+            # map() yields in submission order regardless of completion order
+            computed = list(pool.map(_add_column_statistics_task, tasks))
+
+    with_statistics = dict(zip(names, computed))
+    return {name: with_statistics.get(name, column_meta) for name, column_meta in schema.items()}
@@ -0,0 +1,122 @@
+#!/usr/bin/env python3
+"""
+Measure per-process memory with several processes holding the BRFSS data at once.
+
+Starts --processes workers per backend (numpy and arrow), standing in for
+concurrent notebook kernels. Each worker loads the data, touches every numeric
+column, and waits until all workers are loaded; then each reports its memory.
+RSS counts shared page-cache pages in every process. The unique (private)
+figure is what each extra kernel actually costs, and PSS splits shared pages
+evenly between the processes mapping them. Those two come from
+/proc/self/smaps_rollup and are only reported on Linux.
+
+Usage: python scripts/benchmark_arrow_backend.py [--data PATH] [--codebook PATH] [--processes 4]
+                                                 [--semantically-null] [--backends numpy arrow]
+"""
+import argparse
+import logging
+import multiprocessing as mp
+import queue
+import time
+from pathlib import Path
+
+import pandas as pd
+
+from dat490.bfrss import BFRSS, DATA_BACKENDS
+from dat490.memory import peak_rss_mb
+
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s', datefmt='%H:%M:%S')
+logger = logging.getLogger(__name__)
+
+
+def memory_mb() -> dict:
+    """Return current RSS, PSS and private memory of this process in MB (PSS/private on Linux only)."""
+    rollup = Path('/proc/self/smaps_rollup')
+    if not rollup.exists():
+        return {'rss': peak_rss_mb()}
+
+    fields = {}
+    for line in rollup.read_text().splitlines()[1:]:
+        name, value = line.split(':', 1)
+        fields[name] = int(value.split()[0]) / 1024
+    return {
+        'rss': fields['Rss'],
+        'pss': fields['Pss'],
+        'private': fields['Private_Clean'] + fields['Private_Dirty'],
+    }
+
+
+def worker(data_path, codebook_path, backend, semantically_null, barrier, results):
+    """Load the data, touch it, and report memory once every worker is loaded."""
+    start = time.perf_counter()
+    bfrss = BFRSS(data_path=data_path, codebook_path=codebook_path, backend=backend,
+                  semantically_null=semantically_null)
+    df = bfrss.df
+    for column in df.columns:
+        if pd.api.types.is_numeric_dtype(df[column].dtype):
+            df[column].sum()
+    elapsed = time.perf_counter() - start
+
+    barrier.wait()
+    results.put((elapsed, memory_mb()))
+    barrier.wait()
+
+
+def run_backend(args, backend: str) -> None:
+    """Run concurrent workers for one backend and log per-process memory."""
+    context = mp.get_context('spawn')
+    barrier = context.Barrier(args.processes)
+    results = context.Queue()
+    processes = [context.Process(target=worker, args=(args.data, args.codebook, backend,
+                                                      args.semantically_null, barrier, results))
+                 for _ in range(args.processes)]
+    for process in processes:
+        process.start()
+
+    # A worker killed while loading (e.g. by the OOM killer) would leave the rest
+    # waiting at the barrier forever, so poll and give up if any worker dies
+    reports = []
+    while len(reports) < len(processes):
+        try:
+            reports.append(results.get(timeout=1))
+        except queue.Empty:
+            if any(process.exitcode not in (None, 0) for process in processes):
+                for process in processes:
+                    process.kill()
+                logger.error(f"{backend:>5}: a worker exited before reporting (out of memory?)")
+                return
+    for process in processes:
+        process.join()
+
+    load_time = max(elapsed for elapsed, _ in reports)
+    summary = ', '.join(f"{name} {sum(report[name] for _, report in reports) / len(reports):.0f} MB"
+                        for name in reports[0][1])
+    logger.info(f"{backend:>5}: {args.processes} processes, per-process average {summary}; "
+                f"slowest load {load_time:.2f}s")
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Measure per-process memory of the numpy and arrow backends')
+    parser.add_argument('--data', type=Path, default=Path('data/LLCP2023_desc_categorized.parquet'),
+                        help='Path to the BRFSS parquet file')
+    parser.add_argument('--codebook', type=Path, default=Path('data/codebook_USCODE23_LLCP_021924.HTML'),
+                        help='Path to the codebook HTML file')
+    parser.add_argument('--processes', type=int, default=4,
+                        help='Number of concurrent processes per backend (default: 4)')
+    parser.add_argument('--semantically-null', action='store_true',
+                        help='Load with semantic null conversion')
+    parser.add_argument('--backends', nargs='+', choices=DATA_BACKENDS, default=list(DATA_BACKENDS),
+                        help='Backends to measure (default: numpy arrow)')
+    args = parser.parse_args()
+
+    # Build the Arrow IPC cache up front so workers only measure mapping it
+    if 'arrow' in args.backends:
+        BFRSS(data_path=args.data, codebook_path=args.codebook, backend='arrow',
+              semantically_null=args.semantically_null).arrow_table
+
+    for backend in args.backends:
+        run_backend(args, backend)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,72 @@
+#!/usr/bin/env python3
+"""
+Measure peak memory of BFRSS.get_components with and without copy-on-write.
+
+Each mode runs in a fresh Python process so its peak RSS is measured in
+isolation. A process loads the data and metadata, takes the components, drops
+the BFRSS object the way load_bfrss_components does, and modifies one column
+of the returned frame.
+
+Usage: python scripts/benchmark_components.py [--data PATH] [--codebook PATH]
+"""
+import argparse
+import logging
+import subprocess
+import sys
+import time
+from pathlib import Path
+
+from dat490.memory import peak_rss_mb
+
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s', datefmt='%H:%M:%S')
+logger = logging.getLogger(__name__)
+
+MODES = {'deep copy': False, 'copy-on-write': True}
+
+
+def run_mode(data_path: Path, codebook_path: Path, copy_on_write: bool) -> None:
+    """Take components in the current process and print peak RSS figures."""
+    from dat490 import BFRSS
+
+    bfrss = BFRSS(data_path=data_path, codebook_path=codebook_path)
+    bfrss.df
+    bfrss.metadata
+    loaded = peak_rss_mb()
+
+    start = time.perf_counter()
+    df, metadata, _ = bfrss.get_components(copy_on_write=copy_on_write)
+    elapsed = time.perf_counter() - start
+    del bfrss
+    components = peak_rss_mb()
+
+    # Modifying a column copies only that column under copy-on-write
+    column = df.columns[0]
+    df.loc[df.index[0], column] = 0
+    print(f"{loaded:.0f} {components:.0f} {peak_rss_mb():.0f} {elapsed:.3f}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Measure get_components peak memory')
+    parser.add_argument('--data', type=Path, default=Path('data/LLCP2023_desc_categorized.parquet'),
+                        help='Path to the BRFSS parquet file')
+    parser.add_argument('--codebook', type=Path, default=Path('data/codebook_USCODE23_LLCP_021924.HTML'),
+                        help='Path to the codebook HTML file')
+    parser.add_argument('--run-mode', choices=['deep', 'cow'], help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.run_mode:
+        run_mode(args.data, args.codebook, copy_on_write=args.run_mode == 'cow')
+        return
+
+    for name, copy_on_write in MODES.items():
+        result = subprocess.run(
+            [sys.executable, __file__, '--data', str(args.data), '--codebook', str(args.codebook),
+             '--run-mode', 'cow' if copy_on_write else 'deep'],
+            capture_output=True, text=True, check=True)
+        loaded, components, modified, elapsed = result.stdout.split()[-4:]
+        logger.info(f"{name:>13}: peak RSS {loaded} MB after load, {components} MB with components, "
+                    f"{modified} MB after modifying a column; get_components took {float(elapsed):.3f}s")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,106 @@
+#!/usr/bin/env python3
+"""
+Benchmark per-target feature preparation for demographic analysis.
+
+Builds the model inputs (features with >30% missing dropped, the rest
+filled with their mode, plus the target) for every target two ways:
+
+- frame: the previous per-target pandas path in perform_demographic_analysis:
+  copy df[[target] + features], drop rows with a missing target, compute
+  missing fractions and fill each column with Series.mode()
+- matrix: dat490.features.FeatureMatrix, encoded once, then one boolean row
+  selection and a vectorized fill per target
+
+No models are fitted. Each target's inputs are checked to be identical.
+
+Usage: PYTHONPATH=. python scripts/benchmark_feature_matrix.py [--data PATH] [--codebook PATH]
+                                                               [--targets GENHLTH ASTHMA3 ...] [--repeat 3]
+"""
+import argparse
+import logging
+import time
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+from dat490.bfrss import BFRSS
+from dat490.features import FeatureMatrix
+from scripts.generate import DEMOGRAPHIC_FEATURE_COLUMNS
+
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s', datefmt='%H:%M:%S')
+logger = logging.getLogger(__name__)
+
+DEFAULT_TARGETS = ['GENHLTH', 'PHYSHLTH', 'MENTHLTH', 'ASTHMA3', 'CVDINFR4', 'CVDCRHD4', 'CVDSTRK3',
+                   'DIABETE4', 'SMOKE100', 'EXERANY2', 'CHECKUP1', 'HAVARTH4']
+
+MISSING_THRESHOLD = 0.3
+
+
+def prepare_from_frame(df: pd.DataFrame, target: str, features: list) -> tuple:
+    """Return (X, y, feature columns) the way perform_demographic_analysis used to build them."""
+    model_df = df[[target] + features].copy().dropna(subset=[target]).copy()
+    feature_cols = [col for col in features if model_df[col].isnull().sum() / len(model_df) <= MISSING_THRESHOLD]
+    for col in feature_cols:
+        if model_df[col].isnull().any():
+            mode = model_df[col].mode()
+            model_df[col] = model_df[col].fillna(mode.iloc[0] if not mode.empty else 0)
+    return model_df[feature_cols].to_numpy(dtype='float64'), model_df[target].to_numpy(), feature_cols
+
+
+def prepare_from_matrix(df: pd.DataFrame, matrix: FeatureMatrix, target: str, features: list) -> tuple:
+    """Return (X, y, feature columns) from the encoded matrix."""
+    target_values = df[target].to_numpy()
+    rows = ~np.isnan(target_values)
+    prepared = matrix.prepare(rows=rows, columns=features, missing_threshold=MISSING_THRESHOLD)
+    return prepared.X, target_values[rows], prepared.columns
+
+
+def best_time(func, repeat: int):
+    """Return (best wall time in seconds, last result) for func()."""
+    best = float('inf')
+    result = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = func()
+        best = min(best, time.perf_counter() - start)
+    return best, result
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark per-target demographic feature preparation')
+    parser.add_argument('--data', type=Path, default=Path('data/LLCP2023_desc_categorized.parquet'),
+                        help='Path to the BRFSS parquet file')
+    parser.add_argument('--codebook', type=Path, default=Path('data/codebook_USCODE23_LLCP_021924.HTML'),
+                        help='Path to the codebook HTML file')
+    parser.add_argument('--targets', nargs='+', default=DEFAULT_TARGETS,
+                        help='Target columns to prepare (default: 12 health outcome columns)')
+    parser.add_argument('--repeat', type=int, default=3,
+                        help='Number of timed runs per method (default: 3)')
+    args = parser.parse_args()
+
+    bfrss = BFRSS(data_path=args.data, codebook_path=args.codebook, exclude_desc_columns=True)
+    df = bfrss.df
+    features = [col for col in DEMOGRAPHIC_FEATURE_COLUMNS if col in df.columns]
+    targets = [col for col in args.targets if col in df.columns and col not in features]
+
+    encode_time, matrix = best_time(lambda: FeatureMatrix.from_frame(df, features), args.repeat)
+    frame_bytes = df[features].memory_usage(index=False).sum()
+    logger.info(f"Encoded {len(features)} features in {encode_time:.3f}s: {matrix.codes.dtype} codes + bitmaps "
+                f"{(matrix.codes.nbytes + matrix.missing.nbytes) / 1024 ** 2:.1f} MB "
+                f"(DataFrame columns {frame_bytes / 1024 ** 2:.1f} MB)")
+
+    frame_time, frame_inputs = best_time(
+        lambda: [prepare_from_frame(df, target, features) for target in targets], args.repeat)
+    matrix_time, matrix_inputs = best_time(
+        lambda: [prepare_from_matrix(df, matrix, target, features) for target in targets], args.repeat)
+
+    identical = all(np.array_equal(X_a, X_b) and np.array_equal(y_a, y_b) and cols_a == cols_b
+                    for (X_a, y_a, cols_a), (X_b, y_b, cols_b) in zip(frame_inputs, matrix_inputs))
+    logger.info(f"{len(targets)} targets: frame {frame_time:.2f}s ({frame_time / len(targets) * 1000:.0f} ms/target), "
+                f"matrix {matrix_time:.2f}s ({matrix_time / len(targets) * 1000:.0f} ms/target), "
+                f"{frame_time / matrix_time:.1f}x; inputs {'identical' if identical else 'DIFFER'}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,146 @@
+#!/usr/bin/env python3
+"""
+Benchmark single-pass jobs over BFRSS.iter_batches against a full load.
+
+The job counts every value of every selected column (value_counts with NaN),
+with semantic nulls converted. It runs once on bfrss.df and once per batch
+size on BFRSS.iter_batches. Each run happens in a fresh Python process so
+its peak RSS is measured in isolation. Rows per second include reading the
+file. Batched counts are checked against the full-load counts.
+
+Usage: PYTHONPATH=. python scripts/benchmark_iter_batches.py [--data PATH] [--codebook PATH]
+                                                             [--batch-sizes 16384 65536 262144] [--columns all]
+                                                             [--translate] [--output pandas]
+"""
+import argparse
+import logging
+import pickle
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+import pandas as pd
+import pyarrow.compute as pc
+
+from dat490.bfrss import BATCH_OUTPUTS, BFRSS
+from dat490.memory import peak_rss_mb
+
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s', datefmt='%H:%M:%S')
+logger = logging.getLogger(__name__)
+
+
+def add_counts(counts: dict, df: pd.DataFrame) -> None:
+    """Add one frame's value counts to the running totals."""
+    for col in df.columns:
+        batch_counts = df[col].value_counts(dropna=False, sort=False)
+        counts[col] = batch_counts if col not in counts else counts[col].add(batch_counts, fill_value=0)
+
+
+def add_arrow_counts(counts: dict, batch) -> None:
+    """Add one RecordBatch's value counts to the running totals, keyed by Python values."""
+    for name, column in zip(batch.schema.names, batch.columns):
+        totals = counts.setdefault(name, {})
+        for entry in pc.value_counts(column).to_pylist():
+            totals[entry['values']] = totals.get(entry['values'], 0) + entry['counts']
+
+
+def run_method(method: str, args) -> None:
+    """Run one job in the current process and print rows, time and peak RSS."""
+    columns = None if args.columns == ['all'] else args.columns
+    start = time.perf_counter()
+    bfrss = BFRSS(data_path=args.data, codebook_path=args.codebook, semantically_null=True, columns=columns)
+    counts = {}
+    rows = 0
+    if method == 'load':
+        df = bfrss.df
+        if args.translate:
+            code_columns = [name[:-len('_DESC')] for name in df.virtual_desc_columns]
+            df = pd.concat([df, bfrss.translate_columns(code_columns, df).add_suffix('_DESC')], axis=1)
+        add_counts(counts, df)
+        rows = len(df)
+    else:
+        batch_size = int(method)
+        for batch in bfrss.iter_batches(batch_size=batch_size, output=args.output, translate=args.translate):
+            if args.output == 'arrow':
+                add_arrow_counts(counts, batch)
+            else:
+                add_counts(counts, batch)
+            rows += batch.num_rows if args.output == 'arrow' else len(batch)
+    elapsed = time.perf_counter() - start
+    if args.counts is not None:
+        with open(args.counts, 'wb') as f:
+            pickle.dump(counts, f)
+    print(f"{rows} {elapsed:.3f} {peak_rss_mb():.0f}")
+
+
+def same_counts(a: dict, b: dict) -> bool:
+    """Compare two count dictionaries, ignoring zero counts and category order."""
+    if set(a) != set(b):
+        return False
+    for col in a:
+        counts_a, counts_b = a[col], b[col]
+        if isinstance(counts_a, pd.Series):
+            counts_a = counts_a[counts_a != 0]
+            counts_b = counts_b[counts_b != 0]
+            counts_a.index = counts_a.index.astype(object)
+            counts_b.index = counts_b.index.astype(object)
+            if not counts_a.sort_index().astype('int64').equals(counts_b.sort_index().astype('int64')):
+                return False
+    return True
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark BFRSS.iter_batches throughput and memory')
+    parser.add_argument('--data', type=Path, default=Path('data/LLCP2023_desc_categorized.parquet'),
+                        help='Path to the BRFSS parquet file')
+    parser.add_argument('--codebook', type=Path, default=Path('data/codebook_USCODE23_LLCP_021924.HTML'),
+                        help='Path to the codebook HTML file')
+    parser.add_argument('--batch-sizes', type=int, nargs='+', default=[16_384, 65_536, 262_144],
+                        help='Batch sizes to time (default: 16384 65536 262144)')
+    parser.add_argument('--columns', nargs='+', default=['all'],
+                        help="Columns to count (default: all)")
+    parser.add_argument('--translate', action='store_true',
+                        help='Also count the translated _DESC column of every coded column')
+    parser.add_argument('--output', choices=BATCH_OUTPUTS, default='pandas',
+                        help='Batch type to count over (default: pandas; arrow counts are not compared)')
+    parser.add_argument('--run-method', help=argparse.SUPPRESS)
+    parser.add_argument('--counts', type=Path, help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.run_method:
+        run_method(args.run_method, args)
+        return
+
+    scratch = Path(tempfile.mkdtemp())
+    try:
+        counts = None
+        for method in ['load'] + [str(size) for size in args.batch_sizes]:
+            counts_path = scratch / f"{method}.pkl"
+            command = [sys.executable, __file__, '--run-method', method, '--counts', str(counts_path),
+                       '--data', str(args.data), '--codebook', str(args.codebook), '--output', args.output,
+                       '--columns', *args.columns] + (['--translate'] if args.translate else [])
+            result = subprocess.run(command, capture_output=True, text=True)
+            if result.returncode != 0:
+                logger.error(f"{method} failed (exit {result.returncode}): {result.stderr.strip()[-500:]}")
+                continue
+            rows, elapsed, peak = result.stdout.split()[-3:]
+            label = 'full load' if method == 'load' else f"batches of {int(method):,}"
+            message = (f"{label:>18}: {int(rows):,} rows in {float(elapsed):.2f}s "
+                       f"({int(rows) / float(elapsed):,.0f} rows/s), peak RSS {float(peak):.0f} MB")
+            if args.output == 'pandas':
+                with open(counts_path, 'rb') as f:
+                    method_counts = pickle.load(f)
+                if method == 'load':
+                    counts = method_counts
+                elif counts is not None:
+                    message += f", counts {'identical' if same_counts(counts, method_counts) else 'DIFFER'}"
+            logger.info(message)
+    finally:
+        shutil.rmtree(scratch)
+
+
+if __name__ == '__main__':
+    main()
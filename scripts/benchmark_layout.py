@@ -0,0 +1,129 @@
+#!/usr/bin/env python3
+"""
+Benchmark loads from the original parquet file against the optimized layout.
+
+Rewrites the file with dat490.layout.optimize_parquet_layout (unless an
+optimized file is given), then times a full load, a projected load of the
+demographic columns and row-filtered loads on both. Filtered loads are
+checked to return the same rows (in any order), and the row groups the
+footer statistics let each scan skip are reported.
+
+Usage: PYTHONPATH=. python scripts/benchmark_layout.py [--data PATH] [--optimized PATH] [--codebook PATH]
+                                                       [--repeat 3] [--row-group-size 32768] [--compression-level 3]
+"""
+import argparse
+import logging
+import tempfile
+import time
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+import pyarrow.dataset as ds
+
+from dat490.filters import build_row_filter
+from dat490.layout import DEFAULT_COMPRESSION_LEVEL, DEFAULT_ROW_GROUP_SIZE, optimize_parquet_layout
+from dat490.parser import parse_codebook_html
+
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s', datefmt='%H:%M:%S')
+logger = logging.getLogger(__name__)
+
+# A demographic analysis job: the Demographics section features of
+# scripts/demographic_analysis.py plus a few targets
+PROJECTED_COLUMNS = ['MARITAL', 'EDUCA', 'RENTHOM1', 'VETERAN3', 'EMPLOY1', 'CHILDREN', 'INCOME3',
+                     '_RACE', '_SEX', '_AGEG5YR', '_EDUCAG', 'GENHLTH', '_ASTHMS1', '_MICHD']
+
+# Typical job slices, on the sort keys and off them
+BENCHMARK_FILTERS = {
+    'one state': {'_STATE': 'Arizona'},
+    'three states, one month': {'_STATE': ['Arizona', 'California', 'Texas'], 'IMONTH': 'January'},
+    'sex/age band': {'SEXVAR': 'Female', '_AGEG5YR': [5, 6]},
+}
+
+
+def best_time(func, repeat: int):
+    """Return (best wall time in seconds, last result) for func()."""
+    best = float('inf')
+    result = None
+    for _ in range(repeat):
+        result = None
+        start = time.perf_counter()
+        result = func()
+        best = min(best, time.perf_counter() - start)
+    return best, result
+
+
+def row_groups_scanned(data_path: Path, row_filter) -> tuple:
+    """Return (row groups kept by footer statistics, total row groups)."""
+    dataset = ds.dataset(data_path, format='parquet')
+    kept = total = 0
+    for fragment in dataset.get_fragments():
+        total += fragment.metadata.num_row_groups
+        kept += len(fragment.split_by_row_group(filter=row_filter))
+    return kept, total
+
+
+def same_rows(a: pd.DataFrame, b: pd.DataFrame) -> bool:
+    """Return True if two frames hold the same multiset of rows, ignoring order and index."""
+    if a.shape != b.shape or list(a.columns) != list(b.columns):
+        return False
+    hashes_a = np.sort(pd.util.hash_pandas_object(a, index=False).to_numpy())
+    hashes_b = np.sort(pd.util.hash_pandas_object(b, index=False).to_numpy())
+    return np.array_equal(hashes_a, hashes_b)
+
+
+def compare_load(name: str, load, original: Path, optimized: Path, repeat: int, check_rows: bool = False):
+    """Time load(path) on both files and log the speedup."""
+    before, result_before = best_time(lambda: load(original), repeat)
+    after, result_after = best_time(lambda: load(optimized), repeat)
+    message = f"{name:>24}: {len(result_after):,} rows, original {before:.2f}s, optimized {after:.2f}s ({before / after:.1f}x)"
+    if check_rows:
+        message += f", rows {'identical' if same_rows(result_before, result_after) else 'DIFFER'}"
+    del result_before, result_after
+    logger.info(message)
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark the optimized parquet layout')
+    parser.add_argument('--data', type=Path, default=Path('data/LLCP2023_desc_categorized.parquet'),
+                        help='Path to the original BRFSS parquet file')
+    parser.add_argument('--optimized', type=Path, default=None,
+                        help='Optimized file to compare (default: write one to a temporary directory)')
+    parser.add_argument('--codebook', type=Path, default=Path('data/codebook_USCODE23_LLCP_021924.HTML'),
+                        help='Path to the codebook HTML file')
+    parser.add_argument('--repeat', type=int, default=3,
+                        help='Number of timed runs per load (default: 3)')
+    parser.add_argument('--row-group-size', type=int, default=DEFAULT_ROW_GROUP_SIZE,
+                        help=f'Rows per row group when writing the optimized file (default: {DEFAULT_ROW_GROUP_SIZE})')
+    parser.add_argument('--compression-level', type=int, default=DEFAULT_COMPRESSION_LEVEL,
+                        help=f'zstd level when writing the optimized file (default: {DEFAULT_COMPRESSION_LEVEL})')
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as scratch:
+        optimized = args.optimized
+        if optimized is None:
+            optimized = Path(scratch) / 'optimized.parquet'
+            start = time.perf_counter()
+            optimize_parquet_layout(args.data, optimized, row_group_size=args.row_group_size,
+                                    compression_level=args.compression_level)
+            logger.info(f"Wrote optimized layout in {time.perf_counter() - start:.1f}s")
+        logger.info(f"File size: original {args.data.stat().st_size / 1024 ** 2:.1f} MB, "
+                    f"optimized {optimized.stat().st_size / 1024 ** 2:.1f} MB")
+
+        compare_load('full load', lambda path: pd.read_parquet(path), args.data, optimized, args.repeat)
+        compare_load('projected load', lambda path: pd.read_parquet(path, columns=PROJECTED_COLUMNS),
+                     args.data, optimized, args.repeat)
+
+        schema = parse_codebook_html(args.codebook)
+        for name, filters in BENCHMARK_FILTERS.items():
+            row_filter = build_row_filter(filters, schema)
+            compare_load(name, lambda path: pd.read_parquet(path, filters=row_filter),
+                         args.data, optimized, args.repeat, check_rows=True)
+            kept_before, total_before = row_groups_scanned(args.data, row_filter)
+            kept_after, total_after = row_groups_scanned(optimized, row_filter)
+            logger.info(f"{'':>24}  row groups scanned: original {kept_before}/{total_before}, "
+                        f"optimized {kept_after}/{total_after}")
+
+
+if __name__ == '__main__':
+    main()
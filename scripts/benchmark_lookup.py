@@ -0,0 +1,80 @@
+#!/usr/bin/env python3
+"""
+Benchmark code-to-description lookups.
+
+Compares a linear scan over ColumnMetadata.value_ranges with the compiled
+ValueRangeIndex, both one value at a time and vectorized, checking that
+every method returns the same descriptions.
+
+Usage: python scripts/benchmark_lookup.py [--codebook PATH] [--column _AGEG5YR] [--lookups 1000000]
+"""
+import argparse
+import logging
+import time
+from pathlib import Path
+
+import numpy as np
+
+from dat490.lookup import ValueRangeIndex
+from dat490.parser import ValueRange, parse_codebook_html
+
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s', datefmt='%H:%M:%S')
+logger = logging.getLogger(__name__)
+
+
+def linear_lookup(value_ranges, value):
+    """Reference lookup: scan value_ranges in codebook order."""
+    for val_def in value_ranges:
+        if isinstance(val_def, ValueRange) and val_def.start <= value <= val_def.end:
+            return val_def.description
+    return None
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark code-to-description lookups')
+    parser.add_argument('--codebook', type=Path, default=Path('data/codebook_USCODE23_LLCP_021924.HTML'),
+                        help='Path to the codebook HTML file')
+    parser.add_argument('--column', default='_AGEG5YR',
+                        help='Column whose value ranges are looked up (default: _AGEG5YR)')
+    parser.add_argument('--lookups', type=int, default=1_000_000,
+                        help='Number of values to look up (default: 1000000)')
+    args = parser.parse_args()
+
+    schema = parse_codebook_html(args.codebook)
+    value_ranges = schema[args.column].value_ranges
+    bounds = [(v.start, v.end) for v in value_ranges if isinstance(v, ValueRange)]
+    low = min(start for start, _ in bounds)
+    high = max(end for _, end in bounds)
+
+    # Draw from just past both ends of the codebook so misses are exercised too
+    rng = np.random.default_rng(0)
+    values = rng.integers(low - 1, high + 2, size=args.lookups)
+    value_list = values.tolist()
+
+    start = time.perf_counter()
+    index = ValueRangeIndex(value_ranges)
+    logger.info(f"Compiled {len(index)} intervals for {args.column} in {(time.perf_counter() - start) * 1000:.2f}ms")
+
+    start = time.perf_counter()
+    expected = [linear_lookup(value_ranges, value) for value in value_list]
+    linear_time = time.perf_counter() - start
+
+    start = time.perf_counter()
+    scalar = [index.lookup(value) for value in value_list]
+    scalar_time = time.perf_counter() - start
+
+    start = time.perf_counter()
+    codes = index.lookup_codes(values)
+    vectorized = [index.descriptions[code] if code >= 0 else None for code in codes.tolist()]
+    vectorized_time = time.perf_counter() - start
+
+    for name, elapsed, result in [('linear scan', linear_time, expected),
+                                  ('index scalar', scalar_time, scalar),
+                                  ('index vectorized', vectorized_time, vectorized)]:
+        logger.info(f"{name:>16}: {elapsed:.3f}s for {args.lookups:,} lookups, "
+                    f"{linear_time / elapsed:.1f}x vs linear, "
+                    f"output {'identical' if result == expected else 'DIFFERS'}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,78 @@
+#!/usr/bin/env python3
+"""
+Benchmark demographic analysis model engines: accuracy against fit time.
+
+Runs perform_demographic_analysis for every engine in MODEL_ENGINES on the
+same targets, with the demographic features of generate.py encoded once
+(dat490.features.FeatureMatrix) and hyperparameter tuning off, as in a bulk
+--demographic-analysis run. Reports test accuracy, fit time and total
+analysis time (including feature importances) per engine and target, and the
+engines' totals relative to the random forest.
+
+Usage: PYTHONPATH=. python scripts/benchmark_model_engines.py [--data PATH] [--codebook PATH]
+                                                              [--targets GENHLTH _ASTHMS1 _MICHD]
+                                                              [--engines random_forest hist_gradient_boosting ...]
+"""
+import argparse
+import logging
+from pathlib import Path
+
+from dat490.bfrss import BFRSS
+from dat490.features import FeatureMatrix
+from scripts.demographic_analysis import DEFAULT_MODEL_ENGINE, MODEL_ENGINES, perform_demographic_analysis
+from scripts.generate import DEMOGRAPHIC_FEATURE_COLUMNS
+
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s', datefmt='%H:%M:%S')
+logger = logging.getLogger(__name__)
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark demographic analysis model engines')
+    parser.add_argument('--data', type=Path, default=Path('data/LLCP2023_desc_categorized.parquet'),
+                        help='Path to the BRFSS parquet file')
+    parser.add_argument('--codebook', type=Path, default=Path('data/codebook_USCODE23_LLCP_021924.HTML'),
+                        help='Path to the codebook HTML file')
+    parser.add_argument('--targets', nargs='+', default=['GENHLTH', '_ASTHMS1', '_MICHD'],
+                        help='Target columns (default: GENHLTH _ASTHMS1 _MICHD)')
+    parser.add_argument('--engines', nargs='+', choices=MODEL_ENGINES, default=list(MODEL_ENGINES),
+                        help='Engines to compare (default: all)')
+    args = parser.parse_args()
+
+    bfrss = BFRSS(data_path=args.data, codebook_path=args.codebook, exclude_desc_columns=True,
+                  columns=args.targets + DEMOGRAPHIC_FEATURE_COLUMNS)
+    df, metadata = bfrss.df, bfrss.metadata
+    features = [col for col in DEMOGRAPHIC_FEATURE_COLUMNS if col in df.columns]
+    feature_matrix = FeatureMatrix.from_frame(df, features)
+
+    # Silence the per-analysis progress messages; only the table below is of interest
+    logging.getLogger('scripts.demographic_analysis').setLevel(logging.WARNING)
+
+    totals = {}
+    for engine in args.engines:
+        fit_total = analysis_total = 0.0
+        for target in args.targets:
+            result = perform_demographic_analysis(df=df, metadata=metadata, target_column=target,
+                                                  feature_columns=features, hyperparameter_tuning=False,
+                                                  feature_matrix=feature_matrix, model_engine=engine)
+            if not result.successful:
+                logger.error(f"{engine:>22} {target:>10}: FAILED - {result.error_message}")
+                continue
+            fit_time = result.analysis_metadata['fit_time_seconds']
+            analysis_time = result.analysis_metadata['analysis_time_seconds']
+            fit_total += fit_time
+            analysis_total += analysis_time
+            top = result.feature_importance[0]['feature'] if result.feature_importance else '-'
+            logger.info(f"{engine:>22} {target:>10}: accuracy {result.accuracy:.4f}, fit {fit_time:6.1f}s, "
+                        f"analysis {analysis_time:6.1f}s, top feature {top}")
+        totals[engine] = (fit_total, analysis_total)
+
+    reference = totals.get(DEFAULT_MODEL_ENGINE)
+    for engine, (fit_total, analysis_total) in totals.items():
+        message = f"{engine:>22} total: fit {fit_total:.1f}s, analysis {analysis_total:.1f}s"
+        if reference and engine != DEFAULT_MODEL_ENGINE and analysis_total > 0:
+            message += f" ({reference[1] / analysis_total:.1f}x faster than {DEFAULT_MODEL_ENGINE})"
+        logger.info(message)
+
+
+if __name__ == '__main__':
+    main()
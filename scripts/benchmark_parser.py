@@ -0,0 +1,57 @@
+#!/usr/bin/env python3
+"""
+Benchmark the codebook parser engines against each other.
+
+Parses the codebook with every engine in PARSER_ENGINES, checks that the
+resulting ColumnMetadata is identical to the BeautifulSoup reference and
+reports the best-of-N wall time and speedup for each engine.
+
+Usage: python scripts/benchmark_parser.py [--repeat 5] [--codebook PATH]
+"""
+import argparse
+import logging
+import time
+from pathlib import Path
+
+from dat490.parser import PARSER_ENGINES, parse_codebook_html
+
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s', datefmt='%H:%M:%S')
+logger = logging.getLogger(__name__)
+
+
+def benchmark_engine(codebook_path: Path, engine: str, repeat: int):
+    """Return (best wall time in seconds, parsed metadata) for one engine."""
+    best = float('inf')
+    metadata = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        metadata = parse_codebook_html(codebook_path, engine=engine)
+        best = min(best, time.perf_counter() - start)
+    return best, metadata
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark codebook parser engines')
+    parser.add_argument('--codebook', type=Path, default=Path('data/codebook_USCODE23_LLCP_021924.HTML'),
+                        help='Path to the codebook HTML file')
+    parser.add_argument('--repeat', type=int, default=5,
+                        help='Number of timed runs per engine (default: 5)')
+    args = parser.parse_args()
+
+    timings = {}
+    outputs = {}
+    for engine in PARSER_ENGINES:
+        timings[engine], outputs[engine] = benchmark_engine(args.codebook, engine, args.repeat)
+        logger.info(f"{engine:>5}: {timings[engine]:.3f}s best of {args.repeat} ({len(outputs[engine])} columns)")
+
+    reference = outputs['bs4']
+    for engine in PARSER_ENGINES:
+        identical = (list(outputs[engine]) == list(reference) and
+                     all(outputs[engine][name].model_dump_json() == reference[name].model_dump_json()
+                         for name in reference))
+        logger.info(f"{engine:>5}: {timings['bs4'] / timings[engine]:.1f}x vs bs4, "
+                    f"output {'identical' if identical else 'DIFFERS'}")
+
+
+if __name__ == '__main__':
+    main()
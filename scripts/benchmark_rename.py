@@ -0,0 +1,143 @@
+#!/usr/bin/env python3
+"""
+Benchmark X_ prefix renaming: pandas rewrite vs streaming rewrite vs BFRSS aliases.
+
+Copies a parquet file with X_-prefixed columns into a scratch directory and
+renames it three ways, each in a fresh Python process so its peak RSS is
+measured in isolation:
+
+- pandas: the previous fix_x_prefixes.py approach (read both files into
+  pandas, rename, write the whole frame back)
+- streaming: fix_x_prefixes.rename_parquet_columns (footer mapping, one row group at a time)
+- aliases: BFRSS(column_aliases=True) resolving the mapping from the footer, no rewrite
+
+The two rewritten files are checked to hold the same data in the same column order.
+
+Usage: python scripts/benchmark_rename.py [--data PATH] [--reference PATH] [--codebook PATH] [--scratch DIR]
+"""
+import argparse
+import logging
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+import pyarrow.parquet as pq
+
+from dat490.memory import peak_rss_mb
+
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s', datefmt='%H:%M:%S')
+logger = logging.getLogger(__name__)
+
+METHODS = ('pandas', 'streaming', 'aliases')
+
+
+def pandas_rename(file_path: Path, reference_path: Path) -> int:
+    """The previous fix_x_prefixes.py: full pandas read, rename and rewrite."""
+    import pandas as pd
+
+    reference_columns = set(pd.read_parquet(reference_path).columns)
+    df = pd.read_parquet(file_path)
+    rename_mapping = {col: col[1:] for col in df.columns if col.startswith('X_') and col[1:] in reference_columns}
+    df.rename(columns=rename_mapping).to_parquet(file_path, index=False)
+    return len(rename_mapping)
+
+
+def streaming_rename(file_path: Path, reference_path: Path) -> int:
+    """fix_x_prefixes.py as it is now: footer mapping and row-group streaming."""
+    sys.path.insert(0, str(Path(__file__).parent))
+    from fix_x_prefixes import rename_parquet_columns
+    from dat490.aliases import x_prefix_aliases
+
+    rename_mapping = x_prefix_aliases(pq.read_schema(file_path).names, set(pq.read_schema(reference_path).names))
+    rename_parquet_columns(file_path, rename_mapping)
+    return len(rename_mapping)
+
+
+def alias_columns(file_path: Path, codebook_path: Path) -> int:
+    """Resolve the aliases BFRSS would apply, without reading any column data."""
+    from dat490 import BFRSS
+
+    bfrss = BFRSS(data_path=file_path, codebook_path=codebook_path)
+    bfrss.parquet_columns
+    return len(bfrss.column_aliases)
+
+
+def run_method(method: str, file_path: Path, reference_path: Path, codebook_path: Path) -> None:
+    """Run one method in the current process and print renamed count, time and peak RSS."""
+    start = time.perf_counter()
+    if method == 'pandas':
+        renamed = pandas_rename(file_path, reference_path)
+    elif method == 'streaming':
+        renamed = streaming_rename(file_path, reference_path)
+    else:
+        renamed = alias_columns(file_path, codebook_path)
+    print(f"{renamed} {time.perf_counter() - start:.3f} {peak_rss_mb():.0f}")
+
+
+def same_data(path_a: Path, path_b: Path) -> bool:
+    """Compare two parquet files column by column in position order, holding one column of each in memory."""
+    file_a, file_b = pq.ParquetFile(path_a), pq.ParquetFile(path_b)
+    if len(file_a.schema_arrow) != len(file_b.schema_arrow):
+        return False
+    for i in range(len(file_a.schema_arrow)):
+        column_a = file_a.read(columns=[file_a.schema_arrow.names[i]]).column(0)
+        column_b = file_b.read(columns=[file_b.schema_arrow.names[i]]).column(0)
+        if column_a.type != column_b.type:
+            column_b = column_b.cast(column_a.type)
+        if not column_a.equals(column_b):
+            return False
+    return True
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark X_ prefix renaming')
+    parser.add_argument('--data', type=Path, default=Path('data/LLCP2023_desc_categorized.parquet.backup'),
+                        help='Parquet file with X_-prefixed columns; it is copied, not modified '
+                             '(default: the backup fix_x_prefixes.py leaves)')
+    parser.add_argument('--reference', type=Path, default=Path('data/LLCP2023.parquet'),
+                        help='Parquet file with the correct column names (default: data/LLCP2023.parquet)')
+    parser.add_argument('--codebook', type=Path, default=Path('data/codebook_USCODE23_LLCP_021924.HTML'),
+                        help='Path to the codebook HTML file')
+    parser.add_argument('--scratch', type=Path, default=None,
+                        help='Directory for the copies (default: a temporary directory)')
+    parser.add_argument('--run-method', choices=METHODS, help=argparse.SUPPRESS)
+    parser.add_argument('--file', type=Path, help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.run_method:
+        run_method(args.run_method, args.file, args.reference, args.codebook)
+        return
+
+    scratch = Path(tempfile.mkdtemp(dir=args.scratch))
+    try:
+        outputs = {}
+        for method in METHODS:
+            file_path = scratch / f"{method}.parquet"
+            shutil.copy2(args.data, file_path)
+            result = subprocess.run([sys.executable, __file__, '--run-method', method, '--file', str(file_path),
+                                     '--reference', str(args.reference), '--codebook', str(args.codebook)],
+                                    capture_output=True, text=True)
+            if result.returncode != 0:
+                logger.error(f"{method} failed (exit {result.returncode}): {result.stderr.strip()[-500:]}")
+                continue
+            renamed, elapsed, peak = result.stdout.split()[-3:]
+            logger.info(f"{method:>9}: {int(renamed)} columns renamed in {float(elapsed):.2f}s, peak RSS {float(peak):.0f} MB")
+            outputs[method] = file_path
+
+        if 'pandas' in outputs and 'streaming' in outputs:
+            # The streaming rename also maps X_..._DESC columns, which the pandas version left alone
+            names_pandas = pq.read_schema(outputs['pandas']).names
+            names_streaming = pq.read_schema(outputs['streaming']).names
+            renamed_only_by_streaming = [new for old, new in zip(names_pandas, names_streaming) if old != new]
+            identical = same_data(outputs['pandas'], outputs['streaming'])
+            logger.info(f"Rewritten files hold {'identical' if identical else 'DIFFERENT'} data; "
+                        f"{len(renamed_only_by_streaming)} columns renamed only by streaming: {renamed_only_by_streaming[:5]}")
+    finally:
+        shutil.rmtree(scratch)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,93 @@
+#!/usr/bin/env python3
+"""
+Benchmark row filters pushed into the parquet scan against full loads.
+
+For each filter, times a full pd.read_parquet followed by pandas boolean
+indexing, and a load with the filter pushed into pyarrow. It checks that
+both give the same rows and reports how many row groups the footer
+statistics let the scan skip.
+
+Usage: python scripts/benchmark_row_filters.py [--data PATH] [--codebook PATH] [--repeat 3]
+"""
+import argparse
+import logging
+import time
+from pathlib import Path
+
+import pandas as pd
+import pyarrow.dataset as ds
+
+from dat490.filters import build_row_filter, resolve_filter_value
+from dat490.parser import parse_codebook_html
+
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s', datefmt='%H:%M:%S')
+logger = logging.getLogger(__name__)
+
+# Typical job slices: a few states, one interview month, one sex/age band
+BENCHMARK_FILTERS = {
+    'three states': {'_STATE': ['Arizona', 'California', 'Texas']},
+    'one month': {'IMONTH': 'January'},
+    'sex/age band': {'SEXVAR': 'Female', '_AGEG5YR': [5, 6]},
+}
+
+
+def best_time(func, repeat: int):
+    """Return (best wall time in seconds, last result) for func()."""
+    best = float('inf')
+    result = None
+    for _ in range(repeat):
+        result = None
+        start = time.perf_counter()
+        result = func()
+        best = min(best, time.perf_counter() - start)
+    return best, result
+
+
+def full_load_then_mask(data_path: Path, filters: dict, schema) -> pd.DataFrame:
+    """Reference: load every row, then keep matching rows with pandas boolean indexing."""
+    df = pd.read_parquet(data_path)
+    keep = pd.Series(True, index=df.index)
+    for column_name, values in filters.items():
+        values = values if isinstance(values, list) else [values]
+        column_keep = pd.Series(False, index=df.index)
+        for value in values:
+            for start, end in resolve_filter_value(schema[column_name], value):
+                column_keep |= df[column_name].between(start, end)
+        keep &= column_keep
+    return df[keep]
+
+
+def row_groups_scanned(data_path: Path, row_filter) -> tuple:
+    """Return (row groups kept by footer statistics, total row groups)."""
+    dataset = ds.dataset(data_path, format='parquet')
+    kept = total = 0
+    for fragment in dataset.get_fragments():
+        total += fragment.metadata.num_row_groups
+        kept += len(fragment.split_by_row_group(filter=row_filter))
+    return kept, total
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark pushed-down row filters')
+    parser.add_argument('--data', type=Path, default=Path('data/LLCP2023_desc_categorized.parquet'),
+                        help='Path to the BRFSS parquet file')
+    parser.add_argument('--codebook', type=Path, default=Path('data/codebook_USCODE23_LLCP_021924.HTML'),
+                        help='Path to the codebook HTML file')
+    parser.add_argument('--repeat', type=int, default=3,
+                        help='Number of timed runs per load (default: 3)')
+    args = parser.parse_args()
+
+    schema = parse_codebook_html(args.codebook)
+
+    for name, filters in BENCHMARK_FILTERS.items():
+        row_filter = build_row_filter(filters, schema)
+        masked_time, masked = best_time(lambda: full_load_then_mask(args.data, filters, schema), args.repeat)
+        pushed_time, pushed = best_time(lambda: pd.read_parquet(args.data, filters=row_filter), args.repeat)
+        identical = pushed.reset_index(drop=True).equals(masked.reset_index(drop=True))
+        kept, total = row_groups_scanned(args.data, row_filter)
+        logger.info(f"{name:>13}: {len(pushed):,} rows, full load + mask {masked_time:.2f}s, "
+                    f"pushdown {pushed_time:.2f}s ({masked_time / pushed_time:.1f}x), "
+                    f"{kept}/{total} row groups scanned, output {'identical' if identical else 'DIFFERS'}")
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,120 @@
+#!/usr/bin/env python3
+"""
+Benchmark the cost-aware scheduler for parallel demographic analysis.
+
+Runs every target through dat490.scheduler.run_jobs one job at a time, twice,
+with a fresh cost history: the first run predicts from the priors, the second
+from the costs recorded by the first. Reported per run are the median and
+total prediction errors for time and memory.
+
+The measured single-job times of the second run then give the makespan
+(wall time of the whole batch) for several worker counts in two dispatch
+orders, by list scheduling:
+
+- metadata: targets in the order given, as the ProcessPoolExecutor path used to submit them
+- longest-first: targets by predicted time, longest first, as run_jobs dispatches them
+
+Makespans are simulated from the measured durations, so they do not depend
+on how many cores this machine has.
+
+Usage: PYTHONPATH=. python scripts/benchmark_scheduler.py [--data PATH] [--codebook PATH]
+                                                          [--targets GENHLTH PHYSHLTH ...]
+                                                          [--engine hist_gradient_boosting] [--workers 2 4 8]
+"""
+import argparse
+import heapq
+import logging
+import tempfile
+from pathlib import Path
+
+import numpy as np
+
+from dat490.bfrss import BFRSS
+from dat490.features import FeatureMatrix
+from dat490.scheduler import CostModel, Job, run_jobs
+from dat490.shared import SharedFrame
+from scripts.demographic_analysis import MODEL_ENGINES
+from scripts.generate import DEMOGRAPHIC_FEATURE_COLUMNS, init_analysis_worker, run_demographic_analysis_for_column
+
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s', datefmt='%H:%M:%S')
+logger = logging.getLogger(__name__)
+
+# Candidate targets in codebook order: mostly 2-8 classes, with the many-class PHYSHLTH (33),
+# ALCDAY4 (201), CNCRTYP2 (32) and MARIJAN1 (33) spread through the list as in a full run
+DEFAULT_TARGETS = ['GENHLTH', 'PHYSHLTH', 'CHECKUP1', 'EXERANY2', 'CVDINFR4', 'CVDSTRK3', 'ASTHMA3', 'HAVARTH4',
+                   'DIABETE4', 'SMOKE100', 'ALCDAY4', 'FLUSHOT7', 'SEATBELT', 'CNCRTYP2', 'MARIJAN1', 'ACEDEPRS',
+                   'LSATISFY', 'SDHBILLS']
+
+
+def makespan(durations: list, workers: int) -> float:
+    """Return the finish time of the last job when jobs start in order on the first free worker."""
+    free_at = [0.0] * workers
+    for duration in durations:
+        heapq.heappush(free_at, heapq.heappop(free_at) + duration)
+    return max(free_at)
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark cost-aware scheduling of demographic analyses')
+    parser.add_argument('--data', type=Path, default=Path('data/LLCP2023_desc_categorized.parquet'),
+                        help='Path to the BRFSS parquet file')
+    parser.add_argument('--codebook', type=Path, default=Path('data/codebook_USCODE23_LLCP_021924.HTML'),
+                        help='Path to the codebook HTML file')
+    parser.add_argument('--targets', nargs='+', default=DEFAULT_TARGETS,
+                        help='Target columns, in metadata order (default: 18 candidate targets)')
+    parser.add_argument('--engine', choices=MODEL_ENGINES, default='hist_gradient_boosting',
+                        help='Model engine (default: hist_gradient_boosting)')
+    parser.add_argument('--workers', type=int, nargs='+', default=[2, 4, 8],
+                        help='Worker counts to simulate (default: 2 4 8)')
+    args = parser.parse_args()
+
+    bfrss = BFRSS(data_path=args.data, codebook_path=args.codebook, exclude_desc_columns=True,
+                  columns=args.targets + DEMOGRAPHIC_FEATURE_COLUMNS)
+    df, metadata = bfrss.df, bfrss.metadata
+    targets = [col for col in args.targets if col in df.columns]
+    feature_matrix = FeatureMatrix.from_frame(df, [col for col in DEMOGRAPHIC_FEATURE_COLUMNS if col in df.columns])
+    jobs = [Job(key=col, args=(col, 1000, args.engine), rows=int(df[col].notna().sum()),
+                classes=int(df[col].nunique())) for col in targets]
+
+    # Silence the per-analysis progress messages; only the summaries below are of interest
+    logging.getLogger('scripts.demographic_analysis').setLevel(logging.WARNING)
+    logging.getLogger('dat490.scheduler').setLevel(logging.WARNING)
+
+    with tempfile.TemporaryDirectory() as scratch, SharedFrame.publish(df, targets) as shared:
+        cost_model = CostModel(path=Path(scratch) / 'job_costs.json')
+        for run in ('prior', 'learned'):
+            outcomes = {outcome.key: outcome for outcome in run_jobs(
+                jobs, run_demographic_analysis_for_column, engine=args.engine, cost_model=cost_model,
+                initializer=init_analysis_worker, initargs=(shared.spec, {col: metadata[col] for col in targets},
+                                                            feature_matrix),
+                max_workers=1)}
+            completed = [outcomes[job.key] for job in jobs if outcomes[job.key].status == 'completed']
+            if len(completed) < len(jobs):
+                logger.error(f"{len(jobs) - len(completed)} jobs did not complete")
+            time_errors = [abs(o.predicted.seconds - o.seconds) / o.seconds for o in completed]
+            measured = [o for o in completed if o.memory_mb]
+            memory_errors = [abs(o.predicted.memory_mb - o.memory_mb) / o.memory_mb for o in measured] or [np.nan]
+            logger.info(f"{run:>7} predictions: time error median {np.median(time_errors) * 100:.0f}%, "
+                        f"total {sum(o.predicted.seconds for o in completed):.1f}s predicted vs "
+                        f"{sum(o.seconds for o in completed):.1f}s actual; memory error median "
+                        f"{np.median(memory_errors) * 100:.0f}%")
+
+    for job in jobs:
+        outcome = outcomes[job.key]
+        memory = f"{outcome.memory_mb:4.0f} MB" if outcome.memory_mb is not None else "  n/a"
+        logger.info(f"{job.key:>10}: {job.rows:,} rows, {job.classes:3d} classes, {outcome.seconds:5.1f}s "
+                    f"(predicted {outcome.predicted.seconds:5.1f}s), {memory} "
+                    f"(predicted {outcome.predicted.memory_mb:4.0f} MB)")
+
+    durations = {key: outcome.seconds for key, outcome in outcomes.items()}
+    metadata_order = [durations[job.key] for job in jobs]
+    longest_first = [durations[job.key] for job in
+                     sorted(jobs, key=lambda job: outcomes[job.key].predicted.seconds, reverse=True)]
+    for workers in args.workers:
+        before, after = makespan(metadata_order, workers), makespan(longest_first, workers)
+        logger.info(f"{workers} workers: metadata order {before:.1f}s, longest-first {after:.1f}s "
+                    f"({before / after:.2f}x), lower bound {max(sum(metadata_order) / workers, max(metadata_order)):.1f}s")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,84 @@
+#!/usr/bin/env python3
+"""
+Benchmark semantic null conversion over the full dataset.
+
+Compares the set-expansion approach (expand each indicates_missing range into
+a set of codes, then isin + .loc per column) with the interval engine in
+dat490.nulls, and checks that both produce the same DataFrame.
+
+Usage: python scripts/benchmark_semantic_nulls.py [--data PATH] [--codebook PATH] [--repeat 3]
+"""
+import argparse
+import logging
+import time
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+from dat490.nulls import apply_semantic_nulls, column_semantic_null_intervals
+from dat490.parser import ValueRange, parse_codebook_html
+
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s', datefmt='%H:%M:%S')
+logger = logging.getLogger(__name__)
+
+
+def set_expansion_nulls(df: pd.DataFrame, schema) -> pd.DataFrame:
+    """Reference conversion: expanded code sets, isin and .loc assignment."""
+    for col_name, column_meta in schema.items():
+        if col_name not in df.columns:
+            continue
+        missing_values = set()
+        for value_def in column_meta.value_ranges:
+            if value_def.indicates_missing and isinstance(value_def, ValueRange):
+                missing_values.update(range(value_def.start, value_def.end + 1))
+        if missing_values and df[col_name].isin(missing_values).sum() > 0:
+            df.loc[df[col_name].isin(missing_values), col_name] = np.nan
+    return df
+
+
+def best_time(func, repeat: int):
+    """Return (best wall time in seconds, last result) for func()."""
+    best = float('inf')
+    result = None
+    for _ in range(repeat):
+        # Release the previous result first; each one is a full copy of the data
+        result = None
+        start = time.perf_counter()
+        result = func()
+        best = min(best, time.perf_counter() - start)
+    return best, result
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark semantic null conversion')
+    parser.add_argument('--data', type=Path, default=Path('data/LLCP2023_desc_categorized.parquet'),
+                        help='Path to the BRFSS parquet file')
+    parser.add_argument('--codebook', type=Path, default=Path('data/codebook_USCODE23_LLCP_021924.HTML'),
+                        help='Path to the codebook HTML file')
+    parser.add_argument('--repeat', type=int, default=3,
+                        help='Number of timed runs per method (default: 3)')
+    args = parser.parse_args()
+
+    df = pd.read_parquet(args.data)
+    df = df[[col for col in df.columns if not col.endswith('_DESC')]]
+    schema = parse_codebook_html(args.codebook)
+    logger.info(f"Loaded {len(df):,} rows x {len(df.columns)} columns")
+
+    reference_time, reference = best_time(lambda: set_expansion_nulls(df.copy(), schema), args.repeat)
+    logger.info(f"set expansion: {reference_time:.2f}s best of {args.repeat}")
+
+    def interval_engine():
+        intervals = column_semantic_null_intervals(schema)
+        return apply_semantic_nulls(df.copy(), intervals)
+
+    engine_time, (converted, conversions) = best_time(interval_engine, args.repeat)
+    identical = converted.equals(reference)
+    logger.info(f"interval engine: {engine_time:.2f}s best of {args.repeat}, "
+                f"{sum(conversions.values()):,} values in {len(conversions)} columns, "
+                f"{reference_time / engine_time:.1f}x vs set expansion, "
+                f"output {'identical' if identical else 'DIFFERS'}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,186 @@
+#!/usr/bin/env python3
+"""
+Benchmark parallel demographic analysis with per-task loads against shared memory.
+
+Runs the same demographic analyses through a ProcessPoolExecutor two ways,
+each in a fresh Python process:
+
+- reload: every task loads BFRSS itself, as generate.py used to
+- shared: the parent publishes the target columns once with
+  dat490.shared.SharedFrame, encodes the features once with
+  dat490.features.FeatureMatrix, and workers attach through
+  generate.init_analysis_worker
+
+Both load the data in the parent first, as generate.py does to pick its
+targets. Reported are the wall-clock time of the analysis phase, the worker
+attach time (shared) and memory: the parent's peak RSS and the largest
+private memory of any worker after a task. Forked workers inherit the
+parent's pages, so their RSS counts the parent's data too; private memory
+(from /proc/self/smaps_rollup, Linux only) is what each worker adds.
+Accuracies of the two runs are checked to be identical.
+
+Usage: PYTHONPATH=. python scripts/benchmark_shared_dataset.py [--data PATH] [--codebook PATH]
+                                                               [--targets GENHLTH ASTHMA3 CVDINFR4 DIABETE4]
+                                                               [--max-workers 2]
+"""
+import argparse
+import logging
+import os
+import pickle
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+
+from dat490.bfrss import BFRSS
+from dat490.features import FeatureMatrix
+from dat490.memory import peak_rss_mb
+from dat490.shared import SharedFrame
+from scripts import generate
+from scripts.demographic_analysis import DEFAULT_MODEL_ENGINE, perform_demographic_analysis
+from scripts.generate import DEMOGRAPHIC_FEATURE_COLUMNS
+
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s', datefmt='%H:%M:%S')
+logger = logging.getLogger(__name__)
+
+METHODS = ('reload', 'shared')
+
+# Set in each worker by the timed initializers
+_worker_init_seconds = 0.0
+_worker_paths = None
+
+
+def memory_mb() -> dict:
+    """Return this process's peak RSS and, on Linux, current private memory in MB."""
+    memory = {'peak_rss': peak_rss_mb()}
+    rollup = Path('/proc/self/smaps_rollup')
+    if rollup.exists():
+        fields = {}
+        for line in rollup.read_text().splitlines()[1:]:
+            name, value = line.split(':', 1)
+            fields[name] = int(value.split()[0]) / 1024
+        memory['private'] = fields['Private_Clean'] + fields['Private_Dirty']
+    return memory
+
+
+def init_reload_worker(data_path: Path, codebook_path: Path):
+    """Pool initializer for the reload method: only remembers where the data is."""
+    global _worker_paths
+    _worker_paths = (data_path, codebook_path)
+
+
+def init_shared_worker(spec, metadata, feature_matrix):
+    """Pool initializer for the shared method: generate.init_analysis_worker, timed."""
+    global _worker_init_seconds
+    start = time.perf_counter()
+    generate.init_analysis_worker(spec, metadata, feature_matrix)
+    _worker_init_seconds = time.perf_counter() - start
+
+
+def reload_task(target_column: str):
+    """One analysis the old way: load BFRSS and its metadata inside the task."""
+    data_path, codebook_path = _worker_paths
+    bfrss = BFRSS(data_path=data_path, codebook_path=codebook_path, exclude_desc_columns=True)
+    result = perform_demographic_analysis(df=bfrss.df, metadata=bfrss.metadata, target_column=target_column,
+                                          feature_columns=DEMOGRAPHIC_FEATURE_COLUMNS, hyperparameter_tuning=False)
+    return target_column, result.accuracy, os.getpid(), _worker_init_seconds, memory_mb()
+
+
+def shared_task(target_column: str):
+    """One analysis through generate.run_demographic_analysis_for_column."""
+    _, result_dict, _ = generate.run_demographic_analysis_for_column((target_column, 1000, DEFAULT_MODEL_ENGINE))
+    return target_column, result_dict['accuracy'], os.getpid(), _worker_init_seconds, memory_mb()
+
+
+def run_method(method: str, args) -> None:
+    """Load the data, run every target through a worker pool and save the timings and memory."""
+    bfrss = BFRSS(data_path=args.data, codebook_path=args.codebook, exclude_desc_columns=True)
+    df, metadata = bfrss.df, bfrss.metadata
+
+    start = time.perf_counter()
+    if method == 'reload':
+        shared = None
+        pool = ProcessPoolExecutor(max_workers=args.max_workers, initializer=init_reload_worker,
+                                   initargs=(args.data, args.codebook))
+        task = reload_task
+    else:
+        feature_matrix = FeatureMatrix.from_frame(df, [col for col in DEMOGRAPHIC_FEATURE_COLUMNS if col in df.columns])
+        shared = SharedFrame.publish(df, args.targets)
+        pool = ProcessPoolExecutor(max_workers=args.max_workers, initializer=init_shared_worker,
+                                   initargs=(shared.spec, {col: metadata[col] for col in args.targets}, feature_matrix))
+        task = shared_task
+    try:
+        with pool:
+            reports = list(pool.map(task, args.targets))
+        elapsed = time.perf_counter() - start
+        parent = memory_mb()
+    finally:
+        if shared is not None:
+            shared.close()
+            shared.unlink()
+
+    # One entry per worker: attach time and the largest memory after any of its tasks
+    workers = {}
+    for _, _, pid, init_seconds, memory in reports:
+        _, largest = workers.get(pid, (0.0, {}))
+        workers[pid] = (init_seconds, {name: max(value, largest.get(name, 0.0)) for name, value in memory.items()})
+    with open(args.output, 'wb') as f:
+        pickle.dump({'elapsed': elapsed, 'parent': parent, 'workers': list(workers.values()),
+                     'accuracy': {target: accuracy for target, accuracy, *_ in reports}}, f)
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark shared-memory workers for demographic analysis')
+    parser.add_argument('--data', type=Path, default=Path('data/LLCP2023_desc_categorized.parquet'),
+                        help='Path to the BRFSS parquet file')
+    parser.add_argument('--codebook', type=Path, default=Path('data/codebook_USCODE23_LLCP_021924.HTML'),
+                        help='Path to the codebook HTML file')
+    parser.add_argument('--targets', nargs='+', default=['GENHLTH', 'ASTHMA3', 'CVDINFR4', 'DIABETE4'],
+                        help='Target columns to analyze (default: GENHLTH ASTHMA3 CVDINFR4 DIABETE4)')
+    parser.add_argument('--max-workers', type=int, default=2,
+                        help='Worker processes (default: 2)')
+    parser.add_argument('--run-method', choices=METHODS, help=argparse.SUPPRESS)
+    parser.add_argument('--output', type=Path, help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.run_method:
+        run_method(args.run_method, args)
+        return
+
+    scratch = Path(tempfile.mkdtemp())
+    try:
+        accuracies = {}
+        for method in METHODS:
+            output = scratch / f"{method}.pkl"
+            command = [sys.executable, __file__, '--run-method', method, '--output', str(output),
+                       '--data', str(args.data), '--codebook', str(args.codebook),
+                       '--max-workers', str(args.max_workers), '--targets', *args.targets]
+            result = subprocess.run(command, capture_output=True, text=True)
+            if result.returncode != 0:
+                logger.error(f"{method} failed (exit {result.returncode}): {result.stderr.strip()[-500:]}")
+                continue
+            with open(output, 'rb') as f:
+                report = pickle.load(f)
+            accuracies[method] = report['accuracy']
+
+            workers = report['workers']
+            message = (f"{method:>6}: {len(args.targets)} targets in {report['elapsed']:.1f}s, "
+                       f"parent peak RSS {report['parent']['peak_rss']:.0f} MB")
+            if 'private' in workers[0][1]:
+                message += f", worker private {max(memory['private'] for _, memory in workers):.0f} MB"
+            if method == 'shared':
+                message += f", attach {max(seconds for seconds, _ in workers) * 1000:.1f} ms"
+            logger.info(message)
+
+        if len(accuracies) == len(METHODS):
+            same = accuracies['reload'] == accuracies['shared']
+            logger.info(f"Accuracies {'identical' if same else 'DIFFER'}: {accuracies['shared']}")
+    finally:
+        shutil.rmtree(scratch)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,69 @@
+#!/usr/bin/env python3
+"""
+Benchmark the column statistics stage.
+
+Loads the BRFSS parquet file once, parses the codebook schema and times
+add_statistics over every codebook column present in the data at several
+worker counts, checking that every worker count produces identical output.
+
+Usage: python scripts/benchmark_statistics.py [--data PATH] [--codebook PATH] [--repeat 3]
+                                              [--workers 1 2 4 8] [--executor thread]
+"""
+import argparse
+import logging
+import time
+from pathlib import Path
+
+import pandas as pd
+
+from dat490.parser import parse_codebook_html
+from dat490.statistics import STATISTICS_EXECUTORS, add_statistics
+
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s', datefmt='%H:%M:%S')
+logger = logging.getLogger(__name__)
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark the column statistics stage')
+    parser.add_argument('--data', type=Path, default=Path('data/LLCP2023_desc_categorized.parquet'),
+                        help='Path to the BRFSS parquet file')
+    parser.add_argument('--codebook', type=Path, default=Path('data/codebook_USCODE23_LLCP_021924.HTML'),
+                        help='Path to the codebook HTML file')
+    parser.add_argument('--repeat', type=int, default=3,
+                        help='Number of timed runs per worker count (default: 3)')
+    parser.add_argument('--workers', type=int, nargs='+', default=[1, 2, 4, 8],
+                        help='Worker counts to benchmark (default: 1 2 4 8)')
+    parser.add_argument('--executor', choices=STATISTICS_EXECUTORS, default='thread',
+                        help='Pool type for the statistics stage (default: thread)')
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    df = pd.read_parquet(args.data)
+    df = df[[col for col in df.columns if not col.endswith('_DESC')]]
+    logger.info(f"Loaded {len(df):,} rows x {len(df.columns)} columns in {time.perf_counter() - start:.2f}s")
+
+    schema = parse_codebook_html(args.codebook)
+    columns = [name for name in schema if name in df.columns]
+    logger.info(f"Computing statistics for {len(columns)} codebook columns")
+
+    baseline_time = None
+    reference = None
+    for workers in args.workers:
+        best = float('inf')
+        for _ in range(args.repeat):
+            start = time.perf_counter()
+            metadata = add_statistics(schema, df, max_workers=workers, executor=args.executor)
+            best = min(best, time.perf_counter() - start)
+
+        dumped = {name: meta.model_dump_json() for name, meta in metadata.items()}
+        if reference is None:
+            reference, baseline_time = dumped, best
+        identical = dumped == reference
+
+        logger.info(f"{workers:2d} {args.executor} workers: {best:.2f}s best of {args.repeat}, "
+                    f"{baseline_time / best:.2f}x vs {args.workers[0]} worker(s), "
+                    f"output {'identical' if identical else 'DIFFERS'}")
+
+
+if __name__ == '__main__':
+    main()
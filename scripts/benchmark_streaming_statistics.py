@@ -0,0 +1,133 @@
+#!/usr/bin/env python3
+"""
+Benchmark out-of-core statistics against the in-memory statistics stage.
+
+Computes metadata statistics for every codebook column two ways, each in a
+fresh Python process so its peak RSS is measured in isolation:
+
+- memory: read the parquet file(s) into one DataFrame and run add_statistics
+- streaming: dat490.accumulators.parquet_statistics, one batch at a time with
+  footer shortcuts for all-null and constant column chunks
+
+Several --data files are treated as one stacked dataset (e.g. one per year).
+Outputs are compared field by field; mean and std are reported by their
+largest relative difference, since they are summed in a different order.
+
+Usage: PYTHONPATH=. python scripts/benchmark_streaming_statistics.py [--data PATH [PATH ...]] [--codebook PATH]
+                                                                     [--batch-size 65536] [--max-distinct 100000]
+"""
+import argparse
+import logging
+import pickle
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+import pandas as pd
+import pyarrow.parquet as pq
+
+from dat490.accumulators import DEFAULT_BATCH_SIZE, DEFAULT_MAX_DISTINCT, parquet_statistics
+from dat490.memory import peak_rss_mb
+from dat490.parser import parse_codebook_html
+from dat490.statistics import add_statistics
+
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s', datefmt='%H:%M:%S')
+logger = logging.getLogger(__name__)
+
+METHODS = ('memory', 'streaming')
+
+# Fields summed in a different order by the two methods
+FLOAT_FIELDS = ('mean', 'std')
+
+
+def run_method(method: str, args) -> None:
+    """Compute statistics one way in the current process, save them and print time and peak RSS."""
+    schema = parse_codebook_html(args.codebook)
+    start = time.perf_counter()
+    if method == 'memory':
+        # Only codebook columns are read, as BFRSS.metadata does with exclude_desc_columns
+        df = pd.concat([pd.read_parquet(path, columns=[col for col in pq.read_schema(path).names if col in schema])
+                        for path in args.data], ignore_index=True)
+        metadata = add_statistics(schema, df)
+    else:
+        metadata = parquet_statistics(args.data, schema, batch_size=args.batch_size, max_distinct=args.max_distinct)
+    elapsed = time.perf_counter() - start
+    with open(args.output, 'wb') as f:
+        pickle.dump({name: meta.model_dump() for name, meta in metadata.items()}, f)
+    print(f"{elapsed:.3f} {peak_rss_mb():.0f}")
+
+
+def compare(reference: dict, result: dict) -> tuple:
+    """Return (columns differing outside mean/std, largest relative mean/std difference)."""
+    differing = []
+    largest = 0.0
+    for name, meta in reference.items():
+        other = result[name]
+        statistics, other_statistics = meta.get('statistics'), other.get('statistics')
+        if {k: v for k, v in meta.items() if k != 'statistics'} != {k: v for k, v in other.items() if k != 'statistics'}:
+            differing.append(name)
+            continue
+        if statistics is None or other_statistics is None:
+            if statistics != other_statistics:
+                differing.append(name)
+            continue
+        for field, value in statistics.items():
+            other_value = other_statistics.get(field)
+            if field in FLOAT_FIELDS and value is not None and other_value is not None:
+                largest = max(largest, abs(value - other_value) / max(abs(value), 1e-300))
+            elif value != other_value:
+                differing.append(name)
+                break
+    return differing, largest
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark out-of-core statistics')
+    parser.add_argument('--data', type=Path, nargs='+', default=[Path('data/LLCP2023_desc_categorized.parquet')],
+                        help='BRFSS parquet file(s), stacked in the order given')
+    parser.add_argument('--codebook', type=Path, default=Path('data/codebook_USCODE23_LLCP_021924.HTML'),
+                        help='Path to the codebook HTML file')
+    parser.add_argument('--batch-size', type=int, default=DEFAULT_BATCH_SIZE,
+                        help=f'Rows per batch for the streaming method (default: {DEFAULT_BATCH_SIZE})')
+    parser.add_argument('--max-distinct', type=int, default=DEFAULT_MAX_DISTINCT,
+                        help=f'Distinct values kept exactly per column (default: {DEFAULT_MAX_DISTINCT})')
+    parser.add_argument('--run-method', choices=METHODS, help=argparse.SUPPRESS)
+    parser.add_argument('--output', type=Path, help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.run_method:
+        run_method(args.run_method, args)
+        return
+
+    scratch = Path(tempfile.mkdtemp())
+    try:
+        results = {}
+        for method in METHODS:
+            output = scratch / f"{method}.pkl"
+            command = [sys.executable, __file__, '--run-method', method, '--output', str(output),
+                       '--codebook', str(args.codebook), '--batch-size', str(args.batch_size),
+                       '--max-distinct', str(args.max_distinct), '--data', *map(str, args.data)]
+            result = subprocess.run(command, capture_output=True, text=True)
+            if result.returncode != 0:
+                logger.error(f"{method} failed (exit {result.returncode}): {result.stderr.strip()[-500:]}")
+                continue
+            elapsed, peak = result.stdout.split()[-2:]
+            logger.info(f"{method:>9}: {float(elapsed):.2f}s, peak RSS {float(peak):.0f} MB")
+            with open(output, 'rb') as f:
+                results[method] = pickle.load(f)
+
+        if len(results) == len(METHODS):
+            differing, largest = compare(results['memory'], results['streaming'])
+            logger.info(f"{len(results['memory']) - len(differing)} of {len(results['memory'])} columns identical "
+                        f"apart from mean/std (largest relative difference {largest:.1e})")
+            if differing:
+                logger.info(f"Columns that differ: {differing[:10]}")
+    finally:
+        shutil.rmtree(scratch)
+
+
+if __name__ == '__main__':
+    main()
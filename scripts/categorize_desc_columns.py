@@ -2,10 +2,28 @@
 """
 Convert all _DESC columns in LLCP2023_desc.parquet to categorical dtype.
 This reduces memory usage significantly and improves performance for categorical data.
+
+The file is streamed with pyarrow in batches sized to fit a memory budget, so
+peak memory does not grow with the input. The budget covers the whole process:
+the interpreter and pyarrow baseline, the read and write buffers and the
+global dictionaries are subtracted before batches are sized. A first pass collects every distinct
+value of each _DESC column into a global, sorted dictionary; the second pass
+encodes each batch against those dictionaries, so category codes are the same
+in every row group and match pandas' astype('category') ordering.
+
+Usage: PYTHONPATH=. python scripts/categorize_desc_columns.py [--input PATH] [--output PATH] [--memory-budget 1024]
 """
-import pandas as pd
-from pathlib import Path
+import argparse
 import logging
+from pathlib import Path
+from typing import Dict, List, Optional
+
+import numpy as np
+import pyarrow as pa
+import pyarrow.compute as pc
+import pyarrow.parquet as pq
+
+from dat490.memory import current_rss_mb, peak_rss_mb
 
 # Configure logging
 logging.basicConfig(
@@ -15,126 +33,265 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
-def categorize_desc_columns():
+# Rows read to estimate the in-memory width of a row
+PROBE_ROWS = 1_000
+
+# Memory per batch row relative to the decoded input: the input batch, the
+# encoded output batch and the writer's buffers are alive at the same time
+BATCH_MEMORY_FACTOR = 4
+
+# Read buffer for the parquet stream, so column chunks are not loaded whole
+READ_BUFFER_SIZE = 8 * 1024 ** 2
+
+# Memory outside the batches: the reader's decompression buffers, the
+# ParquetWriter's page buffers and footer metadata, and allocator slack
+# (measured at 100-120 MB on the 2023 file)
+STREAM_OVERHEAD_MB = 128
+
+# Rows per output row group. Encoded batches are buffered up to a row group
+# rather than written one row group per batch, since every row group adds
+# pages and footer metadata for all 368 columns. The buffer takes at most
+# ROW_GROUP_BUDGET_SHARE of the memory left for pass 2
+MIN_ROW_GROUP_ROWS = 8_192
+MAX_ROW_GROUP_ROWS = 65_536
+ROW_GROUP_BUDGET_SHARE = 0.5
+
+
+def bytes_per_row(batch: Optional[pa.RecordBatch]) -> float:
+    """Return the in-memory width of one of the batch's rows, in bytes."""
+    if batch is None or batch.num_rows == 0:
+        return 0.0
+    return batch.nbytes / batch.num_rows
+
+
+def batch_rows_for_budget(row_bytes: float, available_mb: float) -> int:
+    """
+    Choose a batch size whose working set fits the memory left for batches.
+
+    Args:
+        row_bytes: Decoded bytes per row, from bytes_per_row()
+        available_mb: Memory left for batches once the baseline, buffers and
+            dictionaries are subtracted from the budget, in MB
+
+    Returns:
+        Rows per batch
+
+    Raises:
+        ValueError: If available_mb cannot hold a batch of PROBE_ROWS rows
+    """
+    if row_bytes <= 0:
+        return PROBE_ROWS
+    rows = int(available_mb * 1024 ** 2 / (row_bytes * BATCH_MEMORY_FACTOR))
+    if rows < PROBE_ROWS:
+        raise ValueError(f"{available_mb:.0f} MB left for batches holds {max(rows, 0):,} rows, "
+                         f"fewer than the minimum of {PROBE_ROWS:,}")
+    return rows
+
+
+def minimum_budget_mb(baseline_mb: float, reserved_mb: float, row_bytes: float) -> float:
+    """Return the smallest budget with room for a batch of PROBE_ROWS rows."""
+    return baseline_mb + reserved_mb + PROBE_ROWS * row_bytes * BATCH_MEMORY_FACTOR / 1024 ** 2
+
+
+def dictionaries_mb(dictionaries: Dict[str, pa.Array]) -> float:
+    """Return the memory held by the global dictionaries in MB."""
+    return sum(dictionary.nbytes for dictionary in dictionaries.values()) / 1024 ** 2
+
+
+def collect_dictionaries(parquet_file: pq.ParquetFile, desc_cols: List[str], batch_rows: int) -> Dict[str, pa.Array]:
+    """
+    Stream the _DESC columns and collect each column's distinct values.
+
+    Args:
+        parquet_file: Input file
+        desc_cols: Columns to collect
+        batch_rows: Rows per batch
+
+    Returns:
+        Dictionary mapping column names to sorted string arrays of their distinct non-null values
+    """
+    distinct = {col: set() for col in desc_cols}
+    for batch in parquet_file.iter_batches(batch_size=batch_rows, columns=desc_cols):
+        for col in desc_cols:
+            column = batch.column(col)
+            if pa.types.is_dictionary(column.type):
+                column = column.dictionary_decode()
+            distinct[col].update(value for value in pc.unique(column.drop_null()).to_pylist())
+    return {col: pa.array(sorted(values), type=pa.string()) for col, values in distinct.items()}
+
+
+def encode_batch(batch: pa.RecordBatch, schema: pa.Schema, dictionaries: Dict[str, pa.Array]) -> pa.RecordBatch:
+    """
+    Encode a batch's _DESC columns against the global dictionaries.
+
+    Args:
+        batch: Input batch
+        schema: Output schema
+        dictionaries: Global dictionaries from collect_dictionaries()
+
+    Returns:
+        RecordBatch with the output schema
     """
-    Load LLCP2023_desc.parquet, convert _DESC columns to categorical using the exact original approach,
-    and save as LLCP2023_desc_categorized.parquet
+    columns = []
+    for field in schema:
+        column = batch.column(field.name)
+        if field.name in dictionaries:
+            if pa.types.is_dictionary(column.type):
+                column = column.dictionary_decode()
+            indices = pc.index_in(column.cast(pa.string()), value_set=dictionaries[field.name])
+            column = pa.DictionaryArray.from_arrays(indices.cast(field.type.index_type), dictionaries[field.name])
+        columns.append(column)
+    return pa.RecordBatch.from_arrays(columns, schema=schema)
+
+
+def categorize_desc_columns(input_file: Path, output_file: Path, memory_budget_mb: float = 1024):
+    """
+    Stream input_file to output_file with every _DESC column dictionary-encoded.
+
+    Args:
+        input_file: Parquet file with string _DESC columns (e.g. LLCP2023_desc.parquet)
+        output_file: Destination (e.g. LLCP2023_desc_categorized.parquet)
+        memory_budget_mb: Peak memory of the whole process, in MB
+
+    Raises:
+        ValueError: If the budget is below what the baseline, buffers and
+            dictionaries already take plus one minimal batch
     """
-    data_dir = Path("/Users/sksizer/dev/dat490/data")
-    input_file = data_dir / "LLCP2023_desc.parquet"
-    output_file = data_dir / "LLCP2023_desc_categorized.parquet"
-    
     # Check if input file exists
     if not input_file.exists():
         logger.error(f"Input file not found: {input_file}")
         return
-    
-    logger.info(f"Loading data from {input_file}...")
-    
-    # Step 1: Load the Parquet file (using pyarrow like original)
-    df = pd.read_parquet(input_file, engine='pyarrow')
-    logger.info(f"Loaded DataFrame with shape: {df.shape}")
-    
-    # Step 2: Find columns ending with '_DESC' and convert to 'category'
-    desc_cols = [col for col in df.columns if col.endswith('_DESC')]
+
+    parquet_file = pq.ParquetFile(input_file, buffer_size=READ_BUFFER_SIZE)
+    input_schema = parquet_file.schema_arrow
+    logger.info(f"Streaming {parquet_file.metadata.num_rows:,} rows x {len(input_schema.names)} columns "
+                f"in {parquet_file.num_row_groups} row groups from {input_file}")
+
+    # Find columns ending with '_DESC'; all-null columns have no values to categorize
+    desc_cols = [field.name for field in input_schema if field.name.endswith('_DESC')]
+    null_cols = [field.name for field in input_schema if field.name in desc_cols and pa.types.is_null(field.type)]
+    for col in null_cols:
+        logger.warning(f"Column {col} has no non-null values")
+    desc_cols = [col for col in desc_cols if col not in null_cols]
     logger.info(f"Found {len(desc_cols)} _DESC columns to categorize")
-    
+
     if not desc_cols:
         logger.warning("No _DESC columns found in the dataset")
         return
-    
-    # Show memory usage before conversion
-    memory_before = df.memory_usage(deep=True).sum() / 1024**2  # MB
-    logger.info(f"Memory usage before categorization: {memory_before:.1f} MB")
-    
-    # Check for problematic columns before conversion
-    problematic_cols = []
-    for col in desc_cols:
-        unique_vals = df[col].dropna().unique()
-        if len(unique_vals) == 0:
-            logger.warning(f"Column {col} has no non-null values")
-            problematic_cols.append(col)
-        elif len(unique_vals) > 10000:  # Too many categories might be problematic
-            logger.warning(f"Column {col} has {len(unique_vals)} unique values (might be inefficient as categorical)")
-    
-    logger.info("Converting _DESC columns to categorical dtype...")
-    
-    # Convert using the exact same approach as original code
+
+    # Memory the process already holds counts against the budget
+    baseline_mb = current_rss_mb()
+    probe = next(parquet_file.iter_batches(batch_size=PROBE_ROWS), None)
+    row_bytes = bytes_per_row(probe)
+    floor_mb = minimum_budget_mb(baseline_mb, STREAM_OVERHEAD_MB, row_bytes)
+    if memory_budget_mb < floor_mb:
+        raise ValueError(f"Memory budget {memory_budget_mb:.0f} MB is below the {floor_mb:.0f} MB minimum "
+                         f"(baseline {baseline_mb:.0f} MB, buffers {STREAM_OVERHEAD_MB} MB, one "
+                         f"{PROBE_ROWS:,}-row batch)")
+    available_mb = memory_budget_mb - baseline_mb - STREAM_OVERHEAD_MB
+    batch_rows = batch_rows_for_budget(row_bytes, available_mb)
+    logger.info(f"Memory budget {memory_budget_mb:.0f} MB: baseline {baseline_mb:.0f} MB, buffers "
+                f"{STREAM_OVERHEAD_MB} MB -> pass 1 {batch_rows:,} rows per batch")
+
+    # Pass 1: global dictionaries
+    dictionaries = collect_dictionaries(parquet_file, desc_cols, batch_rows)
+    for col, dictionary in dictionaries.items():
+        if len(dictionary) > 10000:  # Too many categories might be problematic
+            logger.warning(f"Column {col} has {len(dictionary)} unique values (might be inefficient as categorical)")
+    logger.info(f"Collected dictionaries for {len(dictionaries)} columns "
+                f"({sum(len(d) for d in dictionaries.values()):,} categories in total)")
+
+    # Output schema: _DESC columns become dictionary<int8/int16/int32, string>; the
+    # pandas metadata is dropped so readers take the dtypes from the Arrow schema
+    fields = []
+    for field in input_schema:
+        if field.name in dictionaries:
+            size = len(dictionaries[field.name])
+            index_type = pa.int8() if size <= np.iinfo(np.int8).max else pa.int16() if size <= np.iinfo(np.int16).max else pa.int32()
+            field = pa.field(field.name, pa.dictionary(index_type, pa.string()), nullable=True)
+        fields.append(field)
+    output_schema = pa.schema(fields)
+
+    # Pass 2 keeps the dictionaries and one buffered row group alive next to every batch
+    encoded_row_bytes = bytes_per_row(probe and encode_batch(probe, output_schema, dictionaries))
+    del probe
+    reserved_mb = STREAM_OVERHEAD_MB + dictionaries_mb(dictionaries)
+    pass2_mb = memory_budget_mb - baseline_mb - reserved_mb
+    row_group_rows = MAX_ROW_GROUP_ROWS
+    if encoded_row_bytes > 0:
+        row_group_rows = int(pass2_mb * ROW_GROUP_BUDGET_SHARE * 1024 ** 2 / encoded_row_bytes)
+        row_group_rows = min(MAX_ROW_GROUP_ROWS, max(MIN_ROW_GROUP_ROWS, row_group_rows))
+    row_group_mb = row_group_rows * encoded_row_bytes / 1024 ** 2
+    floor_mb = minimum_budget_mb(baseline_mb, reserved_mb + row_group_mb, row_bytes)
+    if memory_budget_mb < floor_mb:
+        raise ValueError(f"Memory budget {memory_budget_mb:.0f} MB is below the {floor_mb:.0f} MB minimum "
+                         f"once the dictionaries ({dictionaries_mb(dictionaries):.0f} MB) and a "
+                         f"{row_group_rows:,}-row output row group ({row_group_mb:.0f} MB) are held")
+    batch_rows = batch_rows_for_budget(row_bytes, pass2_mb - row_group_mb)
+    logger.info(f"Pass 2: dictionaries {dictionaries_mb(dictionaries):.1f} MB, {row_group_rows:,}-row "
+                f"row groups ({row_group_mb:.0f} MB) -> {batch_rows:,} rows per batch")
+
+    # Pass 2: encode batch by batch, writing a row group whenever row_group_rows are buffered
+    logger.info(f"Writing categorized data to {output_file}...")
+    output_file.parent.mkdir(parents=True, exist_ok=True)
+    tmp_file = output_file.with_name(output_file.name + '.tmp')
+    rows_written = 0
+    pending, pending_rows = [], 0
     try:
-        df[desc_cols] = df[desc_cols].astype('category')
-        logger.info("✅ Successfully converted all _DESC columns to categorical")
-    except Exception as e:
-        logger.error(f"Error during conversion: {e}")
-        # Try converting individually to identify problematic columns
-        logger.info("Trying individual column conversion...")
-        failed_cols = []
-        for col in desc_cols:
-            try:
-                df[col] = df[col].astype('category')
-                logger.debug(f"  ✅ {col}")
-            except Exception as col_e:
-                logger.warning(f"  ❌ {col}: {col_e}")
-                failed_cols.append(col)
-        
-        if failed_cols:
-            logger.warning(f"Failed to convert {len(failed_cols)} columns: {failed_cols}")
-    
-    # Show memory usage after conversion
-    memory_after = df.memory_usage(deep=True).sum() / 1024**2  # MB
-    memory_saved = memory_before - memory_after
-    memory_saved_pct = (memory_saved / memory_before) * 100 if memory_before > 0 else 0
-    
-    logger.info(f"Memory usage after categorization: {memory_after:.1f} MB")
-    logger.info(f"Memory saved: {memory_saved:.1f} MB ({memory_saved_pct:.1f}%)")
-    
-    # Step 3: Save modified DataFrame to a new Parquet file (using exact same approach)
-    logger.info(f"Saving categorized data to {output_file}...")
-    df.to_parquet(output_file, engine='pyarrow', index=True)
-    
-    # Verification
+        with pq.ParquetWriter(tmp_file, output_schema, compression='snappy') as writer:
+            for batch in parquet_file.iter_batches(batch_size=batch_rows):
+                pending.append(encode_batch(batch, output_schema, dictionaries))
+                pending_rows += batch.num_rows
+                if pending_rows < row_group_rows:
+                    continue
+                writer.write_table(pa.Table.from_batches(pending, output_schema), row_group_size=pending_rows)
+                rows_written += pending_rows
+                pending, pending_rows = [], 0
+                # Hand the freed row group back to the OS; mimalloc otherwise keeps it as slack
+                pa.default_memory_pool().release_unused()
+                logger.info(f"  {rows_written:,} / {parquet_file.metadata.num_rows:,} rows "
+                            f"(peak RSS {peak_rss_mb():.0f} MB)")
+            if pending:
+                writer.write_table(pa.Table.from_batches(pending, output_schema), row_group_size=pending_rows)
+                rows_written += pending_rows
+        tmp_file.replace(output_file)
+    except BaseException:
+        tmp_file.unlink(missing_ok=True)
+        raise
+
+    # Verification from the footer, without reading the data back
     logger.info("Verifying saved file...")
-    df_verify = pd.read_parquet(output_file, engine='pyarrow')
-    
-    # Check that _DESC columns are categorical
-    categorical_desc_cols = [col for col in df_verify.columns 
-                           if col.endswith('_DESC') and df_verify[col].dtype.name == 'category']
-    
-    non_categorical_desc_cols = [col for col in df_verify.columns 
-                               if col.endswith('_DESC') and df_verify[col].dtype.name != 'category']
-    
+    output_metadata = pq.read_metadata(output_file)
+    output_schema_read = output_metadata.schema.to_arrow_schema()
+    categorical_desc_cols = [field.name for field in output_schema_read
+                             if field.name.endswith('_DESC') and pa.types.is_dictionary(field.type)]
     logger.info(f"Verification: {len(categorical_desc_cols)} _DESC columns are categorical")
-    
-    if non_categorical_desc_cols:
-        logger.warning(f"Non-categorical _DESC columns: {non_categorical_desc_cols}")
-        for col in non_categorical_desc_cols:
-            unique_count = df_verify[col].dropna().nunique()
-            total_count = len(df_verify[col])
-            null_count = df_verify[col].isnull().sum()
-            logger.info(f"  {col}: {unique_count} unique, {null_count} nulls, {total_count} total")
-    
+
     if len(categorical_desc_cols) == len(desc_cols):
         logger.info("✅ SUCCESS: All _DESC columns successfully converted to categorical")
     else:
         logger.warning(f"⚠️  WARNING: Only {len(categorical_desc_cols)} out of {len(desc_cols)} _DESC columns are categorical")
-    
+
     # Check column names haven't changed
-    if set(df.columns) == set(df_verify.columns):
+    if output_schema_read.names == input_schema.names:
         logger.info("✅ Column names unchanged")
     else:
         logger.warning("❌ Column names changed during save/load!")
-        
+
     # Check data shape
-    if df.shape == df_verify.shape:
-        logger.info(f"✅ Data shape unchanged: {df.shape}")
+    input_shape = (parquet_file.metadata.num_rows, len(input_schema.names))
+    output_shape = (output_metadata.num_rows, len(output_schema_read.names))
+    if input_shape == output_shape:
+        logger.info(f"✅ Data shape unchanged: {input_shape}")
     else:
-        logger.warning(f"❌ Data shape changed: {df.shape} -> {df_verify.shape}")
-    
+        logger.warning(f"❌ Data shape changed: {input_shape} -> {output_shape}")
+
     # Show file sizes
     input_size = input_file.stat().st_size / 1024**2  # MB
     output_size = output_file.stat().st_size / 1024**2  # MB
     size_change = output_size - input_size
     size_change_pct = (size_change / input_size) * 100 if input_size > 0 else 0
-    
+
     logger.info(f"\nFile size comparison:")
     logger.info(f"  Original: {input_size:.1f} MB")
     logger.info(f"  Categorized: {output_size:.1f} MB")
@@ -142,16 +299,31 @@ def categorize_desc_columns():
         logger.info(f"  Change: +{size_change:.1f} MB (+{size_change_pct:.1f}%)")
     else:
         logger.info(f"  Saved: {abs(size_change):.1f} MB ({abs(size_change_pct):.1f}%)")
-    
+
+    peak_mb = peak_rss_mb()
+    if peak_mb <= memory_budget_mb:
+        logger.info(f"Peak RSS: {peak_mb:.0f} MB (budget {memory_budget_mb:.0f} MB)")
+    else:
+        logger.warning(f"Peak RSS {peak_mb:.0f} MB exceeded the {memory_budget_mb:.0f} MB budget")
     logger.info(f"\n🎉 Categorization complete! Output saved to: {output_file}")
 
 def main():
     """Main function to run the categorization process"""
+    parser = argparse.ArgumentParser(description='Convert _DESC columns to categorical, streaming the file')
+    parser.add_argument('--input', type=Path, default=Path('data/LLCP2023_desc.parquet'),
+                        help='Parquet file with string _DESC columns (default: data/LLCP2023_desc.parquet)')
+    parser.add_argument('--output', type=Path, default=None,
+                        help='Output file (default: <input>_categorized.parquet next to the input)')
+    parser.add_argument('--memory-budget', type=float, default=1024,
+                        help='Peak memory of the process in MB, including the interpreter (default: 1024)')
+    args = parser.parse_args()
+    output = args.output or args.input.with_name(f"{args.input.stem}_categorized.parquet")
+
     try:
-        categorize_desc_columns()
+        categorize_desc_columns(args.input, output, args.memory_budget)
     except Exception as e:
         logger.error(f"Error during categorization: {e}")
         raise
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    main()
@@ -1,18 +1,29 @@
 #!/usr/bin/env python3
 """
 Compare columns between BRFSS parquet files and check for specific columns like _DRDXAR2.
+
+Everything is answered from parquet footers through the dataset catalog,
+without reading column data.
+
+Usage: PYTHONPATH=. python scripts/check_parquet_columns.py [--data-dir data]
 """
-import pandas as pd
+import argparse
 from pathlib import Path
 
-def check_parquet_columns():
-    """Compare columns between the three BRFSS parquet files"""
-    data_dir = Path("/Users/sksizer/dev/dat490/data")
-    files = {
+from dat490.catalog import default_catalog
+
+def data_files(data_dir: Path) -> dict:
+    """Return the three BRFSS parquet files by name."""
+    return {
         "LLCP2023": data_dir / "LLCP2023.parquet",
         "LLCP2023_desc": data_dir / "LLCP2023_desc.parquet", 
         "LLCP2023_desc_categorized": data_dir / "LLCP2023_desc_categorized.parquet"
     }
+
+def check_parquet_columns(data_dir: Path):
+    """Compare columns between the three BRFSS parquet files"""
+    catalog = default_catalog()
+    files = data_files(data_dir)
     
     print("BRFSS PARQUET FILES COLUMN COMPARISON")
     print("="*50)
@@ -25,9 +36,7 @@ def check_parquet_columns():
             continue
             
         try:
-            import pyarrow.parquet as pq
-            parquet_file = pq.ParquetFile(path)
-            columns = parquet_file.schema.names
+            columns = catalog.columns(path)
             columns_dict[name] = set(columns)
             print(f"✅ {name}: {len(columns)} columns")
         except Exception as e:
@@ -43,7 +52,7 @@ def check_parquet_columns():
         if "_DRDXAR2" in cols:
             print(f"  ✅ {name}: Contains _DRDXAR2")
         elif any("DRDXAR2" in col for col in cols):
-            drdx_cols = [col for col in cols if "DRDXAR2" in col]
+            drdx_cols = catalog.find_columns(files[name], "DRDXAR2")
             print(f"  ⚠️  {name}: Missing _DRDXAR2, but has: {drdx_cols}")
         else:
             print(f"  ❌ {name}: No DRDXAR2 columns found")
@@ -55,34 +64,31 @@ def check_parquet_columns():
         print(f"  {name}: {len(desc_cols)} _DESC columns")
     
     # Show overlap
-    if len(columns_dict) >= 2:
-        names = list(columns_dict.keys())
-        if len(names) == 3:
-            common = columns_dict[names[0]] & columns_dict[names[1]] & columns_dict[names[2]]
-            print(f"\n🤝 COMMON TO ALL: {len(common)} columns")
-        
-        for i, name1 in enumerate(names):
-            for name2 in names[i+1:]:
-                overlap = len(columns_dict[name1] & columns_dict[name2])
-                total = len(columns_dict[name1] | columns_dict[name2])
-                pct = overlap / total * 100 if total > 0 else 0
-                print(f"  {name1} ∩ {name2}: {overlap}/{total} ({pct:.1f}%)")
+    comparison = catalog.compare_columns({name: files[name] for name in columns_dict})
+    names = list(columns_dict.keys())
+    if len(names) == 3:
+        print(f"\n🤝 COMMON TO ALL: {len(comparison.common)} columns")
+    
+    for i, name1 in enumerate(names):
+        for name2 in names[i+1:]:
+            overlap, total = comparison.overlap(name1, name2)
+            pct = overlap / total * 100 if total > 0 else 0
+            print(f"  {name1} ∩ {name2}: {overlap}/{total} ({pct:.1f}%)")
 
-def check_categorization():
+def check_categorization(data_dir: Path):
     """Check if _DESC columns are properly categorized"""
-    data_dir = Path("/Users/sksizer/dev/dat490/data")
-    cat_file = data_dir / "LLCP2023_desc_categorized.parquet"
+    cat_file = data_files(data_dir)["LLCP2023_desc_categorized"]
     
     if not cat_file.exists():
         print("❌ Categorized file not found")
         return
     
     print(f"\n🏷️  CATEGORIZATION CHECK:")
-    df = pd.read_parquet(cat_file)
+    summary = default_catalog().summary(cat_file)
     
-    desc_cols = [col for col in df.columns if col.endswith('_DESC')]
-    categorical_cols = [col for col in desc_cols if df[col].dtype.name == 'category']
-    non_categorical_cols = [col for col in desc_cols if df[col].dtype.name != 'category']
+    desc_cols = [col for col in summary.column_names if col.endswith('_DESC')]
+    categorical_cols = [col for col in desc_cols if summary.columns[col].categorical]
+    non_categorical_cols = [col for col in desc_cols if not summary.columns[col].categorical]
     
     print(f"  Total _DESC columns: {len(desc_cols)}")
     print(f"  Categorical: {len(categorical_cols)}")
@@ -91,10 +97,13 @@ def check_categorization():
     if non_categorical_cols:
         print(f"  Non-categorical columns: {non_categorical_cols}")
         for col in non_categorical_cols:
-            null_count = df[col].isnull().sum()
-            total = len(df[col])
-            print(f"    {col}: {null_count}/{total} nulls")
+            null_count = summary.columns[col].null_count
+            print(f"    {col}: {null_count if null_count is not None else '?'}/{summary.num_rows} nulls")
 
 if __name__ == "__main__":
-    check_parquet_columns()
-    check_categorization()
\ No newline at end of file
+    parser = argparse.ArgumentParser(description='Compare columns between the BRFSS parquet files')
+    parser.add_argument('--data-dir', type=Path, default=Path(__file__).parent.parent / "data",
+                        help='Directory holding the parquet files (default: data/)')
+    args = parser.parse_args()
+    check_parquet_columns(args.data_dir)
+    check_categorization(args.data_dir)
@@ -1,13 +1,19 @@
 #!/usr/bin/env python3
 """
 Compare columns between different BRFSS parquet files
+
+Column names come from parquet footers through the dataset catalog, so no
+column data is read.
+
+Usage: PYTHONPATH=. python scripts/compare_parquet_columns.py [--data-dir data]
 """
-import pandas as pd
+import argparse
 from pathlib import Path
 
-def compare_parquet_columns():
+from dat490.catalog import default_catalog
+
+def compare_parquet_columns(data_dir: Path):
     # Define file paths
-    data_dir = Path("/Users/sksizer/dev/dat490/data")
     files = {
         "LLCP2023": data_dir / "LLCP2023.parquet",
         "LLCP2023_desc": data_dir / "LLCP2023_desc.parquet",
@@ -20,27 +26,15 @@ def compare_parquet_columns():
             print(f"❌ {name} not found at {path}")
             return
     
-    # Read columns from each file
-    columns_dict = {}
-    for name, path in files.items():
-        print(f"\n📁 Reading {name}...")
-        try:
-            # Try to read parquet schema without loading data
-            import pyarrow.parquet as pq
-            parquet_file = pq.ParquetFile(path)
-            columns = parquet_file.schema.names
-            columns_dict[name] = set(columns)
-            print(f"   Found {len(columns)} columns")
-        except Exception as e:
-            try:
-                # Fallback: read with pandas
-                df = pd.read_parquet(path)
-                columns_dict[name] = set(df.columns)
-                print(f"   Found {len(df.columns)} columns (using pandas fallback)")
-            except Exception as e2:
-                print(f"   ❌ Error reading {name}: {e}")
-                print(f"   ❌ Pandas fallback also failed: {e2}")
-                return
+    # Read columns from each file's footer
+    try:
+        comparison = default_catalog().compare_columns(files)
+    except Exception as e:
+        print(f"   ❌ Error reading parquet footers: {e}")
+        return
+    columns_dict = {name: set(cols) for name, cols in comparison.columns.items()}
+    for name, cols in columns_dict.items():
+        print(f"\n📁 {name}: found {len(cols)} columns")
     
     # Print column comparison
     print("\n" + "="*60)
@@ -48,19 +42,13 @@ def compare_parquet_columns():
     print("="*60)
     
     # Find common columns
-    common_cols = columns_dict["LLCP2023"] & columns_dict["LLCP2023_desc"] & columns_dict["LLCP2023_desc_categorized"]
-    print(f"\n✅ Common columns in all three files: {len(common_cols)}")
+    print(f"\n✅ Common columns in all three files: {len(comparison.common)}")
     
     # Find unique columns in each file
-    for name, cols in columns_dict.items():
-        other_cols = [c for n, c in columns_dict.items() if n != name]
-        if other_cols:
-            unique = cols.difference(*other_cols)
-        else:
-            unique = cols
+    for name, unique in comparison.unique.items():
         if unique:
             print(f"\n🔸 Unique to {name}: {len(unique)} columns")
-            for col in sorted(list(unique))[:10]:  # Show first 10
+            for col in unique[:10]:  # Show first 10
                 print(f"   - {col}")
             if len(unique) > 10:
                 print(f"   ... and {len(unique) - 10} more")
@@ -87,35 +75,35 @@ def compare_parquet_columns():
     print("="*60)
     
     # Compare LLCP2023 vs LLCP2023_desc
-    diff_1_2 = columns_dict["LLCP2023"] - columns_dict["LLCP2023_desc"]
+    diff_1_2 = comparison.differences[("LLCP2023", "LLCP2023_desc")]
     if diff_1_2:
         print(f"\n📍 In LLCP2023 but not in LLCP2023_desc: {len(diff_1_2)}")
-        for col in sorted(list(diff_1_2))[:5]:
+        for col in diff_1_2[:5]:
             print(f"   - {col}")
         if len(diff_1_2) > 5:
             print(f"   ... and {len(diff_1_2) - 5} more")
     
-    diff_2_1 = columns_dict["LLCP2023_desc"] - columns_dict["LLCP2023"]
+    diff_2_1 = comparison.differences[("LLCP2023_desc", "LLCP2023")]
     if diff_2_1:
         print(f"\n📍 In LLCP2023_desc but not in LLCP2023: {len(diff_2_1)}")
-        for col in sorted(list(diff_2_1))[:5]:
+        for col in diff_2_1[:5]:
             print(f"   - {col}")
         if len(diff_2_1) > 5:
             print(f"   ... and {len(diff_2_1) - 5} more")
     
     # Compare LLCP2023_desc vs LLCP2023_desc_categorized
-    diff_2_3 = columns_dict["LLCP2023_desc"] - columns_dict["LLCP2023_desc_categorized"]
+    diff_2_3 = comparison.differences[("LLCP2023_desc", "LLCP2023_desc_categorized")]
     if diff_2_3:
         print(f"\n📍 In LLCP2023_desc but not in LLCP2023_desc_categorized: {len(diff_2_3)}")
-        for col in sorted(list(diff_2_3))[:5]:
+        for col in diff_2_3[:5]:
             print(f"   - {col}")
         if len(diff_2_3) > 5:
             print(f"   ... and {len(diff_2_3) - 5} more")
     
-    diff_3_2 = columns_dict["LLCP2023_desc_categorized"] - columns_dict["LLCP2023_desc"]
+    diff_3_2 = comparison.differences[("LLCP2023_desc_categorized", "LLCP2023_desc")]
     if diff_3_2:
         print(f"\n📍 In LLCP2023_desc_categorized but not in LLCP2023_desc: {len(diff_3_2)}")
-        for col in sorted(list(diff_3_2))[:5]:
+        for col in diff_3_2[:5]:
             print(f"   - {col}")
         if len(diff_3_2) > 5:
             print(f"   ... and {len(diff_3_2) - 5} more")
@@ -128,7 +116,7 @@ def compare_parquet_columns():
         print(f"{name}: {len(cols)} columns")
     
     # Save full column lists to files for detailed inspection
-    output_dir = Path("/Users/sksizer/dev/dat490/data")
+    output_dir = data_dir
     for name, cols in columns_dict.items():
         output_file = output_dir / f"{name}_columns.txt"
         with open(output_file, 'w') as f:
@@ -139,4 +127,8 @@ def compare_parquet_columns():
         print(f"\n💾 Full column list saved to: {output_file}")
 
 if __name__ == "__main__":
-    compare_parquet_columns()
\ No newline at end of file
+    parser = argparse.ArgumentParser(description='Compare columns between the BRFSS parquet files')
+    parser.add_argument('--data-dir', type=Path, default=Path(__file__).parent.parent / "data",
+                        help='Directory holding the parquet files; column lists are saved here too (default: data/)')
+    args = parser.parse_args()
+    compare_parquet_columns(args.data_dir)
\ No newline at end of file
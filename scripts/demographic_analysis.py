@@ -2,7 +2,8 @@
 Demographic Analysis Module
 =========================
 
-Reusable Random Forest analysis function for predicting BRFSS variables from demographic features.
+Reusable analysis function for predicting BRFSS variables from demographic features, with a
+Random Forest by default and other scikit-learn classifiers selectable through MODEL_ENGINES.
 Based on the GENHLTH demographic analysis notebook.
 """
 
@@ -18,12 +19,20 @@ import pandas as pd
 import numpy as np
 import matplotlib.pyplot as plt
 import seaborn as sns
-from sklearn.ensemble import RandomForestClassifier
+import sklearn
+from sklearn.ensemble import HistGradientBoostingClassifier, RandomForestClassifier
+from sklearn.inspection import permutation_importance
+from sklearn.linear_model import LogisticRegression
 from sklearn.model_selection import train_test_split, GridSearchCV
 from sklearn.metrics import classification_report, confusion_matrix, accuracy_score
-from sklearn.preprocessing import LabelEncoder
+from sklearn.naive_bayes import BernoulliNB
+from sklearn.pipeline import make_pipeline
+from sklearn.preprocessing import LabelEncoder, OneHotEncoder
 from pydantic import BaseModel
 
+from dat490.cache import analysis_cache_key, column_digest
+from dat490.features import FeatureMatrix
+
 # Suppress sklearn warnings
 warnings.filterwarnings('ignore')
 
@@ -39,6 +48,149 @@ DEMOGRAPHIC_FEATURE_COLUMNS = [
 ]
 
 
+# Classifier backends for perform_demographic_analysis. The demographic features
+# are coded categories, so the two baselines one-hot encode them first
+MODEL_ENGINES = ('random_forest', 'hist_gradient_boosting', 'logistic', 'naive_bayes')
+DEFAULT_MODEL_ENGINE = 'random_forest'
+
+# Parameters used when hyperparameter tuning is off
+ENGINE_PARAMETERS = {
+    'random_forest': {'n_estimators': 100, 'max_depth': 10, 'min_samples_split': 10, 'min_samples_leaf': 5,
+                      'n_jobs': -1},
+    'hist_gradient_boosting': {'max_iter': 100, 'learning_rate': 0.1, 'max_leaf_nodes': 31, 'early_stopping': True},
+    'logistic': {'C': 1.0, 'max_iter': 200},
+    'naive_bayes': {'alpha': 1.0},
+}
+
+# Grids searched when hyperparameter tuning is on (pipeline steps are prefixed with their name)
+PARAMETER_GRIDS = {
+    'random_forest': {
+        'n_estimators': [50, 100, 200],
+        'max_depth': [5, 10, 15, None],
+        'min_samples_split': [5, 10, 20],
+        'min_samples_leaf': [2, 5, 10]
+    },
+    'hist_gradient_boosting': {
+        'learning_rate': [0.05, 0.1, 0.2],
+        'max_leaf_nodes': [15, 31, 63],
+        'l2_regularization': [0.0, 1.0]
+    },
+    'logistic': {'logisticregression__C': [0.1, 1.0, 10.0]},
+    'naive_bayes': {'bernoullinb__alpha': [0.1, 1.0, 10.0]},
+}
+
+# Test rows scored by permutation importance for engines without built-in importances
+PERMUTATION_SAMPLE_SIZE = 10_000
+
+
+def create_model(model_engine: str, random_state: int = 42):
+    """
+    Create an unfitted classifier for a model engine with its ENGINE_PARAMETERS.
+    
+    Args:
+        model_engine: One of MODEL_ENGINES
+        random_state: Random seed for reproducibility
+        
+    Returns:
+        scikit-learn classifier or pipeline
+    """
+    if model_engine not in MODEL_ENGINES:
+        raise ValueError(f"Unknown model engine '{model_engine}'. Expected one of {MODEL_ENGINES}")
+    params = ENGINE_PARAMETERS[model_engine]
+    if model_engine == 'random_forest':
+        return RandomForestClassifier(random_state=random_state, **params)
+    if model_engine == 'hist_gradient_boosting':
+        return HistGradientBoostingClassifier(random_state=random_state, **params)
+    if model_engine == 'logistic':
+        return make_pipeline(OneHotEncoder(handle_unknown='ignore'),
+                             LogisticRegression(random_state=random_state, **params))
+    return make_pipeline(OneHotEncoder(handle_unknown='ignore'), BernoulliNB(**params))
+
+
+def model_feature_importances(model, X_test: pd.DataFrame, y_test, random_state: int = 42) -> np.ndarray:
+    """
+    Return one importance per feature column, summing to 1.
+    
+    Tree ensembles with impurity importances (random forest) use them directly. Other
+    engines use the mean accuracy drop when each feature is permuted, over up to
+    PERMUTATION_SAMPLE_SIZE test rows, clipped at zero.
+    
+    Args:
+        model: Fitted classifier from create_model
+        X_test: Held-out features
+        y_test: Held-out target
+        random_state: Random seed for the sample and the permutations
+        
+    Returns:
+        Array of importances in X_test column order
+    """
+    if hasattr(model, 'feature_importances_'):
+        return model.feature_importances_
+    
+    if len(X_test) > PERMUTATION_SAMPLE_SIZE:
+        sample = np.random.default_rng(random_state).choice(len(X_test), PERMUTATION_SAMPLE_SIZE, replace=False)
+        X_test, y_test = X_test.iloc[sample], np.asarray(y_test)[sample]
+    result = permutation_importance(model, X_test, y_test, scoring='accuracy', n_repeats=3,
+                                    random_state=random_state, n_jobs=1)
+    importances = np.clip(result.importances_mean, 0, None)
+    total = importances.sum()
+    return importances / total if total > 0 else importances
+
+
+# Bump whenever perform_demographic_analysis output changes for the same inputs, so
+# cached results (demographic_analysis_cache_key) are recomputed
+ANALYSIS_VERSION = 1
+
+
+def demographic_analysis_cache_key(
+    df: pd.DataFrame,
+    metadata: Dict[str, Any],
+    target_column: str,
+    feature_matrix: FeatureMatrix,
+    min_samples: int = 1000,
+    test_size: float = 0.2,
+    random_state: int = 42,
+    hyperparameter_tuning: bool = False,
+    model_engine: str = DEFAULT_MODEL_ENGINE
+) -> str:
+    """
+    Content key of a perform_demographic_analysis result.
+    
+    Covers the target column's values, the encoded feature block, the model
+    settings, the target's value labels, library versions and ANALYSIS_VERSION:
+    two calls with equal keys produce the same result.
+    
+    Args:
+        df: DataFrame holding the target column
+        metadata: Dictionary of column metadata
+        target_column: Name of the target variable
+        feature_matrix: FeatureMatrix passed to perform_demographic_analysis
+        min_samples, test_size, random_state, hyperparameter_tuning, model_engine:
+            As passed to perform_demographic_analysis
+        
+    Returns:
+        Hex digest from dat490.cache.analysis_cache_key
+    """
+    target_meta = metadata.get(target_column)
+    value_lookup = getattr(target_meta, 'value_lookup', None) or {}
+    parameters = {
+        'target_column': target_column,
+        'model_engine': model_engine,
+        'engine_parameters': ENGINE_PARAMETERS[model_engine],
+        'parameter_grid': PARAMETER_GRIDS[model_engine] if hyperparameter_tuning else None,
+        'permutation_sample_size': PERMUTATION_SAMPLE_SIZE,
+        'min_samples': min_samples,
+        'test_size': test_size,
+        'random_state': random_state,
+        # Lookups have a None key, which json.dumps cannot sort among ints
+        'value_lookup': sorted(([str(key), label] for key, label in value_lookup.items())),
+        'sklearn': sklearn.__version__,
+        'numpy': np.__version__,
+    }
+    return analysis_cache_key(column_digest(df[target_column]), feature_matrix.fingerprint(),
+                              parameters, ANALYSIS_VERSION)
+
+
 class DemographicAnalysisResult(BaseModel):
     """Result of demographic analysis for a single target column."""
     target_column: str
@@ -75,10 +227,12 @@ def perform_demographic_analysis(
     test_size: float = 0.2,
     random_state: int = 42,
     hyperparameter_tuning: bool = True,
-    logger: Optional[logging.Logger] = None
+    logger: Optional[logging.Logger] = None,
+    feature_matrix: Optional[FeatureMatrix] = None,
+    model_engine: str = DEFAULT_MODEL_ENGINE
 ) -> DemographicAnalysisResult:
     """
-    Perform Random Forest demographic analysis for a target variable.
+    Perform demographic analysis for a target variable with one of MODEL_ENGINES.
     
     Args:
         df: DataFrame with BRFSS data (semantic nulls should already be converted)
@@ -90,6 +244,9 @@ def perform_demographic_analysis(
         random_state: Random seed for reproducibility
         hyperparameter_tuning: Whether to perform hyperparameter tuning
         logger: Logger instance for progress tracking
+        feature_matrix: FeatureMatrix of the feature columns over df's rows, shared across
+            targets (default: encode the available feature columns for this call)
+        model_engine: Classifier backend, one of MODEL_ENGINES (default: 'random_forest')
         
     Returns:
         DemographicAnalysisResult containing analysis results
@@ -102,6 +259,9 @@ def perform_demographic_analysis(
     if feature_columns is None:
         feature_columns = DEMOGRAPHIC_FEATURE_COLUMNS.copy()
     
+    if model_engine not in MODEL_ENGINES:
+        raise ValueError(f"Unknown model engine '{model_engine}'. Expected one of {MODEL_ENGINES}")
+    
     try:
         # Validate target column exists
         if target_column not in df.columns:
@@ -119,8 +279,15 @@ def perform_demographic_analysis(
             )
         
         # Remove target column from features if present
-        available_features = [col for col in feature_columns 
-                            if col in df.columns and col != target_column]
+        if feature_matrix is None:
+            available_features = [col for col in feature_columns 
+                                if col in df.columns and col != target_column]
+            feature_matrix = FeatureMatrix.from_frame(df, available_features)
+        elif feature_matrix.num_rows != len(df):
+            raise ValueError(f"Feature matrix has {feature_matrix.num_rows:,} rows, DataFrame has {len(df):,}")
+        else:
+            available_features = [col for col in feature_columns 
+                                if col in feature_matrix.columns and col != target_column]
         
         if len(available_features) == 0:
             return DemographicAnalysisResult(
@@ -139,19 +306,29 @@ def perform_demographic_analysis(
         logger.info(f"Starting demographic analysis for {target_column}")
         logger.info(f"Using {len(available_features)} demographic features")
         
-        # Create analysis dataset
-        analysis_cols = [target_column] + available_features
-        analysis_df = df[analysis_cols].copy()
+        # Target values and the rows where the target is known; the features
+        # come from the encoded matrix, so no DataFrame is copied per target
+        target_series = df[target_column]
+        target_rows = target_series.notna().to_numpy()
+        
+        # Widen compact dtypes (BFRSS(compact=True)) back to float64 so class labels
+        # and report keys match frames loaded without compaction
+        if (isinstance(target_series.dtype, pd.api.extensions.ExtensionDtype)
+                and pd.api.types.is_integer_dtype(target_series.dtype)
+                or target_series.dtype == np.float32):
+            target_values = target_series.to_numpy(dtype='float64', na_value=np.nan)
+        else:
+            target_values = target_series.to_numpy()
         
         # Remove rows with missing target values
-        initial_size = len(analysis_df)
-        model_df = analysis_df.dropna(subset=[target_column]).copy()
-        dropped_target = initial_size - len(model_df)
+        initial_size = len(target_values)
+        total_samples = int(np.count_nonzero(target_rows))
+        dropped_target = initial_size - total_samples
         
         logger.info(f"Dropped {dropped_target:,} rows with missing target values")
         
         # Check minimum sample requirement
-        if len(model_df) < min_samples:
+        if total_samples < min_samples or total_samples == 0:
             return DemographicAnalysisResult(
                 target_column=target_column,
                 accuracy=0.0,
@@ -162,22 +339,16 @@ def perform_demographic_analysis(
                 model_parameters={},
                 analysis_metadata={},
                 successful=False,
-                error_message=f"Insufficient samples: {len(model_df)} < {min_samples} required"
+                error_message=f"Insufficient samples: {total_samples} < {min_samples} required"
             )
         
         # Handle missing values in features (drop columns >30% missing, fill remainder with mode)
-        missing_threshold = 0.3
-        cols_to_keep = []
+        prepared = feature_matrix.prepare(rows=target_rows, columns=available_features, missing_threshold=0.3)
         
-        for col in available_features:
-            missing_pct = model_df[col].isnull().sum() / len(model_df)
-            
-            if missing_pct <= missing_threshold:
-                cols_to_keep.append(col)
-            else:
-                logger.info(f"Dropping {col} due to {missing_pct:.1%} missing values")
+        for col, missing_pct in prepared.dropped.items():
+            logger.info(f"Dropping {col} due to {missing_pct:.1%} missing values")
         
-        feature_cols = cols_to_keep
+        feature_cols = prepared.columns
         
         if len(feature_cols) == 0:
             return DemographicAnalysisResult(
@@ -193,32 +364,17 @@ def perform_demographic_analysis(
                 error_message="All feature columns exceeded missing value threshold"
             )
         
-        # Fill remaining missing values with mode
-        for col in feature_cols:
-            if model_df[col].isnull().any():
-                mode_value = model_df[col].mode().iloc[0] if not model_df[col].mode().empty else 0
-                filled_count = model_df[col].isnull().sum()
-                model_df[col] = model_df[col].fillna(mode_value)
-                logger.debug(f"Filled {filled_count:,} missing values in {col} with mode: {mode_value}")
+        for col, (filled_count, mode_value) in prepared.filled.items():
+            logger.debug(f"Filled {filled_count:,} missing values in {col} with mode: {mode_value}")
         
         # Prepare features and target
-        X = model_df[feature_cols].copy()
-        y = model_df[target_column].copy()
-        
-        # Convert to numeric if needed
-        for col in X.columns:
-            if X[col].dtype == 'object':
-                le = LabelEncoder()
-                X[col] = le.fit_transform(X[col].astype(str))
-            else:
-                X[col] = pd.to_numeric(X[col], errors='coerce')
+        X = pd.DataFrame(prepared.X, columns=feature_cols, copy=False)
+        y = pd.Series(target_values[target_rows])
         
         # Ensure target is numeric
         if y.dtype == 'object':
             le_target = LabelEncoder()
             y = le_target.fit_transform(y.astype(str))
-        else:
-            y = pd.to_numeric(y, errors='coerce')
         
         # Split data
         X_train, X_test, y_train, y_test = train_test_split(
@@ -229,6 +385,7 @@ def perform_demographic_analysis(
         logger.info(f"Test set: {X_test.shape[0]:,} samples")
         
         # Train model
+        fit_start = time.time()
         if hyperparameter_tuning:
             logger.info("Performing hyperparameter tuning...")
             
@@ -237,16 +394,9 @@ def perform_demographic_analysis(
             X_sample = X_train.sample(n=sample_size, random_state=random_state)
             y_sample = y_train[X_sample.index]
             
-            param_grid = {
-                'n_estimators': [50, 100, 200],
-                'max_depth': [5, 10, 15, None],
-                'min_samples_split': [5, 10, 20],
-                'min_samples_leaf': [2, 5, 10]
-            }
-            
             grid_search = GridSearchCV(
-                RandomForestClassifier(random_state=random_state, n_jobs=-1),
-                param_grid,
+                create_model(model_engine, random_state),
+                PARAMETER_GRIDS[model_engine],
                 cv=3,
                 scoring='accuracy',
                 n_jobs=-1,
@@ -258,27 +408,21 @@ def perform_demographic_analysis(
             logger.info(f"Best parameters: {best_params}")
             
             # Train final model with best parameters
-            rf_model = grid_search.best_estimator_
-            rf_model.fit(X_train, y_train)
+            model = grid_search.best_estimator_
+            model.fit(X_train, y_train)
         else:
             # Use default parameters
-            best_params = {
-                'n_estimators': 100,
-                'max_depth': 10,
-                'min_samples_split': 10,
-                'min_samples_leaf': 5,
-                'random_state': random_state,
-                'n_jobs': -1
-            }
+            best_params = {**ENGINE_PARAMETERS[model_engine], 'random_state': random_state}
             
-            rf_model = RandomForestClassifier(**best_params)
-            rf_model.fit(X_train, y_train)
+            model = create_model(model_engine, random_state)
+            model.fit(X_train, y_train)
+        fit_time = time.time() - fit_start
         
         # Make predictions and evaluate
-        y_pred = rf_model.predict(X_test)
+        y_pred = model.predict(X_test)
         accuracy = accuracy_score(y_test, y_pred)
         
-        logger.info(f"Model accuracy: {accuracy:.3f}")
+        logger.info(f"Model accuracy: {accuracy:.3f} ({model_engine}, fit {fit_time:.1f}s)")
         
         # Generate classification report
         class_report = classification_report(y_test, y_pred, output_dict=True)
@@ -292,7 +436,7 @@ def perform_demographic_analysis(
                 'feature': feature,
                 'importance': float(importance)
             }
-            for feature, importance in zip(feature_cols, rf_model.feature_importances_)
+            for feature, importance in zip(feature_cols, model_feature_importances(model, X_test, y_test, random_state))
         ]
         feature_importance_list.sort(key=lambda x: x['importance'], reverse=True)
         
@@ -312,13 +456,15 @@ def perform_demographic_analysis(
         # Analysis metadata
         target_dist = pd.Series(y).value_counts().sort_index()
         analysis_metadata = {
-            'total_samples': int(len(model_df)),
+            'total_samples': total_samples,
             'training_samples': int(len(X_train)),
             'test_samples': int(len(X_test)),
             'features_used': feature_cols,
             'features_dropped_missing': int(len(available_features) - len(feature_cols)),
             'target_missing_dropped': int(dropped_target),
             'hyperparameter_tuning': hyperparameter_tuning,
+            'model_engine': model_engine,
+            'fit_time_seconds': float(fit_time),
             'analysis_time_seconds': float(time.time() - start_time),
             'target_distribution': {str(k): int(v) for k, v in target_dist.items()}
         }
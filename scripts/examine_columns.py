@@ -1,16 +1,21 @@
 #!/usr/bin/env python3
 """
 Script to examine column names in parquet files to understand X prefix issue
+
+Column names come from parquet footers through the dataset catalog, so no
+column data is read.
+
+Usage: PYTHONPATH=. python scripts/examine_columns.py [--data-dir data]
 """
 
-import pandas as pd
+import argparse
 import sys
 from pathlib import Path
 
-def examine_parquet_columns():
-    # Define file paths
-    base_dir = Path(__file__).parent.parent
-    data_dir = base_dir / "data"
+from dat490.catalog import default_catalog
+
+def examine_parquet_columns(data_dir: Path):
+    catalog = default_catalog()
     
     files = [
         "LLCP2023.parquet",
@@ -28,17 +33,17 @@ def examine_parquet_columns():
     
     print("Examining column names in parquet files...\n")
     
-    # Read column names from each file
+    # Read column names from each file's footer
     file_columns = {}
     for i, file_path in enumerate(file_paths):
         try:
-            df = pd.read_parquet(file_path)
-            file_columns[files[i]] = list(df.columns)
+            columns = catalog.columns(file_path)
+            file_columns[files[i]] = columns
             print(f"{files[i]}:")
-            print(f"  Total columns: {len(df.columns)}")
+            print(f"  Total columns: {len(columns)}")
             
             # Check for columns starting with X
-            x_columns = [col for col in df.columns if col.startswith('X')]
+            x_columns = [col for col in columns if col.startswith('X')]
             if x_columns:
                 print(f"  Columns starting with 'X': {len(x_columns)}")
                 print(f"  First 10 X columns: {x_columns[:10]}")
@@ -46,7 +51,7 @@ def examine_parquet_columns():
                 print(f"  No columns starting with 'X'")
                 
             # Check for columns starting with underscore
-            underscore_columns = [col for col in df.columns if col.startswith('_')]
+            underscore_columns = [col for col in columns if col.startswith('_')]
             if underscore_columns:
                 print(f"  Columns starting with '_': {len(underscore_columns)}")
                 print(f"  First 10 _ columns: {underscore_columns[:10]}")
@@ -96,18 +101,10 @@ def examine_parquet_columns():
     
     for i in range(1, len(files)):
         current_file = files[i]
-        current_columns = set(file_columns[current_file])
         
         print(f"Potential mappings for {current_file}:")
         
-        x_columns = [col for col in current_columns if col.startswith('X_')]
-        potential_mappings = []
-        
-        for x_col in x_columns:
-            # Remove X prefix to get potential original name
-            potential_original = x_col[1:]  # Remove 'X'
-            if potential_original in reference_columns:
-                potential_mappings.append((x_col, potential_original))
+        potential_mappings = list(catalog.x_prefix_aliases(file_paths[i], file_paths[0]).items())
         
         if potential_mappings:
             print(f"  Found {len(potential_mappings)} potential X->_ mappings")
@@ -120,4 +117,9 @@ def examine_parquet_columns():
     return True
 
 if __name__ == "__main__":
-    examine_parquet_columns()
\ No newline at end of file
+    parser = argparse.ArgumentParser(description='Examine X_/_ column names in the BRFSS parquet files')
+    parser.add_argument('--data-dir', type=Path, default=Path(__file__).parent.parent / "data",
+                        help='Directory holding the parquet files (default: data/)')
+    args = parser.parse_args()
+    if not examine_parquet_columns(args.data_dir):
+        sys.exit(1)
\ No newline at end of file
@@ -1,160 +1,185 @@
 #!/usr/bin/env python3
 """
 Script to fix X prefixes in parquet files by renaming X_ columns back to _ columns
+
+The rename mapping is computed from parquet footers alone, and each file is
+rewritten one row group at a time with pyarrow under the renamed schema, so no
+DataFrame is ever built and memory stays at about one row group.
+
+BFRSS applies the same mapping when it reads a file (see dat490.aliases), so
+running this script is optional.
+
+Usage: python scripts/fix_x_prefixes.py [--data-dir data] [--no-backup]
 """
 
-import pandas as pd
+import argparse
 import sys
+import time
 from pathlib import Path
 import shutil
 
-def fix_x_prefixes():
-    # Define file paths
-    base_dir = Path(__file__).parent.parent
-    data_dir = base_dir / "data"
-    
+import pyarrow.parquet as pq
+
+from dat490.aliases import x_prefix_aliases, rename_schema
+from dat490.memory import peak_rss_mb
+
+# Files to fix
+FILES_TO_FIX = [
+    "LLCP2023_desc.parquet",
+    "LLCP2023_desc_categorized.parquet"
+]
+
+
+def rename_parquet_columns(file_path: Path, rename_mapping: dict) -> None:
+    """
+    Rewrite a parquet file with renamed columns, streaming one row group at a time.
+
+    Row group boundaries and the compression codec are kept. The file is written
+    to a temporary path and moved over the original once complete.
+    """
+    parquet_file = pq.ParquetFile(file_path)
+    schema = rename_schema(parquet_file.schema_arrow, rename_mapping)
+    metadata = parquet_file.metadata
+    compression = metadata.row_group(0).column(0).compression.lower() if metadata.num_row_groups else 'snappy'
+
+    tmp_path = file_path.with_name(file_path.name + '.tmp')
+    try:
+        with pq.ParquetWriter(tmp_path, schema, compression=compression) as writer:
+            for i in range(parquet_file.num_row_groups):
+                table = parquet_file.read_row_group(i).rename_columns(schema.names)
+                writer.write_table(table, row_group_size=table.num_rows)
+                del table
+        tmp_path.replace(file_path)
+    except BaseException:
+        tmp_path.unlink(missing_ok=True)
+        raise
+
+
+def fix_x_prefixes(data_dir: Path, backup: bool = True):
     # Reference file (correct column names)
     reference_file = data_dir / "LLCP2023.parquet"
-    
-    # Files to fix
-    files_to_fix = [
-        "LLCP2023_desc.parquet",
-        "LLCP2023_desc_categorized.parquet"
-    ]
-    
+
     # Check if reference file exists
     if not reference_file.exists():
         print(f"Error: Reference file {reference_file} does not exist")
         return False
-    
+
     print("Starting X prefix fix process...\n")
-    
-    # Read reference file to get correct column names
+
+    # Read the reference file's footer to get correct column names
     try:
-        reference_df = pd.read_parquet(reference_file)
-        reference_columns = set(reference_df.columns)
+        reference_columns = set(pq.read_schema(reference_file).names)
         reference_underscore_columns = [col for col in reference_columns if col.startswith('_')]
         print(f"Reference file has {len(reference_underscore_columns)} columns starting with '_'")
         print(f"Total reference columns: {len(reference_columns)}")
     except Exception as e:
         print(f"Error reading reference file: {e}")
         return False
-    
+
     # Process each file that needs fixing
-    for file_name in files_to_fix:
+    for file_name in FILES_TO_FIX:
         file_path = data_dir / file_name
-        
+
         if not file_path.exists():
             print(f"Warning: {file_path} does not exist, skipping...")
             continue
-            
+
         print(f"\nProcessing {file_name}...")
-        
+
         try:
-            # Read the file
-            df = pd.read_parquet(file_path)
-            original_columns = list(df.columns)
-            
+            original_columns = pq.read_schema(file_path).names
             print(f"  Original columns: {len(original_columns)}")
-            
+
             # Find X columns that should be renamed to _ columns
-            x_columns = [col for col in df.columns if col.startswith('X_')]
+            x_columns = [col for col in original_columns if col.startswith('X_')]
             print(f"  Columns starting with 'X_': {len(x_columns)}")
-            
-            # Create mapping of X columns to _ columns
-            rename_mapping = {}
-            for x_col in x_columns:
-                potential_underscore_col = x_col[1:]  # Remove 'X' to get '_...'
-                if potential_underscore_col in reference_columns:
-                    rename_mapping[x_col] = potential_underscore_col
-            
+
+            rename_mapping = x_prefix_aliases(original_columns, reference_columns)
             print(f"  Columns to rename: {len(rename_mapping)}")
-            
+
             if rename_mapping:
                 print(f"  First 10 renames: {list(rename_mapping.items())[:10]}")
-                
+
                 # Create backup
                 backup_path = file_path.with_suffix('.parquet.backup')
-                print(f"  Creating backup: {backup_path}")
-                shutil.copy2(file_path, backup_path)
-                
-                # Apply renames
-                df_renamed = df.rename(columns=rename_mapping)
-                
+                if backup:
+                    print(f"  Creating backup: {backup_path}")
+                    shutil.copy2(file_path, backup_path)
+
+                # Stream the row groups through the renamed schema
+                print(f"  Saving corrected file...")
+                start = time.perf_counter()
+                rename_parquet_columns(file_path, rename_mapping)
+                elapsed = time.perf_counter() - start
+
                 # Verify the renames worked
-                new_columns = list(df_renamed.columns)
+                new_columns = pq.read_schema(file_path).names
                 renamed_underscore_columns = [col for col in new_columns if col.startswith('_')]
-                
+
                 print(f"  After rename - columns starting with '_': {len(renamed_underscore_columns)}")
                 print(f"  After rename - total columns: {len(new_columns)}")
-                
-                # Save the corrected file
-                print(f"  Saving corrected file...")
-                df_renamed.to_parquet(file_path, index=False)
-                
+
                 print(f"  ✓ Successfully fixed {file_name}")
-                print(f"    - Renamed {len(rename_mapping)} columns")
-                print(f"    - Backup saved as {backup_path.name}")
-                
+                print(f"    - Renamed {len(rename_mapping)} columns in {elapsed:.1f}s (peak RSS {peak_rss_mb():.0f} MB)")
+                if backup:
+                    print(f"    - Backup saved as {backup_path.name}")
+
             else:
                 print(f"  No columns to rename in {file_name}")
-                
+
         except Exception as e:
             print(f"  Error processing {file_name}: {e}")
             return False
-    
+
     print(f"\nX prefix fix process completed!")
     return True
 
-def verify_fixes():
+def verify_fixes(data_dir: Path):
     """Verify that the fixes were applied correctly"""
     print(f"\nVerifying fixes...")
-    
-    base_dir = Path(__file__).parent.parent
-    data_dir = base_dir / "data"
-    
+
     # Reference file
     reference_file = data_dir / "LLCP2023.parquet"
-    
-    # Fixed files
-    fixed_files = [
-        "LLCP2023_desc.parquet",
-        "LLCP2023_desc_categorized.parquet"
-    ]
-    
+
     try:
-        reference_df = pd.read_parquet(reference_file)
-        reference_underscore_columns = set([col for col in reference_df.columns if col.startswith('_')])
-        
+        reference_underscore_columns = set([col for col in pq.read_schema(reference_file).names if col.startswith('_')])
+
         print(f"Reference file _ columns: {len(reference_underscore_columns)}")
-        
-        for file_name in fixed_files:
+
+        for file_name in FILES_TO_FIX:
             file_path = data_dir / file_name
             if file_path.exists():
-                df = pd.read_parquet(file_path)
-                underscore_columns = set([col for col in df.columns if col.startswith('_')])
-                x_columns = [col for col in df.columns if col.startswith('X_')]
-                
+                columns = pq.read_schema(file_path).names
+                underscore_columns = set([col for col in columns if col.startswith('_')])
+                x_columns = [col for col in columns if col.startswith('X_')]
+
                 print(f"{file_name}:")
                 print(f"  _ columns: {len(underscore_columns)}")
                 print(f"  X_ columns: {len(x_columns)}")
-                
+
                 # Check if all reference _ columns are present
                 missing_underscore = reference_underscore_columns - underscore_columns
                 if missing_underscore:
                     print(f"  Missing _ columns: {len(missing_underscore)}")
                 else:
                     print(f"  ✓ All reference _ columns present")
-                    
+
         print(f"Verification completed!")
-        
+
     except Exception as e:
         print(f"Error during verification: {e}")
 
 if __name__ == "__main__":
-    success = fix_x_prefixes()
+    parser = argparse.ArgumentParser(description='Rename X_ columns back to _ columns in the BRFSS parquet files')
+    parser.add_argument('--data-dir', type=Path, default=Path(__file__).parent.parent / "data",
+                        help='Directory holding LLCP2023.parquet and the _desc files (default: data/)')
+    parser.add_argument('--no-backup', action='store_true',
+                        help='Do not copy each file to <name>.parquet.backup before rewriting it')
+    args = parser.parse_args()
+
+    success = fix_x_prefixes(args.data_dir, backup=not args.no_backup)
     if success:
-        verify_fixes()
+        verify_fixes(args.data_dir)
     else:
         print("Fix process failed!")
-        sys.exit(1)
\ No newline at end of file
+        sys.exit(1)
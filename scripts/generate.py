@@ -6,14 +6,21 @@ import subprocess
 import glob
 import time
 import argparse
-from concurrent.futures import ProcessPoolExecutor, as_completed
+from contextlib import closing
 
 from pydantic import BaseModel
 from pathlib import Path
 from typing import List, Dict, Optional
 
+from dat490.features import FeatureMatrix
 from dat490.parser import ColumnMetadata, parse_codebook_html
+from dat490.scheduler import CostModel, Job, run_jobs
+from dat490.shared import SharedFrame, SharedFrameSpec
 from scripts.demographic_analysis import (
+    DEFAULT_MODEL_ENGINE,
+    MODEL_ENGINES,
+    DemographicAnalysisResult,
+    demographic_analysis_cache_key,
     perform_demographic_analysis, 
     generate_analysis_visualizations,
     generate_feature_importance_summary,
@@ -137,31 +144,50 @@ def convert_notebooks_to_html(output_dir: Path) -> List[str]:
     return generated_files
 
 
+# Per-process state for analysis workers, set once by init_analysis_worker
+_worker_frame: Optional[SharedFrame] = None
+_worker_metadata: Dict[str, ColumnMetadata] = {}
+_worker_features: Optional[FeatureMatrix] = None
+
+
+def init_analysis_worker(spec: SharedFrameSpec, metadata: Dict[str, ColumnMetadata],
+                         feature_matrix: FeatureMatrix):
+    """
+    Worker initializer for parallel demographic analysis.
+    Attaches to the parent's shared target columns and keeps the target metadata and
+    encoded features. run_jobs calls it once in each long-lived worker, so a worker
+    receives them once rather than once per target.
+    
+    Args:
+        spec: SharedFrameSpec of the target columns published by the parent
+        metadata: Column metadata for the candidate target columns
+        feature_matrix: FeatureMatrix of the demographic features, encoded by the parent
+    """
+    global _worker_frame, _worker_metadata, _worker_features
+    _worker_frame = SharedFrame.attach(spec)
+    _worker_metadata = metadata
+    _worker_features = feature_matrix
+
+
 def run_demographic_analysis_for_column(args):
     """
     Worker function for parallel demographic analysis.
-    Each worker loads its own data to avoid memory duplication.
+    Reads the data from the shared frame attached by init_analysis_worker.
     
     Args:
-        args: Tuple of (target_column, loading_params, min_samples)
+        args: Tuple of (target_column, min_samples, model_engine)
         
     Returns:
         Tuple of (target_column, result_dict, analysis_time)
     """
-    target_column, loading_params, min_samples = args
+    target_column, min_samples, model_engine = args
     
     start_time = time.time()
     try:
-        # Each worker loads its own data to avoid memory passing
-        if loading_params is None:
-            # Single-threaded mode: data is passed directly (handled elsewhere)
-            raise ValueError("Single-threaded mode should not use this worker function")
-        else:
-            # Multi-threaded mode: load data fresh in each worker
-            from dat490 import load_bfrss
-            bfrss = load_bfrss(exclude_desc_columns=True)
-            df = bfrss.df
-            metadata = bfrss.metadata
+        if _worker_frame is None:
+            raise ValueError("Worker was not initialized with init_analysis_worker")
+        df = _worker_frame.frame
+        metadata = _worker_metadata
         
         result = perform_demographic_analysis(
             df=df,
@@ -170,7 +196,9 @@ def run_demographic_analysis_for_column(args):
             feature_columns=DEMOGRAPHIC_FEATURE_COLUMNS,
             min_samples=min_samples,
             hyperparameter_tuning=False,  # Skip for speed during bulk analysis
-            logger=None  # Use default logger to avoid serialization issues
+            logger=None,  # Use default logger to avoid serialization issues
+            feature_matrix=_worker_features,
+            model_engine=model_engine
         )
         
         analysis_time = time.time() - start_time
@@ -200,9 +228,49 @@ def run_demographic_analysis_for_column(args):
         return target_column, failed_result_dict, analysis_time
 
 
+def load_cached_analysis(output_dir: Path, target_column: str, cache_key: str) -> Optional[DemographicAnalysisResult]:
+    """
+    Load a target's existing analysis result if it was computed from the same inputs.
+    Regenerates its visualizations if they are missing.
+    
+    Args:
+        output_dir: Directory holding <target>_demographic_analysis.json files
+        target_column: Target column name
+        cache_key: Key from demographic_analysis_cache_key for the current inputs
+        
+    Returns:
+        The stored result, or None if it is missing, unreadable, failed or stale
+    """
+    analysis_file = output_dir / f"{target_column}_demographic_analysis.json"
+    if not analysis_file.exists():
+        return None
+    
+    try:
+        with open(analysis_file) as f:
+            result = DemographicAnalysisResult(**json.load(f))
+    except Exception as e:
+        logger.warning(f"Ignoring unreadable analysis result {analysis_file}: {e}")
+        return None
+    
+    if not result.successful or result.analysis_metadata.get('cache_key') != cache_key:
+        return None
+    
+    viz_dir = Path('website/public/images')
+    viz_files = [viz_dir / f"{target_column}_demographic_analysis_{kind}.svg"
+                 for kind in ('confusion_matrix', 'feature_importance')]
+    if not all(path.exists() for path in viz_files):
+        generate_analysis_visualizations(result=result, output_dir=viz_dir, format='svg')
+    
+    return result
+
+
 def generate_demographic_analyses(df: pd.DataFrame, metadata: Dict[str, ColumnMetadata], 
                                 output_dir: Path, min_samples: int = 1000,
-                                max_workers: int = 4, sequential: bool = False) -> Dict[str, float]:
+                                max_workers: int = 4, sequential: bool = False,
+                                model_engine: str = DEFAULT_MODEL_ENGINE,
+                                use_result_cache: bool = True,
+                                memory_budget_mb: Optional[float] = None,
+                                job_timeout: Optional[float] = None) -> Dict[str, float]:
     """
     Generate demographic analyses for all applicable columns.
     
@@ -211,7 +279,15 @@ def generate_demographic_analyses(df: pd.DataFrame, metadata: Dict[str, ColumnMe
         metadata: Column metadata dictionary
         output_dir: Directory to save analysis results
         min_samples: Minimum sample size for analysis
-        max_workers: Number of parallel workers
+        max_workers: Maximum number of parallel workers
+        sequential: Run analyses one at a time in this process
+        model_engine: Classifier backend, one of MODEL_ENGINES
+        use_result_cache: Skip targets whose existing result file records the same
+            demographic_analysis_cache_key (same target data, features, parameters and code)
+        memory_budget_mb: Predicted memory the parallel workers may use together
+            (default: most of the available memory, see dat490.scheduler.run_jobs)
+        job_timeout: Seconds before a parallel analysis is cancelled (default: derived
+            from its predicted cost)
         
     Returns:
         Dictionary mapping column names to accuracy scores
@@ -231,8 +307,9 @@ def generate_demographic_analyses(df: pd.DataFrame, metadata: Dict[str, ColumnMe
         '_HLTHPL1'  # Health plan status - important for demographic analysis
     ]
     
-    # Identify candidate columns for analysis
+    # Identify candidate columns for analysis, with the row and class counts that predict their cost
     candidate_columns = []
+    target_sizes = {}
     
     for col_name, col_meta in metadata.items():
         if col_name not in df.columns:
@@ -261,36 +338,47 @@ def generate_demographic_analyses(df: pd.DataFrame, metadata: Dict[str, ColumnMe
             continue
             
         candidate_columns.append(col_name)
+        target_sizes[col_name] = (valid_count, unique_values)
     
     logger.info(f"Identified {len(candidate_columns)} candidate columns for demographic analysis")
-    logger.info(f"Analysis criteria: min_samples={min_samples}, excluding {len(DEMOGRAPHIC_FEATURE_COLUMNS)} demographic features")
+    logger.info(f"Analysis criteria: min_samples={min_samples}, excluding {len(DEMOGRAPHIC_FEATURE_COLUMNS)} demographic features, model engine {model_engine}")
     
     if len(candidate_columns) == 0:
         logger.warning("No candidate columns found for demographic analysis")
         return {}
     
-    # Prepare arguments for processing
-    if sequential or max_workers == 1:
-        # Single-threaded: we'll handle this separately (no worker function needed)
-        analysis_args = None
-    else:
-        # Multi-threaded: each worker will load its own data
-        # We just pass loading parameters (which are minimal)
-        loading_params = {'exclude_desc_columns': True}  # Parameters for load_bfrss()
-        analysis_args = [
-            (col, loading_params, min_samples) 
-            for col in candidate_columns
-        ]
+    # Encode the demographic features once; every target reuses them with its own row mask
+    feature_matrix = FeatureMatrix.from_frame(df, [col for col in DEMOGRAPHIC_FEATURE_COLUMNS if col in df.columns])
     
     results = {}
     successful_analyses = 0
     total_analysis_time = 0
     
-    if sequential or max_workers == 1 or len(candidate_columns) <= 5:
+    # Skip targets whose result file was computed from identical inputs
+    cache_keys = {}
+    pending_columns = candidate_columns
+    if use_result_cache:
+        pending_columns = []
+        for target_column in candidate_columns:
+            cache_keys[target_column] = demographic_analysis_cache_key(
+                df, metadata, target_column, feature_matrix, min_samples=min_samples, model_engine=model_engine
+            )
+            cached_result = load_cached_analysis(output_dir, target_column, cache_keys[target_column])
+            if cached_result is None:
+                pending_columns.append(target_column)
+            else:
+                successful_analyses += 1
+                results[target_column] = cached_result.accuracy
+        logger.info(f"Result cache: {len(candidate_columns) - len(pending_columns)} hits, {len(pending_columns)} misses")
+    
+    if not pending_columns:
+        logger.info("All demographic analyses are up to date")
+    
+    elif sequential or max_workers == 1 or len(pending_columns) <= 5:
         # Run sequentially for debugging or small datasets
         logger.info(f"Starting sequential demographic analysis...")
         
-        for i, target_column in enumerate(candidate_columns, 1):
+        for i, target_column in enumerate(pending_columns, 1):
             start_time = time.time()
             
             try:
@@ -301,7 +389,9 @@ def generate_demographic_analyses(df: pd.DataFrame, metadata: Dict[str, ColumnMe
                     feature_columns=DEMOGRAPHIC_FEATURE_COLUMNS,
                     min_samples=min_samples,
                     hyperparameter_tuning=False,
-                    logger=logger
+                    logger=logger,
+                    feature_matrix=feature_matrix,
+                    model_engine=model_engine
                 )
                 
                 analysis_time = time.time() - start_time
@@ -310,6 +400,8 @@ def generate_demographic_analyses(df: pd.DataFrame, metadata: Dict[str, ColumnMe
                 if result.successful:
                     successful_analyses += 1
                     results[target_column] = result.accuracy
+                    if target_column in cache_keys:
+                        result.analysis_metadata['cache_key'] = cache_keys[target_column]
                     
                     # Save individual analysis results
                     analysis_file = output_dir / f"{target_column}_demographic_analysis.json"
@@ -324,39 +416,58 @@ def generate_demographic_analyses(df: pd.DataFrame, metadata: Dict[str, ColumnMe
                         format='svg'
                     )
                     
-                    logger.info(f"[{i:3d}/{len(candidate_columns)}] {target_column}: accuracy={result.accuracy:.3f}, time={analysis_time:.1f}s")
+                    logger.info(f"[{i:3d}/{len(pending_columns)}] {target_column}: accuracy={result.accuracy:.3f}, time={analysis_time:.1f}s")
                     
                 else:
-                    logger.warning(f"[{i:3d}/{len(candidate_columns)}] {target_column}: FAILED - {result.error_message}")
+                    logger.warning(f"[{i:3d}/{len(pending_columns)}] {target_column}: FAILED - {result.error_message}")
                     
             except Exception as e:
                 analysis_time = time.time() - start_time
                 total_analysis_time += analysis_time
-                logger.error(f"[{i:3d}/{len(candidate_columns)}] {target_column}: ERROR - {str(e)}")
+                logger.error(f"[{i:3d}/{len(pending_columns)}] {target_column}: ERROR - {str(e)}")
     
     else:
-        # Run analyses in parallel - each worker loads its own data
-        logger.info(f"Starting parallel demographic analysis with {max_workers} workers...")
-        logger.info(f"Each worker will load its own copy of the data to avoid memory issues")
+        # Run analyses in parallel - workers attach to the target columns published here.
+        # The scheduler starts the costliest targets first and caps concurrency by memory.
+        logger.info(f"Starting parallel demographic analysis with up to {max_workers} workers...")
         
-        with ProcessPoolExecutor(max_workers=max_workers) as executor:
-            # Submit all jobs
-            future_to_column = {
-                executor.submit(run_demographic_analysis_for_column, args): args[0] 
-                for args in analysis_args
-            }
-            
+        shared = SharedFrame.publish(df, pending_columns)
+        target_metadata = {col: metadata[col] for col in pending_columns}
+        jobs = [
+            Job(key=col, args=(col, min_samples, model_engine), rows=target_sizes[col][0], classes=target_sizes[col][1])
+            for col in pending_columns
+        ]
+        cost_model = CostModel()
+        predicted_total = actual_total = 0.0
+        
+        # closing() cancels any running jobs if this loop is interrupted
+        with shared, closing(run_jobs(jobs, run_demographic_analysis_for_column, engine=model_engine,
+                                      cost_model=cost_model, initializer=init_analysis_worker,
+                                      initargs=(shared.spec, target_metadata, feature_matrix),
+                                      max_workers=max_workers, memory_budget_mb=memory_budget_mb,
+                                      timeout=job_timeout)) as outcomes:
             # Process completed analyses
-            for i, future in enumerate(as_completed(future_to_column), 1):
-                column_name = future_to_column[future]
+            for i, outcome in enumerate(outcomes, 1):
+                column_name = outcome.key
+                
+                if outcome.status != 'completed':
+                    total_analysis_time += outcome.seconds
+                    level = logging.WARNING if outcome.status == 'timed_out' else logging.ERROR
+                    logger.log(level, f"[{i:3d}/{len(pending_columns)}] {column_name}: {outcome.status.upper()} - {outcome.error} "
+                                      f"(predicted {outcome.predicted.seconds:.1f}s)")
+                    continue
+                predicted_total += outcome.predicted.seconds
+                actual_total += outcome.seconds
                 
                 try:
-                    target_column, result_dict, analysis_time = future.result()
+                    target_column, result_dict, analysis_time = outcome.result
                     total_analysis_time += analysis_time
                     
                     if result_dict['successful']:
                         successful_analyses += 1
                         results[target_column] = result_dict['accuracy']
+                        if target_column in cache_keys:
+                            result_dict['analysis_metadata']['cache_key'] = cache_keys[target_column]
                         
                         # Save individual analysis results
                         analysis_file = output_dir / f"{target_column}_demographic_analysis.json"
@@ -364,7 +475,6 @@ def generate_demographic_analyses(df: pd.DataFrame, metadata: Dict[str, ColumnMe
                             json.dump(result_dict, f, indent=2)
                         
                         # Generate visualizations
-                        from scripts.demographic_analysis import DemographicAnalysisResult
                         result_obj = DemographicAnalysisResult(**result_dict)
                         
                         viz_dir = Path('website/public/images')
@@ -374,17 +484,25 @@ def generate_demographic_analyses(df: pd.DataFrame, metadata: Dict[str, ColumnMe
                             format='svg'
                         )
                         
-                        logger.info(f"[{i:3d}/{len(candidate_columns)}] {target_column}: accuracy={result_dict['accuracy']:.3f}, time={analysis_time:.1f}s")
+                        # memory_mb is None where the worker's peak cannot be measured per job
+                        memory = f"{outcome.memory_mb:.0f} MB" if outcome.memory_mb is not None else "n/a"
+                        logger.info(f"[{i:3d}/{len(pending_columns)}] {target_column}: accuracy={result_dict['accuracy']:.3f}, time={analysis_time:.1f}s "
+                                    f"(predicted {outcome.predicted.seconds:.1f}s, memory {memory} "
+                                    f"of predicted {outcome.predicted.memory_mb:.0f} MB)")
                         
                     else:
-                        logger.warning(f"[{i:3d}/{len(candidate_columns)}] {target_column}: FAILED - {result_dict['error_message']}")
+                        logger.warning(f"[{i:3d}/{len(pending_columns)}] {target_column}: FAILED - {result_dict['error_message']}")
                         
                 except Exception as e:
-                    logger.error(f"[{i:3d}/{len(candidate_columns)}] {column_name}: ERROR - {str(e)}")
+                    logger.error(f"[{i:3d}/{len(pending_columns)}] {column_name}: ERROR - {str(e)}")
+        
+        if actual_total > 0:
+            logger.info(f"Job cost model: predicted {predicted_total:.1f}s, actual {actual_total:.1f}s "
+                        f"for completed jobs; history saved to {cost_model.path}")
     
     # Summary statistics
     total_time = time.time() - analysis_start_time
-    avg_analysis_time = total_analysis_time / len(candidate_columns) if candidate_columns else 0
+    avg_analysis_time = total_analysis_time / len(pending_columns) if pending_columns else 0
     
     logger.info(f"Demographic analysis completed:")
     logger.info(f"  Successful analyses: {successful_analyses}/{len(candidate_columns)} ({successful_analyses/len(candidate_columns)*100:.1f}%)")
@@ -483,14 +601,24 @@ if __name__ == '__main__':
                        help='Run analysis sequentially instead of in parallel')
     parser.add_argument('--max-workers', type=int, default=4,
                        help='Maximum number of parallel workers (default: 4)')
+    parser.add_argument('--model-engine', choices=MODEL_ENGINES, default=DEFAULT_MODEL_ENGINE,
+                       help=f'Classifier for demographic analysis (default: {DEFAULT_MODEL_ENGINE})')
+    parser.add_argument('--no-result-cache', action='store_true',
+                       help='Re-run every demographic analysis even if its result file is up to date')
+    parser.add_argument('--memory-budget-mb', type=float, default=None,
+                       help='Memory the parallel analysis workers may use together (default: 80%% of available memory)')
+    parser.add_argument('--job-timeout', type=float, default=None,
+                       help='Seconds before a parallel analysis is cancelled (default: 10x its predicted time, at least 600)')
+    parser.add_argument('--streaming-statistics', action='store_true',
+                       help='Compute column statistics batch by batch from the parquet file instead of a loaded DataFrame')
     
     args = parser.parse_args()
     
     # Use BFRSS wrapper to load data and metadata
-    from dat490 import load_bfrss
+    from dat490 import BFRSS
     
     logger.info("Loading BRFSS data and metadata...")
-    bfrss = load_bfrss(exclude_desc_columns=True)
+    bfrss = BFRSS(exclude_desc_columns=True, streaming_statistics=args.streaming_statistics)
     
     # Get metadata (this will trigger loading and parsing)
     column_metadatas = bfrss.metadata
@@ -517,7 +645,11 @@ if __name__ == '__main__':
                 output_dir=web_content_dir,
                 min_samples=1000,
                 max_workers=min(2, args.max_workers),
-                sequential=args.sequential or True  # Default to sequential in test mode
+                sequential=args.sequential or True,  # Default to sequential in test mode
+                model_engine=args.model_engine,
+                use_result_cache=not args.no_result_cache,
+                memory_budget_mb=args.memory_budget_mb,
+                job_timeout=args.job_timeout
             )
         else:
             # Full analysis
@@ -527,7 +659,11 @@ if __name__ == '__main__':
                 output_dir=web_content_dir,
                 min_samples=1000,
                 max_workers=args.max_workers,
-                sequential=args.sequential
+                sequential=args.sequential,
+                model_engine=args.model_engine,
+                use_result_cache=not args.no_result_cache,
+                memory_budget_mb=args.memory_budget_mb,
+                job_timeout=args.job_timeout
             )
         
         # Update metadata with analysis scores
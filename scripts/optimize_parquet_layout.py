@@ -0,0 +1,49 @@
+#!/usr/bin/env python3
+"""
+Rewrite a BRFSS parquet file into the read-optimized layout (dat490.layout).
+
+Sorts rows by _STATE and IMONTH, writes bounded row groups with zstd
+compression, dictionary encodes coded columns and writes page indexes.
+
+Usage: PYTHONPATH=. python scripts/optimize_parquet_layout.py [--input PATH] [--output PATH]
+                                                              [--row-group-size 32768] [--compression-level 3]
+"""
+import argparse
+import logging
+import time
+from pathlib import Path
+
+from dat490.layout import (DEFAULT_COMPRESSION_LEVEL, DEFAULT_ROW_GROUP_SIZE, DEFAULT_SORT_COLUMNS,
+                           optimize_parquet_layout)
+
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s', datefmt='%H:%M:%S')
+logger = logging.getLogger(__name__)
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Rewrite a BRFSS parquet file with a read-optimized layout')
+    parser.add_argument('--input', type=Path, default=Path('data/LLCP2023_desc_categorized.parquet'),
+                        help='Parquet file to rewrite')
+    parser.add_argument('--output', type=Path, default=None,
+                        help='Output file (default: <input>_optimized.parquet next to the input)')
+    parser.add_argument('--sort-columns', nargs='*', default=list(DEFAULT_SORT_COLUMNS),
+                        help=f"Columns to sort by (default: {' '.join(DEFAULT_SORT_COLUMNS)}; none keeps row order)")
+    parser.add_argument('--row-group-size', type=int, default=DEFAULT_ROW_GROUP_SIZE,
+                        help=f'Rows per row group (default: {DEFAULT_ROW_GROUP_SIZE})')
+    parser.add_argument('--compression-level', type=int, default=DEFAULT_COMPRESSION_LEVEL,
+                        help=f'zstd compression level (default: {DEFAULT_COMPRESSION_LEVEL})')
+    parser.add_argument('--no-page-index', action='store_true',
+                        help='Do not write column/offset page indexes')
+    args = parser.parse_args()
+    output = args.output or args.input.with_name(f"{args.input.stem}_optimized.parquet")
+
+    start = time.perf_counter()
+    optimize_parquet_layout(args.input, output, sort_columns=args.sort_columns,
+                            row_group_size=args.row_group_size, compression_level=args.compression_level,
+                            write_page_index=not args.no_page_index)
+    logger.info(f"Rewrote {args.input} ({args.input.stat().st_size / 1024 ** 2:.1f} MB) as "
+                f"{output} ({output.stat().st_size / 1024 ** 2:.1f} MB) in {time.perf_counter() - start:.1f}s")
+
+
+if __name__ == '__main__':
+    main()
@@ -2,12 +2,19 @@
 """
 Test script to check if parquet file format modifies column names.
 Creates a DataFrame with various column name patterns, saves as parquet, 
-then reloads to compare column names.
+then reloads it to compare column names, and checks the names stored in the
+parquet footer as well.
+
+Usage: PYTHONPATH=. python scripts/test_parquet_column_names.py
 """
+import importlib.util
+import tempfile
 import pandas as pd
 import numpy as np
 from pathlib import Path
 
+from dat490.catalog import default_catalog
+
 def test_parquet_column_names():
     """Test if parquet modifies column names"""
     
@@ -52,18 +59,16 @@ def test_parquet_column_names():
         print(f"  {i+1:2d}. '{col}'")
     
     # Test different parquet engines and settings
-    test_file = Path("/Users/sksizer/dev/dat490/data/test_column_names.parquet")
+    test_file = Path(tempfile.gettempdir()) / "test_column_names.parquet"
+    catalog = default_catalog()
     
     engines = ['pyarrow', 'fastparquet']
     index_settings = [True, False]
     
     for engine in engines:
-        if engine == 'fastparquet':
-            try:
-                import fastparquet
-            except ImportError:
-                print(f"\n⚠️  Skipping {engine} (not installed)")
-                continue
+        if importlib.util.find_spec(engine) is None:
+            print(f"\n⚠️  Skipping {engine} (not installed)")
+            continue
         
         for use_index in index_settings:
             print(f"\n{'='*50}")
@@ -84,6 +89,14 @@ def test_parquet_column_names():
                 for i, col in enumerate(df_reloaded.columns):
                     print(f"  {i+1:2d}. '{col}'")
                 
+                # Names as stored in the footer (index columns are pandas bookkeeping)
+                catalog.invalidate(test_file)
+                footer_columns = [col for col in catalog.columns(test_file) if not col.startswith('__index_level_')]
+                if footer_columns == list(df_original.columns):
+                    print("✅ Footer column names match the original")
+                else:
+                    print(f"❌ Footer column names differ: {footer_columns}")
+                
                 # Compare column names
                 original_cols = set(df_original.columns)
                 reloaded_cols = set(df_reloaded.columns)
@@ -125,7 +138,7 @@ def test_parquet_column_names():
         test_file.unlink()
         print(f"\n🧹 Cleaned up test file: {test_file}")
     
-    print(f"\n🎉 Test complete!")
+    print("\n🎉 Test complete!")
 
 if __name__ == "__main__":
     test_parquet_column_names()
\ No newline at end of file